@@ -0,0 +1,250 @@
+"""
+Flux-aware adaptive dwell scheduler.
+
+The muon flux falls off roughly as cos²θ, so equal dwell times leave the
+steep angles with far larger statistical errors than the zenith. A scan is
+given a list of angle bins and a target relative uncertainty; reaching it
+in a bin takes ``N = 1 / target²`` counts (Poisson errors).
+
+Every bin first gets a short pilot dwell, lengthened by the cos²θ prior.
+After that, each pass over the unfinished bins (in slew-optimized order)
+allocates a dwell from the bin's live count rate: the time still needed for
+``N`` counts, clamped to ``[min_dwell, max_dwell]``. A dwell ends early as
+soon as its bin reaches the target. Each move is queued as a discrete
+``services.move_to`` job rather than a ``point_to`` target like
+``api_goto_angle``, so a slider drag cannot retarget it mid-scan.
+Pausing motion holds the scan too: a queued move waits for resume, and a
+dwell stops its clock until then.
+
+Counts come from ``record_counts``, fed by the detector readout through
+``POST /api/counts/``; they are attributed to the bin being dwelt on.
+"""
+
+import math
+import threading
+import time
+
+from muon_telescope.motion import get_job, get_state, wait_for_state_change
+from muon_telescope.observation_plan import order_entries, parse_entries
+
+from . import services
+
+MIN_DWELL = 10.0
+MAX_DWELL = 600.0
+POLL_INTERVAL = 1.0  # How often a dwell checks whether its bin is done
+MIN_PRIOR = 0.05  # Floor for cos²θ when scaling pilot dwells
+MIN_SLICE = 0.001  # Time budget below which no further dwell is started
+
+_counts_lock = threading.Lock()
+_total_counts = 0
+
+# The scan currently (or most recently) run by this process
+current_scan = None
+_scan_lock = threading.Lock()  # Guards the check-and-start in start_scan
+
+
+def record_counts(n):
+    """Add ``n`` detector counts to the running total."""
+    global _total_counts
+    with _counts_lock:
+        _total_counts += n
+
+
+def total_counts():
+    return _total_counts
+
+
+def motion_paused():
+    return get_state()["paused"]
+
+
+class FluxScan:
+    """One adaptive scan over a set of angle bins."""
+
+    def __init__(
+        self,
+        angles,
+        target_error,
+        min_dwell=MIN_DWELL,
+        max_dwell=MAX_DWELL,
+        max_time=None,
+        move=None,
+        counts=total_counts,
+        clock=time.monotonic,
+        sleep=None,
+        paused=motion_paused,
+    ):
+        if not 0 < target_error < 1:
+            raise ValueError("target_error must be between 0 and 1")
+        if not 0 < min_dwell <= max_dwell:
+            raise ValueError("Need 0 < min_dwell <= max_dwell")
+        angles = [angle for angle, _ in parse_entries([(a, 0) for a in angles])]
+        self.bins = [{"angle": a, "counts": 0, "live_time": 0.0} for a in angles]
+        self.target_error = target_error
+        self.required = math.ceil(1 / target_error**2)
+        self.min_dwell = min_dwell
+        self.max_dwell = max_dwell
+        self.max_time = max_time
+        self.move = move or _goto
+        self.counts = counts
+        self.clock = clock
+        self.paused = paused
+        self._stop = threading.Event()
+        self.sleep = sleep or self._stop.wait
+        self.status = "queued"
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.current_angle = None
+        self._thread = None
+
+    def start(self):
+        self.status = "running"
+        self._thread = threading.Thread(target=self.run, name="flux-scan", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run(self):
+        self.status = "running"
+        self.started = self.clock() if self.started is None else self.started
+        try:
+            while not self._stop.is_set():
+                pending = [b for b in self.bins if b["counts"] < self.required]
+                if not pending or self._out_of_time():
+                    break
+                position = get_state()["current_position"]
+                entries = [(b["angle"], b) for b in pending]
+                for angle, b in order_entries(entries, position):
+                    if self._stop.is_set() or self._out_of_time():
+                        break
+                    dwell = self.allocate(b)
+                    self.current_angle = angle
+                    self.move(angle)
+                    self._dwell(b, dwell)
+            self.status = "stopped" if self._stop.is_set() else "done"
+        except Exception as e:
+            self.status, self.error = "failed", str(e)
+        finally:
+            self.current_angle = None
+            self.finished = self.clock()
+
+    def allocate(self, b):
+        """Dwell time for the next visit to bin ``b``."""
+        if b["live_time"] == 0:
+            prior = max(math.cos(math.radians(b["angle"])) ** 2, MIN_PRIOR)
+            dwell = self.min_dwell / prior
+        elif b["counts"] == 0:
+            dwell = self.max_dwell
+        else:
+            dwell = (self.required - b["counts"]) / self.rate(b)
+        dwell = min(max(dwell, self.min_dwell), self.max_dwell)
+        return min(dwell, self._time_left())
+
+    def rate(self, b):
+        return b["counts"] / b["live_time"] if b["live_time"] else None
+
+    def _time_left(self):
+        if self.max_time is None:
+            return math.inf
+        return self.max_time - (self.clock() - self.started)
+
+    def _out_of_time(self):
+        return self._time_left() < MIN_SLICE
+
+    def _dwell(self, b, seconds):
+        """Count into bin ``b`` for ``seconds``, holding while motion is paused.
+
+        A pause stops the dwell clock; counts that arrive meanwhile are not
+        attributed to the bin.
+        """
+        base_counts, base_time = b["counts"], b["live_time"]
+        start_counts, start = self.counts(), self.clock()
+        deadline = start + seconds
+        while True:
+            now = self.clock()
+            b["counts"] = base_counts + self.counts() - start_counts
+            b["live_time"] = base_time + now - start
+            if now >= deadline or b["counts"] >= self.required:
+                return
+            if self._stop.is_set():
+                return
+            if self.paused():
+                while self.paused() and not self._stop.is_set():
+                    self.sleep(POLL_INTERVAL)
+                resumed = self.clock()
+                deadline += resumed - now
+                base_counts, base_time = b["counts"], b["live_time"]
+                start_counts, start = self.counts(), resumed
+                continue
+            self.sleep(min(POLL_INTERVAL, deadline - now))
+
+    def summary(self):
+        bins = []
+        eta = 0.0
+        for b in self.bins:
+            rate = self.rate(b)
+            error = 1 / math.sqrt(b["counts"]) if b["counts"] else None
+            remaining = max(0, self.required - b["counts"])
+            if remaining and eta is not None:
+                eta = eta + remaining / rate if rate else None
+            bins.append(
+                {
+                    "angle": b["angle"],
+                    "counts": b["counts"],
+                    "live_time": round(b["live_time"], 3),
+                    "rate": rate,
+                    "rel_error": error,
+                    "done": not remaining,
+                }
+            )
+        elapsed = 0.0
+        if self.started is not None:
+            elapsed = (self.finished or self.clock()) - self.started
+        return {
+            "status": self.status,
+            "error": self.error,
+            "target_error": self.target_error,
+            "required_counts": self.required,
+            "current_angle": self.current_angle,
+            "elapsed": elapsed,
+            "eta_seconds": eta if self.status in ("queued", "running") else 0.0,
+            "bins": bins,
+        }
+
+
+def _goto(angle):
+    """Queue a discrete move to ``angle`` and wait until it is reached."""
+    job_id = services.move_to(angle)["id"]
+    while True:
+        version = get_state()["version"]
+        job = get_job(job_id)
+        if job is None or job["status"] == "done":
+            return
+        if job["status"] in ("cancelled", "failed"):
+            raise RuntimeError(f"Move to {angle:g}° {job['status']}")
+        wait_for_state_change(version, 1.0)
+
+
+def start_scan(angles, target_error, **options):
+    """Start a new scan, unless one is already running."""
+    global current_scan
+    with _scan_lock:
+        if current_scan is not None and current_scan.status == "running":
+            raise RuntimeError("A flux scan is already running")
+        scan = FluxScan(angles, target_error, **options)
+        scan.start()
+        current_scan = scan
+    return scan
+
+
+def stop_scan():
+    if current_scan is None or current_scan.status != "running":
+        return False
+    current_scan.stop()
+    return True
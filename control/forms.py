@@ -1,18 +1,20 @@
 from django import forms
 from django.contrib.auth.models import User
 
+from muon_telescope.observation_plan import ANGLE_LIMIT
+
 
 class ControlForm(forms.Form):
     angle = forms.IntegerField(
         label="Angle",
-        min_value=-75,
-        max_value=75,
+        min_value=-ANGLE_LIMIT,
+        max_value=ANGLE_LIMIT,
         widget=forms.NumberInput(
             attrs={
                 "type": "range",
                 "class": "form-range",
-                "min": -75,
-                "max": 75,
+                "min": -ANGLE_LIMIT,
+                "max": ANGLE_LIMIT,
             }
         ),
     )
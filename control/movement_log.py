@@ -0,0 +1,51 @@
+import threading
+
+
+class MovementLog:
+    """Fixed-capacity ring buffer of movement log entries.
+
+    Every appended entry gets a monotonically increasing ``seq`` number that
+    clients use as a cursor. Appends are O(1); once the buffer is full the
+    oldest entry is overwritten. The capacity used by the app comes from the
+    ``MOVEMENT_LOG_SIZE`` setting.
+    """
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("Movement log capacity must be positive")
+        self.capacity = capacity
+        self._entries = [None] * capacity
+        self._last_seq = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self._last_seq, self.capacity)
+
+    @property
+    def last_seq(self):
+        return self._last_seq
+
+    def append(self, entry):
+        with self._lock:
+            self._last_seq += 1
+            entry["seq"] = self._last_seq
+            self._entries[self._last_seq % self.capacity] = entry
+        return entry
+
+    def _slice(self, first, last):
+        return [self._entries[seq % self.capacity] for seq in range(first, last + 1)]
+
+    def since(self, seq=0, limit=None):
+        """Return entries newer than ``seq``, oldest first, at most ``limit`` of them."""
+        with self._lock:
+            first = max(seq + 1, self._last_seq - self.capacity + 1, 1)
+            last = self._last_seq
+            if limit is not None:
+                last = min(last, first + limit - 1)
+            return self._slice(first, last)
+
+    def latest(self, limit):
+        """Return the newest ``limit`` entries, oldest first."""
+        with self._lock:
+            first = max(self._last_seq - min(limit, self.capacity) + 1, 1)
+            return self._slice(first, self._last_seq)
@@ -0,0 +1,171 @@
+"""
+Motion service shared by the form views and the JSON API.
+
+Both call these functions directly instead of going through HTTP. When
+``settings.MOTION_BACKEND_URL`` points at another instance of the API, the
+calls are forwarded there over one pooled keep-alive session instead.
+"""
+
+from datetime import datetime
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from muon_telescope.motion import (
+    enable_motor,
+    get_state,
+    notify_state_change,
+    stop_motion,
+    submit_move,
+    submit_plan,
+    submit_target,
+    update_state,
+)
+from muon_telescope.flux import FluxHistogram
+from muon_telescope.motion_profile import PROFILES
+
+from .movement_log import MovementLog
+
+# Movement logs
+movement_logs = MovementLog(settings.MOVEMENT_LOG_SIZE)
+
+# Coincidence rate per angle bin, fed by detector count reports
+flux_histogram = FluxHistogram(getattr(settings, "FLUX_BIN_WIDTH", 5.0))
+
+_session = None
+
+
+def log_movement(action, details):
+    """Log motor movement for history."""
+    movement_logs.append(
+        {
+            "timestamp": datetime.now().isoformat(),
+            "action": action,
+            "details": details,
+            "position": get_state()["current_position"],
+        }
+    )
+    notify_state_change()
+
+
+def _remote_url():
+    return getattr(settings, "MOTION_BACKEND_URL", "").rstrip("/")
+
+
+def _get_session():
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=getattr(settings, "MOTION_BACKEND_POOL_SIZE", 10),
+        )
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+    return _session
+
+
+def _remote_post(path, payload):
+    """POST to the remote motion API and return its JSON reply."""
+    r = _get_session().post(
+        f"{_remote_url()}/{path}",
+        json=payload,
+        timeout=getattr(settings, "MOTION_BACKEND_TIMEOUT", (2.0, 10.0)),
+    )
+    try:
+        data = r.json()
+    except ValueError:
+        r.raise_for_status()
+        raise ValueError(f"Unexpected response from motion backend: {r.text}")
+    if not r.ok:
+        raise ValueError(data.get("message", r.reason))
+    return data
+
+
+def move_to(angle, profile=None):
+    """Queue a move to ``angle`` degrees and return the job record."""
+    if _remote_url():
+        return _remote_post("motor/move/", {"angle": angle, "profile": profile})["job"]
+    profile = profile or get_state()["profile"]
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown motion profile: {profile}")
+    job = submit_move(target_position=angle, profile=profile)
+    log_movement("move", {"angle": angle, "profile": profile, "job_id": job["id"]})
+    return job
+
+
+def point_to(angle, profile=None):
+    """Point at ``angle`` degrees, replacing any pending pointing target.
+
+    Returns the pointing job record; see ``motor_control.submit_target``.
+    """
+    if _remote_url():
+        return _remote_post("goto_angle/", {"angle": angle, "profile": profile})["job"]
+    profile = profile or get_state()["profile"]
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown motion profile: {profile}")
+    job = submit_target(angle, profile)
+    if not job["retargets"]:
+        # Log where a drag started, not every angle it passed through
+        log_movement("point", {"angle": angle, "job_id": job["id"]})
+    return job
+
+
+def move_steps(steps):
+    """Queue a relative move of ``steps`` and return the job record."""
+    if _remote_url():
+        return _remote_post("do_steps/", {"steps": steps})["job"]
+    if steps == 0:
+        raise ValueError("Steps must be non-zero")
+    job = submit_move(steps=steps, kind="steps")
+    log_movement("do_steps_async", {"steps": steps, "job_id": job["id"]})
+    return job
+
+
+def reset_position():
+    """Queue a move back to the zero position and return the job record."""
+    if _remote_url():
+        return _remote_post("motor/reset/", {})["job"]
+    current_pos = get_state()["current_position"]
+    job = submit_move(target_position=0, kind="reset")
+    log_movement("reset", {"from_position": current_pos, "job_id": job["id"]})
+    return job
+
+
+def run_plan(entries, profile=None):
+    """Queue an observation plan and return its progress record."""
+    if _remote_url():
+        return _remote_post("plans/", {"entries": entries, "profile": profile})["plan"]
+    plan = submit_plan(entries, profile)
+    log_movement(
+        "plan",
+        {
+            "plan_id": plan["id"],
+            "entries": plan["total"],
+            "eta_seconds": round(plan["eta_seconds"], 1),
+        },
+    )
+    return plan
+
+
+def stop():
+    """Stop the motor; returns the interrupted job record or None."""
+    if _remote_url():
+        return _remote_post("motor/stop/", {})["job"]
+    job = stop_motion()
+    details = {"position": get_state()["current_position"]}
+    if job is not None:
+        details.update(job_id=job["id"], steps_done=job["steps_done"])
+    log_movement("stop", details)
+    return job
+
+
+def set_zero(position=0):
+    """Declare the current motor position to be ``position`` degrees."""
+    if _remote_url():
+        _remote_post("set_zero_position/", {"position": position})
+        return
+    enable_motor()
+    update_state(current_position=position, position_bounds=None)
+    log_movement("set_zero", {"zero_position": position})
@@ -13,6 +13,24 @@ urlpatterns = [
     path("api/motor/move/", views.api_move_motor, name="api_move_motor"),
     path("api/motor/stop/", views.api_stop_motor, name="api_stop_motor"),
     path("api/motor/reset/", views.api_reset_position, name="api_reset_position"),
+    path("api/motor/jobs/", views.api_list_jobs, name="api_list_jobs"),
+    path("api/motor/jobs/<int:job_id>/", views.api_job_status, name="api_job_status"),
+    path(
+        "api/motor/jobs/<int:job_id>/cancel/",
+        views.api_cancel_job,
+        name="api_cancel_job",
+    ),
+    path("api/plans/", views.api_submit_plan, name="api_submit_plan"),
+    path("api/plans/<int:plan_id>/", views.api_plan_status, name="api_plan_status"),
+    path(
+        "api/plans/<int:plan_id>/cancel/",
+        views.api_cancel_plan,
+        name="api_cancel_plan",
+    ),
+    path("api/scan/", views.api_flux_scan, name="api_flux_scan"),
+    path("api/scan/stop/", views.api_stop_flux_scan, name="api_stop_flux_scan"),
+    path("api/counts/", views.api_record_counts, name="api_record_counts"),
+    path("api/flux/", views.api_flux, name="api_flux"),
     path("api/status/", views.api_motor_status, name="api_motor_status"),
     path("api/logs/", views.api_movement_logs, name="api_movement_logs"),
     path("api/goto_angle/", views.api_goto_angle, name="api_goto_angle"),
@@ -25,6 +43,7 @@ urlpatterns = [
     path("api/disable_stepper/", views.api_disable_stepper, name="api_disable_stepper"),
     path("api/set_direction/", views.api_set_direction, name="api_set_direction"),
     path("api/health/", views.api_health, name="api_health"),
+    path("metrics", views.metrics_view, name="metrics"),
     path("api/quit_motor/", views.api_quit_motor, name="api_quit_motor"),
     path("api/pause_motor/", views.api_pause_motor, name="api_pause_motor"),
     path("api/resume_motor/", views.api_resume_motor, name="api_resume_motor"),
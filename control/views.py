@@ -1,13 +1,15 @@
 from django.shortcuts import render, redirect
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import logout as auth_logout
 from django.urls import reverse
-import requests
 from .forms import ControlForm, RegisterForm
-from django.http import JsonResponse
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 import json
+import math
+from collections import OrderedDict
 from datetime import datetime
 
 from pathlib import Path
@@ -26,18 +28,26 @@ class MyLoginView(LoginView):
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-BACKEND_API_URL = "http://localhost:8000/api"  # Adjust as needed
-
 try:
-    from muon_telescope.motor_control import (
+    from muon_telescope.motion import (
         enable_motor,
         disable_motor,
         set_direction,
-        do_steps,
-        cleanup,
-        start_motor,
+        get_job,
+        list_jobs,
+        cancel_job,
+        get_plan,
+        cancel_plan,
+        stop_motion,
+        pause_motion,
+        resume_motion,
         is_motor_busy,
-        motor_state
+        get_state,
+        update_state,
+        notify_state_change,
+        status_snapshot,
+        get_state_version,
+        wait_for_state_change,
     )
 
     MOTOR_CONTROL_AVAILABLE = True
@@ -53,54 +63,30 @@ except ImportError as e:
     def set_direction(direction):
         pass
 
-    def do_steps(steps, step_delay=0.002):
-        pass
-
-    def cleanup():
-        pass
-
     MOTOR_CONTROL_AVAILABLE = False
 
-# Motor parameters
-STEPS_PER_REVOLUTION = 9312
-MICROSTEPS = 1
-TOTAL_STEPS_PER_REV = STEPS_PER_REVOLUTION * MICROSTEPS
+from muon_telescope import metrics
+from muon_telescope.status_stream import MAX_LONG_POLL
+from muon_telescope.motion_profile import PROFILES
+from . import flux_scheduler, services
+from .services import flux_histogram, log_movement, movement_logs
 
 ## Global motor state
-#motor_state = {
+# motor_state = {
 #    "is_moving": False,
 #    "current_position": 0,
 #    "target_position": 0,
 #    "is_enabled": False,
 #    "step_delay": 0.020,
 #    "paused" : False,
-#}
+# }
 
-# Movement logs
-movement_logs = []
+# Serialized status bodies, keyed by view, reused while the state version holds
+MAX_CACHED_RESPONSES = 32
+_response_cache = OrderedDict()
+_response_cache_lock = threading.Lock()
 
-# Threading event for pause/resume
-motor_pause_event = threading.Event()
-motor_pause_event.set()  # Initially not paused
-
-motor_thread = None
-
-# Motor control lock for thread-safe operations
-motor_lock = threading.Lock()
-
-
-def log_movement(action, details):
-    """Log motor movement for history."""
-    log_entry = {
-        "timestamp": datetime.now().isoformat(),
-        "action": action,
-        "details": details,
-        "position": motor_state["current_position"],
-    }
-    movement_logs.append(log_entry)
-    # Keep only last 100 entries
-    if len(movement_logs) > 100:
-        movement_logs.pop(0)
+DEFAULT_LOG_LIMIT = 20
 
 
 def is_admin(user):
@@ -116,6 +102,52 @@ def admin_required(view_func):
     return _wrapped_view
 
 
+def _cached_json(key, build):
+    """Serialize ``build()`` at most once per state version."""
+    with _response_cache_lock:
+        cached = _response_cache.get(key)
+        if cached is not None and cached[0] == get_state_version():
+            _response_cache.move_to_end(key)
+            return cached
+    payload = build()
+    entry = (payload["version"], json.dumps(payload).encode())
+    with _response_cache_lock:
+        _response_cache[key] = entry
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > MAX_CACHED_RESPONSES:
+            _response_cache.popitem(last=False)
+    return entry
+
+
+def _versioned_response(request, key, build):
+    """Return a state-versioned JSON body with ETag and long-poll support.
+
+    ``?since=<version>&wait=<seconds>`` blocks until the state version moves
+    past ``since`` (or the wait expires). Unchanged state answers 304. Under
+    ASGI the wait is done by ``status_stream.long_poll`` before the request
+    reaches Django, so it does not tie up a worker thread.
+    """
+    try:
+        since = int(request.GET["since"]) if "since" in request.GET else None
+        wait = min(float(request.GET.get("wait", 0)), MAX_LONG_POLL)
+    except ValueError:
+        return JsonResponse(
+            {"status": "error", "message": "since and wait must be numbers"},
+            status=400,
+        )
+    if since is not None and wait > 0:
+        wait_for_state_change(since, wait)
+    version, body = _cached_json(key, build)
+    etag = f'"{version}"'
+    if since == version or request.headers.get("If-None-Match") == etag:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
 @login_required
 def control(request):
     if request.method == "POST":
@@ -127,24 +159,16 @@ def control(request):
             elif "go" in request.POST:
                 angle = form.cleaned_data["angle"]
                 try:
-                    r = requests.post(
-                        f"{BACKEND_API_URL}/goto_angle", json={"angle": angle}
-                    )
-                    if r.ok:
-                        messages.info(request, f"Moving to angle {angle}°")
-                    else:
-                        messages.error(request, f"Failed to move: {r.text}")
+                    services.move_to(angle)
+                    messages.info(request, f"Moving to angle {angle}°")
                 except Exception as e:
                     messages.error(request, f"Error: {e}")
                 return redirect("control")
             elif "set_zero" in request.POST:
                 zero = form.cleaned_data["zero"]
                 try:
-                    r = requests.post(f"{BACKEND_API_URL}/set_zero_position", json=zero)
-                    if r.ok:
-                        messages.success(request, f"Zero position set to {zero}")
-                    else:
-                        messages.error(request, f"Failed to set zero: {r.text}")
+                    services.set_zero(zero)
+                    messages.success(request, f"Zero position set to {zero}")
                 except Exception as e:
                     messages.error(request, f"Error: {e}")
                 return redirect("control")
@@ -171,38 +195,38 @@ def register(request):
 # API Endpoints
 
 
+def _job_response(job, message):
+    return JsonResponse(
+        {"status": "queued", "message": message, "job_id": job["id"], "job": job},
+        status=202,
+    )
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def api_move_motor(request):
-    """Move motor to specified angle."""
-    global motor_state
+    """Queue a move to the specified angle and return its job id."""
     try:
         data = json.loads(request.body)
         angle = float(data.get("angle", 0))
-        motor_state["target_position"] = angle
-        angle = motor_state["current_position"] - angle
-
-        step_period = motor_state["step_delay"]
-
-        # Calculate steps needed
-        steps = int((angle / 360) * TOTAL_STEPS_PER_REV)
-
-        # Set direction
-        set_direction(steps > 0)
-
-        # Move motor
-        motor_state["is_moving"] = True
-        do_steps(abs(steps),step_period)
-        motor_state["current_position"] = motor_state["target_position"] 
-        motor_state["is_moving"] = False
+        job = services.move_to(angle, data.get("profile"))
+        return _job_response(job, f"Moving to {angle}°")
+    except Exception as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
 
-        log_movement("move", {"angle": angle, "steps": steps})
 
+@csrf_exempt
+@require_http_methods(["POST"])
+def api_stop_motor(request):
+    """Stop motor movement, decelerating the running move and dropping queued ones."""
+    try:
+        job = services.stop()
         return JsonResponse(
             {
                 "status": "success",
-                "message": f"Moved to {angle}°",
-                "position": motor_state["current_position"],
+                "message": "Motor stopped",
+                "position": get_state()["current_position"],
+                "job": job,
             }
         )
     except Exception as e:
@@ -211,93 +235,310 @@ def api_move_motor(request):
 
 @csrf_exempt
 @require_http_methods(["POST"])
-def api_stop_motor(request):
-    """Stop motor movement."""
-    global motor_state
+def api_reset_position(request):
+    """Queue a move back to the zero position."""
     try:
-        motor_state["is_moving"] = False
+        job = services.reset_position()
+        return _job_response(job, "Returning to zero position")
+    except Exception as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
 
-        log_movement("stop", {"position": motor_state["current_position"]})
 
+@require_http_methods(["GET"])
+def api_list_jobs(request):
+    """List queued, running and recently finished motion jobs."""
+    return JsonResponse({"jobs": list_jobs()})
+
+
+@require_http_methods(["GET"])
+def api_job_status(request, job_id):
+    """Get the status of a motion job."""
+    job = get_job(job_id)
+    if job is None:
         return JsonResponse(
-            {
-                "status": "success",
-                "message": "Motor stopped",
-                "position": motor_state["current_position"],
-            }
+            {"status": "error", "message": f"Unknown job {job_id}"}, status=404
         )
-    except Exception as e:
-        return JsonResponse({"status": "error", "message": str(e)}, status=400)
+    return JsonResponse({"job": job})
 
 
 @csrf_exempt
 @require_http_methods(["POST"])
-def api_reset_position(request):
-    """Reset motor position to zero."""
+def api_cancel_job(request, job_id):
+    """Cancel a motion job; a running job decelerates to a stop."""
+    if get_job(job_id) is None:
+        return JsonResponse(
+            {"status": "error", "message": f"Unknown job {job_id}"}, status=404
+        )
+    if not cancel_job(job_id):
+        return JsonResponse(
+            {"status": "error", "message": f"Job {job_id} has already finished"},
+            status=409,
+        )
+    log_movement("cancel_job", {"job_id": job_id})
+    return JsonResponse(
+        {
+            "status": "success",
+            "message": f"Job {job_id} cancelled",
+            "job": get_job(job_id),
+        }
+    )
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def api_submit_plan(request):
+    """Queue an observation plan of ``{"angle", "dwell"}`` entries.
+
+    Entries are reordered to minimize slew and run back to back; follow the
+    returned plan with ``GET /api/plans/<id>/`` or the status stream.
+    """
     try:
-        # Move to zero position
-        current_pos = motor_state["current_position"]
-        steps = int((current_pos / 360) * TOTAL_STEPS_PER_REV)
+        data = json.loads(request.body)
+        if not isinstance(data, dict):
+            raise ValueError("Expected a JSON object")
+        plan = services.run_plan(data.get("entries"), data.get("profile"))
+    except (ValueError, TypeError) as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
+    return JsonResponse(
+        {
+            "status": "queued",
+            "message": f"Plan {plan['id']} queued",
+            "plan_id": plan["id"],
+            "plan": plan,
+        },
+        status=202,
+    )
+
+
+@require_http_methods(["GET"])
+def api_plan_status(request, plan_id):
+    """Get plan progress and ETA (supports ``?since=&wait=`` long-polling)."""
+    if get_plan(plan_id) is None:
+        return JsonResponse(
+            {"status": "error", "message": f"Unknown plan {plan_id}"}, status=404
+        )
 
-        if steps != 0:
-            set_direction(steps < 0)  # Reverse direction
-            motor_state["is_moving"] = True
-            do_steps(abs(steps))
-            motor_state["is_moving"] = False
+    def build():
+        return {"plan": get_plan(plan_id), "version": get_state_version()}
 
-        motor_state["current_position"] = 0
+    return _versioned_response(request, f"plan-{plan_id}", build)
 
-        log_movement("reset", {"from_position": current_pos})
 
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+def api_flux_scan(request):
+    """Start an adaptive flux scan (POST) or report its progress (GET).
+
+    POST ``{"angles": [...], "target_error": 0.05}`` with optional
+    ``min_dwell``, ``max_dwell`` and ``max_time`` in seconds.
+    """
+    if request.method == "GET":
+        scan = flux_scheduler.current_scan
+        return JsonResponse({"scan": scan.summary() if scan else None})
+    try:
+        data = json.loads(request.body)
+        if not isinstance(data, dict):
+            raise ValueError("Expected a JSON object")
+        options = {
+            key: float(data[key])
+            for key in ("min_dwell", "max_dwell", "max_time")
+            if data.get(key) is not None
+        }
+        scan = flux_scheduler.start_scan(
+            data["angles"], float(data["target_error"]), **options
+        )
+    except KeyError as e:
         return JsonResponse(
-            {"status": "success", "message": "Position reset to zero", "position": 0}
+            {"status": "error", "message": f"Missing field {e}"}, status=400
         )
-    except Exception as e:
+    except (ValueError, TypeError) as e:
         return JsonResponse({"status": "error", "message": str(e)}, status=400)
+    except RuntimeError as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=409)
+    log_movement(
+        "flux_scan",
+        {"bins": len(scan.bins), "target_error": scan.target_error},
+    )
+    return JsonResponse({"status": "started", "scan": scan.summary()}, status=202)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def api_stop_flux_scan(request):
+    """Stop the running flux scan after the current move."""
+    if not flux_scheduler.stop_scan():
+        return JsonResponse(
+            {"status": "error", "message": "No flux scan is running"}, status=409
+        )
+    log_movement("stop_flux_scan", {})
+    return JsonResponse({"status": "success", "message": "Flux scan stopping"})
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def api_record_counts(request):
+    """Report detector coincidence counts (``{"counts": n, "live_time": s}``).
+
+    Counts feed the adaptive scheduler. With ``live_time`` (seconds) they are
+    also added to the flux histogram at the current position, unless the
+    motor was moving.
+    """
+    try:
+        data = json.loads(request.body)
+        counts = int(data["counts"])
+        live_time = data.get("live_time")
+        live_time = None if live_time is None else float(live_time)
+        if counts < 0 or (live_time is not None and live_time < 0):
+            raise ValueError
+    except (KeyError, ValueError, TypeError):
+        return JsonResponse(
+            {
+                "status": "error",
+                "message": "counts and live_time must be non-negative numbers",
+            },
+            status=400,
+        )
+    flux_scheduler.record_counts(counts)
+    state = get_state()
+    binned = live_time is not None and not state["is_moving"]
+    if binned:
+        try:
+            flux_histogram.add(state["current_position"], counts, live_time)
+        except ValueError:
+            binned = False  # Outside the histogram's angle range
+    return JsonResponse(
+        {
+            "status": "success",
+            "total": flux_scheduler.total_counts(),
+            "binned": binned,
+        }
+    )
 
 
 @require_http_methods(["GET"])
-def api_motor_status(request):
-    """Get current motor status."""
+def api_flux(request):
+    """Coincidence rate per angle bin with Poisson errors and a cos^n fit.
+
+    Served from incrementally maintained aggregates and cached per data
+    version (``ETag``). ``?format=bin`` returns the packed binary layout of
+    ``muon_telescope.flux``.
+    """
+    version = flux_histogram.version
+    etag = f'"flux-{version}"'
+    if request.headers.get("If-None-Match") == etag:
+        response = HttpResponseNotModified()
+    elif request.GET.get("format") == "bin":
+        response = HttpResponse(
+            flux_histogram.to_binary(), content_type="application/octet-stream"
+        )
+    else:
+        response = HttpResponse(
+            flux_histogram.to_json(), content_type="application/json"
+        )
+    response["ETag"] = etag
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def api_cancel_plan(request, plan_id):
+    """Cancel the remaining entries of an observation plan."""
+    if get_plan(plan_id) is None:
+        return JsonResponse(
+            {"status": "error", "message": f"Unknown plan {plan_id}"}, status=404
+        )
+    if not cancel_plan(plan_id):
+        return JsonResponse(
+            {"status": "error", "message": f"Plan {plan_id} has already finished"},
+            status=409,
+        )
+    log_movement("cancel_plan", {"plan_id": plan_id})
     return JsonResponse(
         {
-            "is_moving": motor_state["is_moving"],
-            "current_position": motor_state["current_position"],
-            "target_position": motor_state["target_position"],
-            "is_enabled": motor_state["is_enabled"],
+            "status": "success",
+            "message": f"Plan {plan_id} cancelled",
+            "plan": get_plan(plan_id),
         }
     )
 
 
+def _status_payload():
+    status = status_snapshot()
+    status["jitter"] = get_state().get("jitter")
+    return status
+
+
+def _busy_payload():
+    return {"busy": is_motor_busy(), "version": get_state_version()}
+
+
+@require_http_methods(["GET"])
+def api_motor_status(request):
+    """Get current motor status (supports ETag and ?since=&wait= long-polling)."""
+    return _versioned_response(request, "status", _status_payload)
+
+
 @require_http_methods(["GET"])
 def api_movement_logs(request):
-    """Get movement history logs."""
-    return JsonResponse({"logs": movement_logs[-20:]})  # Return last 20 entries
+    """Get movement history logs.
+
+    Without ``since`` the newest ``limit`` entries are returned. With
+    ``?since=<seq>`` only entries after that cursor are returned (oldest
+    first); pass the returned ``next_since`` back to fetch the next page.
+    """
+    try:
+        limit = int(request.GET.get("limit", DEFAULT_LOG_LIMIT))
+        since = request.GET.get("since")
+        if limit < 1:
+            raise ValueError
+        limit = min(limit, movement_logs.capacity)
+        if since is None:
+            logs = movement_logs.latest(limit)
+        else:
+            logs = movement_logs.since(int(since), limit)
+    except ValueError:
+        return JsonResponse(
+            {"status": "error", "message": "since and limit must be positive integers"},
+            status=400,
+        )
+    next_since = logs[-1]["seq"] if logs else int(since or movement_logs.last_seq)
+    return JsonResponse(
+        {"logs": logs, "next_since": next_since, "last_seq": movement_logs.last_seq}
+    )
 
 
 @csrf_exempt
 @require_http_methods(["POST"])
 def api_goto_angle(request):
-    """Move to specific angle (alias for move_motor)."""
-    return api_move_motor(request)
+    """Point at an angle; the newest target replaces any still pending.
+
+    Unlike ``move_motor`` repeated calls do not queue up: the running move is
+    retargeted, so a dragged slider only ever drives to its latest angle.
+    """
+    try:
+        data = json.loads(request.body)
+        angle = float(data.get("angle", 0))
+        job = services.point_to(angle, data.get("profile"))
+        return _job_response(job, f"Pointing at {angle}°")
+    except Exception as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
 
 
 @csrf_exempt
 @require_http_methods(["POST"])
 def api_set_zero_position(request):
-    """Set zero position reference."""
+    """Set zero position reference (``position`` degrees, default 0)."""
     try:
-        enable_motor()
-
-        motor_state["current_position"] = 0
-
-        log_movement("set_zero", {"zero_position": zero_pos})
+        data = json.loads(request.body) if request.body else {}
+        position = float(data.get("position", 0))
+        services.set_zero(position)
 
         return JsonResponse(
             {
                 "status": "success",
-                "message": f"Zero position set to 0",
-                "zero_position": 0,
+                "message": f"Zero position set to {position:g}",
+                "zero_position": position,
             }
         )
     except Exception as e:
@@ -310,7 +551,6 @@ def api_enable_stepper(request):
     """Enable stepper motor."""
     try:
         enable_motor()
-        motor_state["is_enabled"] = True
 
         log_movement("enable", {})
 
@@ -325,7 +565,6 @@ def api_disable_stepper(request):
     """Disable stepper motor."""
     try:
         disable_motor()
-        motor_state["is_enabled"] = False
 
         log_movement("disable", {})
 
@@ -365,11 +604,20 @@ def api_health(request):
         {
             "status": "healthy",
             "timestamp": datetime.now().isoformat(),
-            "motor_enabled": motor_state["is_enabled"],
+            "motor_enabled": get_state()["is_enabled"],
         }
     )
 
 
+@require_http_methods(["GET"])
+def metrics_view(request):
+    """Prometheus metrics: request latency per view and motion counters."""
+    queued = sum(job["status"] == "queued" for job in list_jobs())
+    return HttpResponse(
+        metrics.render(get_state(), queued), content_type=metrics.CONTENT_TYPE
+    )
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 @admin_required
@@ -396,21 +644,49 @@ def api_shutdown(request):
 @csrf_exempt
 @require_http_methods(["POST"])
 def api_set_step_period(request):
-    """Set step period for motor movement."""
+    """Set step period and velocity profile for motor movement.
+
+    ``period_ms`` is the start/stop period, ``min_period_ms`` the cruise period
+    reached after the ramp and ``accel`` the acceleration in steps/s^2.
+    """
     try:
         data = json.loads(request.body)
-        period_ms = data.get("period_ms", 2)
-
-        # Convert to seconds
-        step_delay = period_ms / 1000.0
-
-        # Store in motor state for future use
-        motor_state["step_delay"] = step_delay
+        state = get_state()
+        period_ms = float(data.get("period_ms", state["step_delay"] * 1000))
+        min_period_ms = float(data.get("min_period_ms", state["min_step_delay"] * 1000))
+        accel = float(data.get("accel", state["accel"]))
+        profile = data.get("profile", state["profile"])
+
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown motion profile: {profile}")
+        if not all(0 < value < math.inf for value in (period_ms, min_period_ms, accel)):
+            raise ValueError("Step periods and acceleration must be positive")
+        if min_period_ms > period_ms:
+            raise ValueError("min_period_ms cannot be longer than period_ms")
+
+        # Convert to seconds and store in motor state for future use
+        update_state(
+            step_delay=period_ms / 1000.0,
+            min_step_delay=min_period_ms / 1000.0,
+            accel=accel,
+            profile=profile,
+        )
 
-        log_movement("set_step_period", {"period_ms": period_ms})
+        log_movement(
+            "set_step_period",
+            {
+                "period_ms": period_ms,
+                "min_period_ms": min_period_ms,
+                "accel": accel,
+                "profile": profile,
+            },
+        )
 
         return JsonResponse(
-            {"status": "success", "message": f"Step period set to {period_ms}ms"}
+            {
+                "status": "success",
+                "message": f"Step period set to {period_ms}ms ({profile})",
+            }
         )
     except Exception as e:
         return JsonResponse({"status": "error", "message": str(e)}, status=400)
@@ -419,27 +695,12 @@ def api_set_step_period(request):
 @csrf_exempt
 @require_http_methods(["POST"])
 def api_do_steps(request):
-    """Perform a specific number of steps in a non-blocking way."""
+    """Queue a specific number of steps and return the job id."""
     try:
         data = json.loads(request.body)
-        steps = data.get("steps", 0)
-        if steps == 0:
-            return JsonResponse(
-                {"status": "error", "message": "Steps must be non-zero"}, status=400
-            )
-        step_delay = motor_state.get("step_delay", 0.002)
-        set_direction(steps > 0)
-        started = start_motor(abs(steps), step_delay)
-        if started:
-            motor_state["is_moving"] = True
-            log_movement("do_steps_async", {"steps": steps})
-            return JsonResponse(
-                {"status": "started", "message": f"Started {steps} steps"}
-            )
-        else:
-            return JsonResponse(
-                {"status": "busy", "message": "Motor is already running"}, status=409
-            )
+        steps = int(data.get("steps", 0))
+        job = services.move_steps(steps)
+        return _job_response(job, f"Queued {steps} steps")
     except Exception as e:
         return JsonResponse({"status": "error", "message": str(e)}, status=400)
 
@@ -479,7 +740,7 @@ def api_do_steps(request):
 #        motor_state["is_moving"] = False
 #        # Update position (approximate)
 #        position_change = (steps / TOTAL_STEPS_PER_REV) * 360
-#        motor_state["current_position"] += position_change
+#        get_state()["current_position"] += position_change
 #        log_movement(
 #            "do_steps_pwm",
 #            {
@@ -492,7 +753,7 @@ def api_do_steps(request):
 #            {
 #                "status": "success",
 #                "message": f"Completed {steps} steps with PWM",
-#                "position": motor_state["current_position"],
+#                "position": get_state()["current_position"],
 #            }
 #        )
 #    except Exception as e:
@@ -501,8 +762,8 @@ def api_do_steps(request):
 
 @require_http_methods(["GET"])
 def api_motor_busy(request):
-    """Check if the motor is currently running."""
-    return JsonResponse({"busy": is_motor_busy()})
+    """Check if the motor is currently running (supports ETag and long-polling)."""
+    return _versioned_response(request, "busy", _busy_payload)
 
 
 @csrf_exempt
@@ -511,7 +772,6 @@ def api_quit_motor(request):
     """Disable the motor."""
     try:
         disable_motor()
-        motor_state["is_enabled"] = False
         log_movement("quit_motor", {})
         return JsonResponse({"status": "success", "message": "Motor disabled (quit)"})
     except Exception as e:
@@ -521,11 +781,9 @@ def api_quit_motor(request):
 @csrf_exempt
 @require_http_methods(["POST"])
 def api_pause_motor(request):
-    global motor_state
     """Pause motor movement."""
     try:
-        #motor_pause_event.clear()
-        motor_state["pased"] = True
+        pause_motion()
         log_movement("pause_motor", {})
         return JsonResponse({"status": "success", "message": "Motor paused"})
     except Exception as e:
@@ -536,32 +794,9 @@ def api_pause_motor(request):
 @require_http_methods(["POST"])
 def api_resume_motor(request):
     """Resume motor movement."""
-    global motor_state
     try:
-        #motor_pause_event.set()
-        motor_state["poased"] = False
+        resume_motion()
         log_movement("resume_motor", {})
         return JsonResponse({"status": "success", "message": "Motor resumed"})
     except Exception as e:
         return JsonResponse({"status": "error", "message": str(e)}, status=400)
-
-
-# Example of background thread motor movement with pause/resume
-
-
-def threaded_do_steps(steps, step_delay=0.002):
-    with motor_lock:
-        for _ in range(abs(steps)):
-            while not motor_pause_event.is_set():
-                time.sleep(0.1)  # Wait while paused
-            # Use do_steps for actual stepping, which handles GPIO or mock
-            do_steps(1, step_delay)
-
-
-# To use in an endpoint:
-# global motor_thread
-# if motor_thread is None or not motor_thread.is_alive():
-#     motor_thread = threading.Thread(target=threaded_do_steps, args=(steps, step_delay))
-#     motor_thread.start()
-# else:
-#     return JsonResponse({"status": "error", "message": "Motor is already moving"}, status=400)
@@ -16,6 +16,13 @@ class MotorController {
     constructor() {
         this.isMoving = false;
         this.updateInterval = null;
+        this.statusSocket = null;
+        this.reconnectTimer = null;
+        this.jogSocket = null;
+        this.jogTimer = null;
+        this.status = {};
+        this.logs = [];
+        this.lastLogSeq = null;
         this.init();
     }
 
@@ -102,8 +109,36 @@ class MotorController {
         const angleSlider = document.getElementById('angle-slider');
         const angleValue = document.getElementById('angle-value');
         if (angleSlider && angleValue) {
+            // While dragging, point at the slider angle. The server keeps only
+            // the newest target and retargets the running move, so at most one
+            // request is kept in flight and the latest angle is sent after it.
+            let pointing = false;
+            let nextAngle = null;
+            const pointAt = async function (angle) {
+                if (pointing) {
+                    nextAngle = angle;
+                    return;
+                }
+                pointing = true;
+                try {
+                    await fetch('/api/goto_angle/', {
+                        method: 'POST',
+                        headers: { 'Content-Type': 'application/json' },
+                        body: JSON.stringify({ angle: angle })
+                    });
+                } catch (e) {
+                    logError(e);
+                }
+                pointing = false;
+                if (nextAngle !== null) {
+                    const angle = nextAngle;
+                    nextAngle = null;
+                    pointAt(angle);
+                }
+            };
             angleSlider.addEventListener('input', function () {
                 angleValue.textContent = this.value;
+                pointAt(parseFloat(this.value));
             });
         }
 
@@ -176,6 +211,16 @@ class MotorController {
                 }
             };
         }
+        // Jog buttons: the motor runs while a button is held
+        [['jog-plus-btn', 1], ['jog-minus-btn', -1]].forEach(([id, direction]) => {
+            const btn = document.getElementById(id);
+            if (!btn) return;
+            btn.addEventListener('pointerdown', () => this.startJog(direction));
+            ['pointerup', 'pointerleave', 'pointercancel'].forEach((type) => {
+                btn.addEventListener(type, () => this.stopJog());
+            });
+        });
+
         const dirPlusBtn = document.getElementById('dir-plus-btn');
         const dirMinusBtn = document.getElementById('dir-minus-btn');
         if (dirPlusBtn&&dirMinusBtn) {
@@ -223,15 +268,21 @@ class MotorController {
         if (setStepPeriodBtn) {
             setStepPeriodBtn.onclick = async function () {
                 try {
-                    const period = parseInt(document.getElementById('step-period').value, 20);
-                    if (isNaN(period) || period < 1) {
-                        showMessage('Please enter a valid step period.', 'error');
+                    // Moves start and end at the start period and speed up to the cruise period
+                    const period = parseFloat(document.getElementById('step-period').value);
+                    const minPeriod = parseFloat(document.getElementById('step-min-period').value);
+                    if (isNaN(period) || isNaN(minPeriod) || period <= 0 || minPeriod <= 0) {
+                        showMessage('Please enter valid step periods.', 'error');
+                        return;
+                    }
+                    if (minPeriod > period) {
+                        showMessage('The cruise period cannot be longer than the start period.', 'error');
                         return;
                     }
                     const response = await fetch('/api/set_step_period/', {
                         method: 'POST',
                         headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify({ period_ms: period })
+                        body: JSON.stringify({ period_ms: period, min_period_ms: minPeriod })
                     });
                     if (!response.ok) {
                         const err = await response.text();
@@ -304,6 +355,7 @@ class MotorController {
                 // Manual controls
                 const stepCount = document.getElementById('step-count');
                 const stepPeriod = document.getElementById('step-period');
+                const stepMinPeriod = document.getElementById('step-min-period');
                 const doStepsBtn = document.getElementById('do-steps-btn');
                 const setStepPeriodBtn = document.getElementById('set-step-period-btn');
                 // PWM controls
@@ -318,7 +370,7 @@ class MotorController {
                         }
                     });
                 }
-                setDisabledGroup([stepCount, stepPeriod, doStepsBtn, setStepPeriodBtn], isPwm);
+                setDisabledGroup([stepCount, stepPeriod, stepMinPeriod, doStepsBtn, setStepPeriodBtn], isPwm);
                 setDisabledGroup([pwmFrequency, doStepsPwmBtn], !isPwm);
             }
             pwmToggle.addEventListener('change', function () {
@@ -463,31 +515,37 @@ class MotorController {
             const data = await response.json();
 
             if (response.ok) {
-		// this.updateStatusDisplay(data.motor);
-                // Support both top-level and nested 'motor' keys for metrics
-                const metrics = data;
-                if (metrics.angle !== undefined) {
-                    const angleEl = document.getElementById('m-angle');
-                    if (angleEl) angleEl.textContent = metrics.angle + ' °';
-                }
-                if (metrics.count_rate !== undefined) {
-                    const rateEl = document.getElementById('m-rate');
-                    if (rateEl) rateEl.textContent = metrics.count_rate + ' cpm';
-                }
-                if (metrics.temperature !== undefined) {
-                    const tempEl = document.getElementById('m-temp');
-                    if (tempEl) tempEl.textContent = metrics.temperature.toFixed(1) + ' °C';
-                }
-                if (metrics.step_position !== undefined) {
-                    const posEl = document.getElementById('m-pos');
-                    if (posEl) posEl.textContent = metrics.step_position;
-                }
+                this.renderStatus(data);
             }
         } catch (error) {
             logError('Error updating status:', error);
         }
     }
 
+    renderStatus(changes) {
+        // Status stream messages only carry the fields that changed
+        const metrics = Object.assign(this.status, changes);
+        if (metrics.current_position !== undefined) {
+            const angleEl = document.getElementById('m-angle');
+            if (angleEl) angleEl.textContent = metrics.current_position + ' °';
+        }
+        if (metrics.count_rate !== undefined) {
+            const rateEl = document.getElementById('m-rate');
+            if (rateEl) rateEl.textContent = metrics.count_rate + ' cpm';
+        }
+        if (metrics.temperature !== undefined) {
+            const tempEl = document.getElementById('m-temp');
+            if (tempEl) tempEl.textContent = metrics.temperature.toFixed(1) + ' °C';
+        }
+        if (metrics.steps_done !== undefined) {
+            const posEl = document.getElementById('m-pos');
+            if (posEl) posEl.textContent = metrics.is_moving
+                ? `${metrics.steps_done} / ${metrics.steps_total}`
+                : metrics.steps_done;
+        }
+        this.isMoving = Boolean(metrics.is_moving);
+    }
+
     updateStatusDisplay(motorStatus) {
         // Update position
         const positionEl = document.getElementById('position');
@@ -542,22 +600,100 @@ class MotorController {
     }
 
     startStatusUpdates() {
-        // Update status every 2 seconds
+        // Prefer the push channel; fall back to polling every 2 seconds
+        if (!('WebSocket' in window)) {
+            this.startPolling();
+            return;
+        }
+        const scheme = window.location.protocol === 'https:' ? 'wss' : 'ws';
+        // Resume the log after the last entry shown instead of resending the latest
+        const query = this.lastLogSeq === null ? '' : `?since=${this.lastLogSeq}`;
+        const socket = new WebSocket(`${scheme}://${window.location.host}/ws/status/${query}`);
+        this.statusSocket = socket;
+        socket.onopen = () => this.stopPolling();
+        socket.onmessage = (event) => {
+            const message = JSON.parse(event.data);
+            this.renderStatus(message.status);
+            if (message.logs.length) {
+                this.addLogs(message.logs);
+                this.lastLogSeq = Math.max(this.lastLogSeq ?? 0, message.logs[message.logs.length - 1].seq);
+            }
+        };
+        socket.onclose = () => {
+            // Server without WebSocket support (e.g. runserver) or connection lost
+            this.statusSocket = null;
+            this.startPolling();
+            this.reconnectTimer = setTimeout(() => this.startStatusUpdates(), 30000);
+        };
+    }
+
+    startJog(direction) {
+        // Resend the set-point as a heartbeat; the server stops the motor
+        // by itself if it stops arriving
+        const speed = parseFloat(document.getElementById('jog-speed')?.value) || 2;
+        const frame = JSON.stringify({ velocity: direction * speed });
+        const socket = this.openJogSocket();
+        const send = () => {
+            if (socket.readyState === WebSocket.OPEN) socket.send(frame);
+        };
+        clearInterval(this.jogTimer);
+        this.jogTimer = setInterval(send, 200);
+        send();
+    }
+
+    stopJog() {
+        if (this.jogTimer === null) return;
+        clearInterval(this.jogTimer);
+        this.jogTimer = null;
+        if (this.jogSocket && this.jogSocket.readyState === WebSocket.OPEN) {
+            this.jogSocket.send(JSON.stringify({ velocity: 0 }));
+        }
+    }
+
+    openJogSocket() {
+        if (this.jogSocket && this.jogSocket.readyState <= WebSocket.OPEN) {
+            return this.jogSocket;
+        }
+        const scheme = window.location.protocol === 'https:' ? 'wss' : 'ws';
+        const socket = new WebSocket(`${scheme}://${window.location.host}/ws/jog/`);
+        socket.onmessage = (event) => {
+            this.showMessage(JSON.parse(event.data).error, 'error');
+        };
+        socket.onclose = () => {
+            if (this.jogSocket === socket) this.jogSocket = null;
+        };
+        this.jogSocket = socket;
+        return socket;
+    }
+
+    startPolling() {
+        if (this.updateInterval) return;
         this.updateInterval = setInterval(() => {
             this.updateMotorStatus();
+            this.loadLogs();
         }, 2000);
     }
 
+    stopPolling() {
+        if (this.updateInterval) {
+            clearInterval(this.updateInterval);
+            this.updateInterval = null;
+        }
+    }
+
     async loadLogs() {
         const logsContainer = document.getElementById('logs-container');
         if (!logsContainer) return;
 
         try {
-            const response = await fetch('/api/logs?limit=20');
+            // After the first load only fetch entries newer than the last one seen
+            const query = this.lastLogSeq === null ? 'limit=20' : `since=${this.lastLogSeq}`;
+            const response = await fetch(`/api/logs/?${query}`);
             const data = await response.json();
 
             if (response.ok) {
-                this.displayLogs(data.logs);
+                this.addLogs(data.logs);
+                this.lastLogSeq = data.next_since;
             } else {
                 logsContainer.innerHTML = '<div class="error">Failed to load logs</div>';
             }
@@ -567,6 +703,15 @@ class MotorController {
         }
     }
 
+    addLogs(logs) {
+        if (this.lastLogSeq !== null) {
+            logs = logs.filter(log => log.seq > this.lastLogSeq);
+            if (!logs.length) return;
+        }
+        this.logs = this.logs.concat(logs).slice(-20);
+        this.displayLogs(this.logs);
+    }
+
     displayLogs(logs) {
         const logsContainer = document.getElementById('logs-container');
         if (!logsContainer) return;
@@ -577,15 +722,14 @@ class MotorController {
         }
 
         const logsHTML = logs.map(log => {
-            const [direction, degrees, steps, created_at, username] = log;
-            const date = new Date(created_at);
+            const date = new Date(log.timestamp);
             const timeString = date.toLocaleString();
 
             return `
                 <div class="log-item">
                     <div class="log-info">
-                        <div class="log-direction">${direction.replace('_', ' ')} - ${degrees}°</div>
-                        <div class="log-details">${steps} steps by ${username}</div>
+                        <div class="log-direction">${log.action.replace('_', ' ')} - ${log.position}°</div>
+                        <div class="log-details">${JSON.stringify(log.details)}</div>
                     </div>
                     <div class="log-time">${timeString}</div>
                 </div>
@@ -619,8 +763,13 @@ class MotorController {
     }
 
     destroy() {
-        if (this.updateInterval) {
-            clearInterval(this.updateInterval);
+        this.stopPolling();
+        this.stopJog();
+        if (this.jogSocket) this.jogSocket.close();
+        clearTimeout(this.reconnectTimer);
+        if (this.statusSocket) {
+            this.statusSocket.onclose = null;
+            this.statusSocket.close();
         }
     }
 }
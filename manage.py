@@ -7,6 +7,9 @@ import sys
 def main():
     """Run administrative tasks."""
     os.environ.setdefault("DJANGO_SETTINGS_MODULE", "muon_telescope.settings")
+    if sys.argv[1:2] == ["test"]:
+        # Never replay or rewrite the installation's position journal
+        os.environ["MUON_POSITION_JOURNAL"] = ""
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
@@ -2,6 +2,10 @@
 ASGI config for muon_telescope project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Status push channels (WebSocket and Server-Sent Events) and the jog WebSocket
+are served directly, status long-polls wait here before reaching Django, and
+everything else goes to Django. Run with e.g.
+``uvicorn muon_telescope.asgi:application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -13,4 +17,29 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "muon_telescope.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from muon_telescope.motion import start_journal  # noqa: E402
+
+from muon_telescope.jog import jog_websocket  # noqa: E402
+from muon_telescope.status_stream import (  # noqa: E402
+    LONG_POLL_PATH,
+    long_poll,
+    status_sse,
+    status_websocket,
+)
+
+start_journal()
+
+
+async def application(scope, receive, send):
+    path = scope.get("path")
+    if scope["type"] == "websocket" and path == "/ws/status/":
+        return await status_websocket(scope, receive, send)
+    if scope["type"] == "websocket" and path == "/ws/jog/":
+        return await jog_websocket(scope, receive, send)
+    if scope["type"] == "http" and path == "/api/status/stream/":
+        return await status_sse(scope, receive, send)
+    if scope["type"] == "http" and LONG_POLL_PATH.fullmatch(path):
+        return await long_poll(scope, receive, send, django_application)
+    return await django_application(scope, receive, send)
@@ -0,0 +1,404 @@
+"""
+Benchmarks for the stepping hot path.
+
+For every motion profile this measures
+
+* the achievable pulse rate: the cost of one pass through the pulse loop
+  when no deadline ever has to be waited for, and the rate actually reached
+  when a move is commanded at ``--min-period``;
+* the per-pulse overhead of the GPIO output calls: the same saturated loop
+  run once with the backend's ``step_high``/``step_low`` and once with
+  no-op callables;
+* pulse lateness (p50/p99/max) with the process idle and while HTTP clients
+  hammer the read-only API endpoints. With ``--realtime`` the lateness runs
+  are repeated on a thread in real-time mode (see ``realtime.py``), and the
+  report of which settings took effect is stored with the results.
+
+Results are written as JSON together with the commit, backend and host, and
+can be checked against an earlier run::
+
+    DJANGO_SECRET_KEY=x DJANGO_DB_PATH=/tmp/bench.sqlite3 \\
+        python -m muon_telescope.benchmark --backend sim --output main.json
+    python -m muon_telescope.benchmark --baseline main.json
+
+The default load runs Django in-process, sharing the interpreter with the
+stepping thread like the single-process deployment; ``--url`` loads a running
+server instead.
+
+The motor driver is held disabled (ENABLE high) for the whole run, so the
+step pulses reach the driver pin without turning the motor, and each timed
+move reverses direction so the driver's indexer never drifts more than one
+move away. The enable state and direction are restored afterwards.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+DEFAULT_STEPS = 20_000
+DEFAULT_MIN_PERIOD = 0.000_02  # 50 kHz cruise
+DEFAULT_MAX_PERIOD = 0.001
+DEFAULT_ACCEL = 2_000_000.0
+DEFAULT_CLIENTS = 4
+DEFAULT_TOLERANCE = 0.2
+
+# Read-only endpoints polled by the dashboard
+LOAD_PATHS = ("/api/status/", "/api/motor_busy/", "/api/logs/", "/api/flux/")
+
+# Metric -> (higher is better, smallest absolute change that counts); the
+# floor keeps a few microseconds of scheduler noise from flagging jitter.
+METRICS = {
+    "max_rate_hz": (True, 0),
+    "achieved_hz": (True, 0),
+    "gpio_ns_per_pulse": (False, 0),
+    "idle.p99_us": (False, 50),
+    "load.p99_us": (False, 50),
+    "realtime.idle.p99_us": (False, 50),
+    "realtime.load.p99_us": (False, 50),
+}
+
+
+def _jitter_runs(motor_control, move, clients, url):
+    """Time one move idle and one under HTTP load."""
+    seconds, idle = _timed_move(motor_control, *move)
+    runs = {"achieved_hz": round(move[0] / seconds), "idle": idle}
+    if clients:
+        with HttpLoad(clients, url) as load:
+            _, runs["load"] = _timed_move(motor_control, *move)
+        runs["http_requests_per_s"] = round(load.requests / load.seconds)
+        runs["http_errors"] = load.errors
+    return runs
+
+
+def _in_realtime_thread(motor_control, run):
+    """Call ``run()`` on a new thread in real-time mode; return (report, result)."""
+    outcome = {}
+
+    def target():
+        try:
+            outcome["report"] = motor_control.enter_realtime()
+            outcome["result"] = run()
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, name="benchmark-realtime")
+    thread.start()
+    thread.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["report"], outcome["result"]
+
+
+class _NoWaitScheduler:
+    """Scheduler whose deadlines are always already due."""
+
+    def now(self):
+        return 0
+
+    def wait_until(self, deadline):
+        return 0
+
+
+class _NullOutput:
+    """Stands in for the GPIO backend with do-nothing step callables."""
+
+    def step_high(self):
+        pass
+
+    def step_low(self):
+        pass
+
+
+def _loop_ns_per_pulse(motor_control, delays, output, repeat):
+    """Best-of-``repeat`` ns per pulse of the saturated pulse loop."""
+    from muon_telescope.pulse_scheduler import JitterRecorder
+
+    real_gpio = motor_control.gpio
+    motor_control.gpio = output
+    try:
+        best = None
+        for _ in range(repeat):
+            jitter = JitterRecorder(len(delays))
+            start = time.perf_counter_ns()
+            motor_control._pulse_train(
+                delays, motor_control._NEVER_CANCELLED, _NoWaitScheduler(), jitter
+            )
+            elapsed = time.perf_counter_ns() - start
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        motor_control.gpio = real_gpio
+    return best / len(delays)
+
+
+def _timed_move(motor_control, steps, profile, min_period, max_period, accel):
+    """Run a real move; return (wall seconds, jitter summary).
+
+    Each call reverses the direction of the previous one.
+    """
+    motor_control.set_direction(not motor_control._direction)
+    start = time.perf_counter()
+    motor_control.do_steps(
+        steps,
+        step_delay=max_period,
+        profile=profile,
+        min_step_delay=min_period,
+        accel=accel,
+    )
+    return time.perf_counter() - start, motor_control.motor_state["jitter"]
+
+
+def _django_client():
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "muon_telescope.settings")
+    django.setup()
+    from django.test import Client
+
+    client = Client(SERVER_NAME="localhost")
+    return client.get
+
+
+def _http_client(url):
+    import requests
+
+    session = requests.Session()
+    base = url.rstrip("/")
+    return lambda path: session.get(base + path, timeout=5)
+
+
+class HttpLoad:
+    """Background threads issuing GET requests until stopped."""
+
+    def __init__(self, clients, url=None):
+        self.clients = clients
+        self.url = url
+        self.requests = 0
+        self.errors = 0
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def _run(self):
+        get = _http_client(self.url) if self.url else _django_client()
+        requests = errors = 0
+        while not self._stop.is_set():
+            for path in LOAD_PATHS:
+                try:
+                    if get(path).status_code >= 400:
+                        errors += 1
+                except Exception:
+                    errors += 1
+                requests += 1
+        with self._lock:
+            self.requests += requests
+            self.errors += errors
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        for _ in range(self.clients):
+            thread = threading.Thread(target=self._run, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        time.sleep(0.2)  # Let the clients warm up before timing starts
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self.seconds = time.perf_counter() - self._started
+        return False
+
+
+def run_benchmark(
+    steps=DEFAULT_STEPS,
+    profiles=None,
+    min_period=DEFAULT_MIN_PERIOD,
+    max_period=DEFAULT_MAX_PERIOD,
+    accel=DEFAULT_ACCEL,
+    clients=DEFAULT_CLIENTS,
+    url=None,
+    repeat=3,
+    realtime=False,
+):
+    """Run every measurement and return the results as a dict."""
+    from muon_telescope import motor_control
+    from muon_telescope.motion_profile import PROFILES, delay_table_ns, move_duration
+
+    gpio = motor_control.gpio
+    was_enabled = motor_control.motor_state["is_enabled"]
+    direction = motor_control._direction
+    motor_control.disable_motor()
+    results = {}
+    report = None
+    try:
+        for profile in profiles or PROFILES:
+            params = (min_period, max_period, accel, profile)
+            delays = delay_table_ns(steps, *params)
+            loop_ns = _loop_ns_per_pulse(motor_control, delays, gpio, repeat)
+            null_ns = _loop_ns_per_pulse(motor_control, delays, _NullOutput(), repeat)
+            move = (steps, profile, min_period, max_period, accel)
+            entry = {
+                "loop_ns_per_pulse": round(loop_ns, 1),
+                "max_rate_hz": round(1e9 / loop_ns),
+                "gpio_ns_per_pulse": round(max(0.0, loop_ns - null_ns), 1),
+                "commanded_hz": round(steps / move_duration(steps, *params)),
+            }
+            entry.update(_jitter_runs(motor_control, move, clients, url))
+            if realtime:
+                report, entry["realtime"] = _in_realtime_thread(
+                    motor_control,
+                    lambda: _jitter_runs(motor_control, move, clients, url),
+                )
+            results[profile] = entry
+    finally:
+        motor_control.set_direction(direction)
+        if was_enabled:
+            motor_control.enable_motor()
+    meta = _metadata(gpio)
+    meta["realtime"] = report
+    return {
+        "meta": meta,
+        "params": {
+            "steps": steps,
+            "min_period": min_period,
+            "max_period": max_period,
+            "accel": accel,
+            "clients": clients,
+            "url": url,
+        },
+        "profiles": results,
+    }
+
+
+def _metadata(gpio):
+    root = Path(__file__).resolve().parent.parent
+    try:
+        commit = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "backend": gpio.name,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "node": platform.node(),
+        "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def _metric(entry, name):
+    for key in name.split("."):
+        if not isinstance(entry, dict) or key not in entry:
+            return None
+        entry = entry[key]
+    return entry
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Return ``(rows, regressions)`` comparing two benchmark results.
+
+    Each row is ``(profile, metric, old, new, relative change)``; a metric
+    regresses when it moves the wrong way by more than ``tolerance`` and by
+    more than the metric's noise floor.
+    """
+    rows = []
+    regressions = []
+    for profile, entry in results["profiles"].items():
+        old_entry = baseline["profiles"].get(profile)
+        if old_entry is None:
+            continue
+        for name, (higher_is_better, floor) in METRICS.items():
+            old, new = _metric(old_entry, name), _metric(entry, name)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            row = (profile, name, old, new, change)
+            rows.append(row)
+            worse = -change if higher_is_better else change
+            if worse > tolerance and abs(new - old) > floor:
+                regressions.append(row)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark pulse rate, GPIO overhead and timing jitter."
+    )
+    parser.add_argument(
+        "--backend", help="GPIO backend (default: MUON_GPIO_BACKEND or autodetect)"
+    )
+    parser.add_argument("--steps", type=int, default=DEFAULT_STEPS)
+    parser.add_argument("--profile", action="append", dest="profiles")
+    parser.add_argument("--min-period", type=float, default=DEFAULT_MIN_PERIOD)
+    parser.add_argument("--max-period", type=float, default=DEFAULT_MAX_PERIOD)
+    parser.add_argument("--accel", type=float, default=DEFAULT_ACCEL)
+    parser.add_argument(
+        "--clients",
+        type=int,
+        default=DEFAULT_CLIENTS,
+        help="Concurrent HTTP clients during the load run (0 to skip)",
+    )
+    parser.add_argument("--url", help="Load this server instead of in-process Django")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--realtime",
+        action="store_true",
+        help="Repeat the lateness runs in real-time mode (SCHED_FIFO needs root)",
+    )
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--baseline", help="Compare against an earlier JSON result")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    if args.backend:
+        os.environ["MUON_GPIO_BACKEND"] = args.backend
+    # Never move the journaled position of a real installation
+    os.environ["MUON_POSITION_JOURNAL"] = ""
+
+    results = run_benchmark(
+        steps=args.steps,
+        profiles=args.profiles,
+        min_period=args.min_period,
+        max_period=args.max_period,
+        accel=args.accel,
+        clients=args.clients,
+        url=args.url,
+        repeat=args.repeat,
+        realtime=args.realtime,
+    )
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        rows, regressions = compare(results, baseline, args.tolerance)
+        for row in rows:
+            profile, name, old, new, change = row
+            flag = " REGRESSION" if row in regressions else ""
+            print(
+                f"{profile:12} {name:18} {old:>12} -> {new:>12} {change:+7.1%}{flag}",
+                file=sys.stderr,
+            )
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
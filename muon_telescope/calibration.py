@@ -0,0 +1,21 @@
+"""
+Calibration of the telescope axis.
+
+The single source for how motor steps map to sky angle; the motion code,
+the web app and the hardware test script all import it. Positions are kept
+as integer microsteps and only converted to degrees for display.
+"""
+
+STEPS_PER_REVOLUTION = 9312  # Full steps per revolution of the telescope axis
+MICROSTEPS = 1  # DM556 DIP switch setting
+MICROSTEPS_PER_REV = STEPS_PER_REVOLUTION * MICROSTEPS
+DEGREES_PER_MICROSTEP = 360 / MICROSTEPS_PER_REV
+
+
+def to_microsteps(degrees):
+    """Exact (fractional) microstep count for an angle in degrees."""
+    return degrees * MICROSTEPS_PER_REV / 360
+
+
+def to_degrees(microsteps):
+    return microsteps * 360 / MICROSTEPS_PER_REV
@@ -0,0 +1,179 @@
+"""
+Coincidence finding for scintillator hit streams.
+
+Hits are int64 nanosecond timestamps, one sorted array per channel. A
+coincidence is a hit on the reference channel with a hit on every other
+channel within ``±window_ns``. Matching is done with ``numpy.searchsorted``
+on the sorted arrays, so a run with tens of millions of hits is processed
+in a few vectorized passes instead of a Python loop.
+
+``generate_hits`` produces synthetic runs (correlated muon hits plus
+uncorrelated noise per channel) for tests and benchmarks.
+"""
+
+import numpy as np
+
+DEFAULT_WINDOW_NS = 100
+DEFAULT_DEAD_TIME_NS = 50
+
+
+def split_channels(timestamps, channels, n_channels=None):
+    """Split a merged ``(timestamps, channels)`` stream into sorted per-channel arrays."""
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    channels = np.asarray(channels, dtype=np.uint8)
+    if n_channels is None:
+        n_channels = int(channels.max()) + 1 if channels.size else 0
+    order = np.argsort(channels, kind="stable")
+    counts = np.bincount(channels, minlength=n_channels)
+    per_channel = np.split(timestamps[order], np.cumsum(counts)[:-1])
+    return [np.sort(times, kind="stable") for times in per_channel]
+
+
+def _nearest(times, targets, window_ns):
+    """Index of the hit in ``times`` nearest to each target, or -1 if none is in window."""
+    # Stay in int64: float timestamps lose nanoseconds after ~100 days
+    far = np.iinfo(np.int64).max
+    n = times.size
+    right = np.searchsorted(times, targets, side="left")
+    left = right - 1
+    right_dt = times[np.minimum(right, n - 1)] - targets
+    right_dt[right >= n] = far
+    left_dt = targets - times[np.maximum(left, 0)]
+    left_dt[left < 0] = far
+    best = np.where(left_dt <= right_dt, left, right)
+    best_dt = np.minimum(left_dt, right_dt)
+    return np.where(best_dt <= window_ns, best, -1)
+
+
+def find_coincidences(channel_times, window_ns=DEFAULT_WINDOW_NS, reference=0):
+    """Find hits on ``reference`` with a hit on every other channel within the window.
+
+    Each hit on a non-reference channel is used by at most one coincidence.
+    Returns ``(times, indices)``: the reference timestamps of the
+    coincidences and an ``(n, channels)`` array of the matched hit indices.
+    """
+    if len(channel_times) < 2:
+        raise ValueError("Coincidences need at least two channels")
+    channel_times = [np.asarray(times, dtype=np.int64) for times in channel_times]
+    ref = channel_times[reference]
+    indices = np.empty((ref.size, len(channel_times)), dtype=np.int64)
+    indices[:, reference] = np.arange(ref.size)
+    keep = np.ones(ref.size, dtype=bool)
+    for channel, times in enumerate(channel_times):
+        if channel == reference:
+            continue
+        if times.size == 0:
+            keep[:] = False
+            break
+        match = _nearest(times, ref, window_ns)
+        indices[:, channel] = match
+        keep &= match >= 0
+    indices = indices[keep]
+    for channel in range(len(channel_times)):
+        if channel == reference or not indices.size:
+            continue
+        # Drop reference hits that reuse a hit already taken by an earlier one
+        _, first = np.unique(indices[:, channel], return_index=True)
+        indices = indices[np.sort(first)]
+    return ref[indices[:, reference]], indices
+
+
+def accidental_rate(singles_rates, window_ns=DEFAULT_WINDOW_NS, reference=0):
+    """Expected rate of chance coincidences in Hz.
+
+    A reference hit is accidentally matched when every other channel fires
+    inside its ``2 * window`` span: ``R_ref * prod(2 w R_i)``.
+    """
+    span = 2 * window_ns * 1e-9
+    rate = singles_rates[reference]
+    for channel, singles in enumerate(singles_rates):
+        if channel != reference:
+            rate *= span * singles
+    return rate
+
+
+def dead_time(channel_times, duration_s, dead_time_ns=DEFAULT_DEAD_TIME_NS):
+    """Per-channel dead-time estimate for a non-paralyzable discriminator.
+
+    Returns ``(dead_fraction, corrected_rates)``: the fraction of the run
+    each channel was dead (``m * tau``) and the true singles rate
+    ``m / (1 - m * tau)``.
+    """
+    tau = dead_time_ns * 1e-9
+    measured = np.array([times.size / duration_s for times in channel_times])
+    fraction = np.minimum(measured * tau, 1.0)
+    with np.errstate(divide="ignore"):
+        corrected = np.where(fraction < 1.0, measured / (1.0 - fraction), np.inf)
+    return fraction, corrected
+
+
+def analyze_run(
+    channel_times,
+    window_ns=DEFAULT_WINDOW_NS,
+    dead_time_ns=DEFAULT_DEAD_TIME_NS,
+    duration_s=None,
+    reference=0,
+):
+    """Find coincidences and summarize rates, accidentals and dead time."""
+    channel_times = [np.asarray(times, dtype=np.int64) for times in channel_times]
+    if duration_s is None:
+        starts = [times[0] for times in channel_times if times.size]
+        ends = [times[-1] for times in channel_times if times.size]
+        duration_s = (max(ends) - min(starts)) * 1e-9 if starts else 0.0
+    if duration_s <= 0:
+        raise ValueError("Run duration must be positive")
+    times, indices = find_coincidences(channel_times, window_ns, reference)
+    singles = [times_.size / duration_s for times_ in channel_times]
+    fraction, corrected = dead_time(channel_times, duration_s, dead_time_ns)
+    accidentals = accidental_rate(singles, window_ns, reference)
+    rate = times.size / duration_s
+    return {
+        "times": times,
+        "indices": indices,
+        "coincidences": int(times.size),
+        "duration_s": duration_s,
+        "rate_hz": rate,
+        "rate_error_hz": np.sqrt(times.size) / duration_s,
+        "singles_hz": singles,
+        "accidental_rate_hz": accidentals,
+        "true_rate_hz": max(rate - accidentals, 0.0),
+        "dead_fraction": fraction.tolist(),
+        "corrected_singles_hz": corrected.tolist(),
+    }
+
+
+def generate_hits(
+    duration_s,
+    muon_rate_hz=1.0,
+    noise_rates_hz=(50.0, 50.0),
+    jitter_ns=5.0,
+    delays_ns=None,
+    start_ns=0,
+    seed=None,
+):
+    """Synthesize a run: muons hit every channel, noise hits each channel alone.
+
+    ``noise_rates_hz`` sets the number of channels. Returns the merged,
+    time-ordered ``(timestamps, channels)`` stream and the muon arrival times.
+    """
+    rng = np.random.default_rng(seed)
+    n_channels = len(noise_rates_hz)
+    span = int(duration_s * 1e9)
+    muons = np.sort(
+        rng.integers(0, span, rng.poisson(muon_rate_hz * duration_s), dtype=np.int64)
+    )
+    delays = delays_ns if delays_ns is not None else [0] * n_channels
+    stamps = []
+    labels = []
+    for channel, noise in enumerate(noise_rates_hz):
+        smear = np.rint(rng.normal(0.0, jitter_ns, muons.size)).astype(np.int64)
+        noise_hits = rng.integers(
+            0, span, rng.poisson(noise * duration_s), dtype=np.int64
+        )
+        hits = np.concatenate((muons + smear + delays[channel], noise_hits))
+        stamps.append(hits)
+        labels.append(np.full(hits.size, channel, dtype=np.uint8))
+    timestamps = np.concatenate(stamps) + start_ns
+    channels = np.concatenate(labels)
+    order = np.argsort(timestamps, kind="stable")
+    return timestamps[order], channels[order], muons + start_ns
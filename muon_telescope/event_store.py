@@ -0,0 +1,188 @@
+"""
+Append-only columnar store for detector hits.
+
+A store is a directory with one file per column plus a sidecar index::
+
+    timestamps.i64   int64 nanosecond timestamps, little-endian
+    channels.u8      uint8 channel ids
+    index.jsonl      one record per chunk: run, angle, time range, offsets
+
+Hits are appended in chunks of at most ``CHUNK_ROWS`` rows, each sorted by
+time. The column data is written before its index record, so a crash never
+leaves the index pointing past the end of the data; the next append cuts
+off any unindexed tail. Readers map the column files with ``numpy.memmap``
+and use the index to slice out just the chunks (and the time range within
+them) they need, without copying.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+CHUNK_ROWS = 1 << 20
+TIMESTAMP_DTYPE = np.dtype("<i8")
+CHANNEL_DTYPE = np.dtype("u1")
+
+
+class EventStore:
+    """Columnar hit store rooted at directory ``path``."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.timestamps_path = self.path / "timestamps.i64"
+        self.channels_path = self.path / "channels.u8"
+        self.index_path = self.path / "index.jsonl"
+        for path in (self.timestamps_path, self.channels_path, self.index_path):
+            path.touch()
+        self._lock = threading.Lock()
+        self._index = None
+        self._index_size = -1
+        self._index_valid = 0  # Bytes of the sidecar holding complete records
+        self._maps = {}
+
+    def append(self, run, angle, timestamps, channels):
+        """Append hits taken in ``run`` at ``angle`` degrees; returns rows written."""
+        timestamps = np.asarray(timestamps, dtype=TIMESTAMP_DTYPE)
+        channels = np.asarray(channels, dtype=CHANNEL_DTYPE)
+        if timestamps.shape != channels.shape:
+            raise ValueError("timestamps and channels must have the same length")
+        order = np.argsort(timestamps, kind="stable")
+        timestamps, channels = timestamps[order], channels[order]
+        with self._lock:
+            row = self._truncate_to_index()
+            records = []
+            with open(self.timestamps_path, "ab") as ts_file, open(
+                self.channels_path, "ab"
+            ) as ch_file:
+                for start in range(0, timestamps.size, CHUNK_ROWS):
+                    ts = timestamps[start : start + CHUNK_ROWS]
+                    ts_file.write(ts.tobytes())
+                    ch_file.write(channels[start : start + CHUNK_ROWS].tobytes())
+                    records.append(
+                        {
+                            "run": run,
+                            "angle": angle,
+                            "start_ns": int(ts[0]),
+                            "end_ns": int(ts[-1]),
+                            "row": row + start,
+                            "rows": int(ts.size),
+                        }
+                    )
+                for f in (ts_file, ch_file):
+                    f.flush()
+                    os.fsync(f.fileno())
+            with open(self.index_path, "a") as index_file:
+                index_file.writelines(
+                    json.dumps(record, separators=(",", ":")) + "\n"
+                    for record in records
+                )
+                index_file.flush()
+                os.fsync(index_file.fileno())
+        return timestamps.size
+
+    def _truncate_to_index(self):
+        """Drop column bytes not covered by the index (a torn append); return rows."""
+        index = self.index()
+        rows = index[-1]["row"] + index[-1]["rows"] if index else 0
+        if self._index_size != self._index_valid:
+            os.truncate(self.index_path, self._index_valid)
+        for path, dtype in (
+            (self.timestamps_path, TIMESTAMP_DTYPE),
+            (self.channels_path, CHANNEL_DTYPE),
+        ):
+            if path.stat().st_size != rows * dtype.itemsize:
+                os.truncate(path, rows * dtype.itemsize)
+        return rows
+
+    def index(self):
+        """Return the chunk records, re-reading the sidecar only when it grew."""
+        size = self.index_path.stat().st_size
+        if size != self._index_size:
+            records = []
+            valid = 0
+            with open(self.index_path, "rb") as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError
+                        records.append(json.loads(line))
+                    except ValueError:
+                        break  # Torn final record
+                    valid += len(line)
+            self._index, self._index_size, self._index_valid = records, size, valid
+        return self._index
+
+    def runs(self):
+        return sorted({record["run"] for record in self.index()})
+
+    def angles(self, run=None):
+        return sorted(
+            {r["angle"] for r in self.index() if run is None or r["run"] == run}
+        )
+
+    def find(self, run=None, angle=None, start_ns=None, end_ns=None):
+        """Index records overlapping the given run, angle and time range."""
+
+        def matches(record):
+            if run is not None and record["run"] != run:
+                return False
+            if angle is not None and record["angle"] != angle:
+                return False
+            if start_ns is not None and record["end_ns"] < start_ns:
+                return False
+            return end_ns is None or record["start_ns"] < end_ns
+
+        return [record for record in self.index() if matches(record)]
+
+    def byte_range(self, record):
+        """``(timestamps, channels)`` byte offsets ``(start, stop)`` of a chunk."""
+        first, last = record["row"], record["row"] + record["rows"]
+        return (
+            (first * TIMESTAMP_DTYPE.itemsize, last * TIMESTAMP_DTYPE.itemsize),
+            (first * CHANNEL_DTYPE.itemsize, last * CHANNEL_DTYPE.itemsize),
+        )
+
+    def _column(self, path, dtype):
+        size = path.stat().st_size
+        cached = self._maps.get(path)
+        if cached is None or cached[0] != size:
+            if size == 0:
+                data = np.empty(0, dtype=dtype)
+            else:
+                data = np.memmap(path, dtype=dtype, mode="r")
+            cached = self._maps[path] = (size, data)
+        return cached[1]
+
+    def chunks(self, run=None, angle=None, start_ns=None, end_ns=None):
+        """Yield ``(record, timestamps, channels)`` zero-copy views per chunk.
+
+        Views are trimmed to ``start_ns <= t < end_ns``.
+        """
+        timestamps = self._column(self.timestamps_path, TIMESTAMP_DTYPE)
+        channels = self._column(self.channels_path, CHANNEL_DTYPE)
+        for record in self.find(run, angle, start_ns, end_ns):
+            first = record["row"]
+            ts = timestamps[first : first + record["rows"]]
+            lo = 0 if start_ns is None else np.searchsorted(ts, start_ns, "left")
+            hi = ts.size if end_ns is None else np.searchsorted(ts, end_ns, "left")
+            yield record, ts[lo:hi], channels[first + lo : first + hi]
+
+    def read(self, run=None, angle=None, start_ns=None, end_ns=None):
+        """Return matching ``(timestamps, channels)`` as arrays.
+
+        A single matching chunk is returned as memmap views; several are
+        concatenated.
+        """
+        parts = [(ts, ch) for _, ts, ch in self.chunks(run, angle, start_ns, end_ns)]
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            return np.empty(0, TIMESTAMP_DTYPE), np.empty(0, CHANNEL_DTYPE)
+        return (
+            np.concatenate([ts for ts, _ in parts]),
+            np.concatenate([ch for _, ch in parts]),
+        )
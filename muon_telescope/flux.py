@@ -0,0 +1,174 @@
+"""
+Incremental angular coincidence-rate histogram.
+
+Coincidence counts and live time are accumulated per angle bin as they
+arrive, so a request never rescans raw data. Rates carry Poisson errors
+(``sqrt(N) / T``) and are fitted with ``I(θ) = I0 cos^n θ`` by weighted
+least squares on ``ln I = ln I0 + n ln cos θ`` (weight ``N`` per bin, the
+inverse variance of ``ln I``).
+
+Every update bumps ``version``; the summary and its JSON and binary
+encodings are computed at most once per version.
+"""
+
+import json
+import math
+import struct
+import threading
+
+import numpy as np
+
+from muon_telescope.coincidence import DEFAULT_WINDOW_NS, analyze_run, split_channels
+from muon_telescope.observation_plan import ANGLE_LIMIT
+
+# magic, version, bins, bin width, I0, I0 error, n, n error, chi²
+BINARY_HEADER = struct.Struct("<4sQHdddddd")
+# per bin: angle, rate, rate error, live time, counts
+BINARY_BIN = struct.Struct("<ffffI")
+BINARY_MAGIC = b"FLUX"
+
+
+class FluxHistogram:
+    """Coincidence counts and live time per angle bin."""
+
+    def __init__(self, bin_width=5.0, limit=ANGLE_LIMIT):
+        self.bin_width = bin_width
+        self.limit = limit
+        n_bins = math.ceil(2 * limit / bin_width)
+        self.centers = -limit + bin_width * (np.arange(n_bins) + 0.5)
+        self.counts = np.zeros(n_bins, dtype=np.int64)
+        self.live_time = np.zeros(n_bins)
+        self.version = 0
+        self._lock = threading.Lock()
+        self._cache = {}
+
+    def bin_index(self, angle):
+        if not -self.limit <= angle <= self.limit:
+            raise ValueError(f"Angle {angle:g} is outside ±{self.limit}°")
+        index = int((angle + self.limit) // self.bin_width)
+        return min(index, self.counts.size - 1)
+
+    def add(self, angle, coincidences, live_time):
+        """Add ``coincidences`` counted over ``live_time`` seconds at ``angle``."""
+        if coincidences < 0 or live_time < 0:
+            raise ValueError("Counts and live time must not be negative")
+        index = self.bin_index(angle)
+        with self._lock:
+            self.counts[index] += coincidences
+            self.live_time[index] += live_time
+            self.version += 1
+
+    def add_hits(self, angle, timestamps, channels, duration_s, window_ns=None):
+        """Run coincidence finding on raw hits and add the result."""
+        result = analyze_run(
+            split_channels(timestamps, channels),
+            window_ns=window_ns or DEFAULT_WINDOW_NS,
+            duration_s=duration_s,
+        )
+        self.add(angle, result["coincidences"], duration_s)
+        return result
+
+    def summary(self):
+        """Rates, errors and the cos^n fit for the current version."""
+        return self._cached("summary", self._summarize)
+
+    def to_json(self):
+        return self._cached(
+            "json",
+            lambda: json.dumps(self.summary(), separators=(",", ":")).encode(),
+        )
+
+    def to_binary(self):
+        """Packed little-endian payload: ``BINARY_HEADER`` then ``BINARY_BIN`` rows."""
+        return self._cached("binary", self._pack)
+
+    def _cached(self, key, build):
+        version = self.version
+        cached = self._cache.get(key)
+        if cached is None or cached[0] != version:
+            cached = self._cache[key] = (version, build())
+        return cached[1]
+
+    def _summarize(self):
+        with self._lock:
+            counts = self.counts.copy()
+            live_time = self.live_time.copy()
+            version = self.version
+        measured = live_time > 0
+        rates = np.zeros_like(live_time)
+        errors = np.zeros_like(live_time)
+        rates[measured] = counts[measured] / live_time[measured]
+        errors[measured] = np.sqrt(counts[measured]) / live_time[measured]
+        bins = [
+            {
+                "angle": float(center),
+                "counts": int(n),
+                "live_time": float(t),
+                "rate": float(rate) if t else None,
+                "error": float(error) if t else None,
+            }
+            for center, n, t, rate, error in zip(
+                self.centers, counts, live_time, rates, errors
+            )
+        ]
+        return {
+            "version": version,
+            "bin_width": self.bin_width,
+            "bins": bins,
+            "fit": fit_cos_power(self.centers, counts, live_time),
+        }
+
+    def _pack(self):
+        summary = self.summary()
+        fit = summary["fit"] or {}
+        header = BINARY_HEADER.pack(
+            BINARY_MAGIC,
+            summary["version"],
+            len(summary["bins"]),
+            self.bin_width,
+            *(
+                fit.get(key, math.nan)
+                for key in ("i0", "i0_error", "n", "n_error", "chi2")
+            ),
+        )
+        rows = b"".join(
+            BINARY_BIN.pack(
+                b["angle"],
+                b["rate"] or 0.0,
+                b["error"] or 0.0,
+                b["live_time"],
+                b["counts"],
+            )
+            for b in summary["bins"]
+        )
+        return header + rows
+
+
+def fit_cos_power(angles, counts, live_time):
+    """Fit ``rate = I0 cos^n θ``; returns None with fewer than two usable bins."""
+    angles = np.asarray(angles, dtype=float)
+    counts = np.asarray(counts, dtype=float)
+    live_time = np.asarray(live_time, dtype=float)
+    cos = np.cos(np.radians(angles))
+    use = (counts > 0) & (live_time > 0) & (cos > 0)
+    x = np.log(cos[use])
+    if x.size < 2 or np.ptp(x) == 0:
+        return None
+    y = np.log(counts[use] / live_time[use])
+    w = counts[use]
+    total = w.sum()
+    x_mean = (w * x).sum() / total
+    y_mean = (w * y).sum() / total
+    sxx = (w * (x - x_mean) ** 2).sum()
+    n = (w * (x - x_mean) * (y - y_mean)).sum() / sxx
+    ln_i0 = y_mean - n * x_mean
+    i0 = math.exp(ln_i0)
+    chi2 = float((w * (y - ln_i0 - n * x) ** 2).sum())
+    return {
+        "i0": i0,
+        "i0_error": i0 * math.sqrt(1 / total + x_mean**2 / sxx),
+        "n": float(n),
+        "n_error": math.sqrt(1 / sxx),
+        "chi2": chi2,
+        "dof": int(x.size - 2),
+    }
@@ -0,0 +1,200 @@
+"""
+GPIO backends for the stepper driver.
+
+Every backend exposes the same small interface: ``setup()`` claims the
+ENABLE/DIR/STEP lines, ``write()``/``write_lines()`` set one or several lines,
+and ``step_high``/``step_low`` are prebound callables for the per-pulse hot
+path so the stepping loop does no attribute lookups or argument packing.
+
+Each backend also hands out the ``PulseScheduler`` that times its pulses,
+so the simulator can run moves on a virtual clock.
+
+The backend is chosen with the ``MUON_GPIO_BACKEND`` environment variable
+(``rpi``, ``gpiod``, ``sim`` or ``virtual``). Without it RPi.GPIO is used
+when available and the recording simulator otherwise.
+"""
+
+import os
+import time
+from collections import deque
+from functools import partial
+
+from muon_telescope.pulse_scheduler import PulseScheduler, VirtualClock
+
+LOW = 0
+HIGH = 1
+
+
+class GPIOBackend:
+    """Interface shared by all GPIO backends."""
+
+    name = "base"
+
+    def setup(self, enable_pin, dir_pin, step_pin):
+        raise NotImplementedError
+
+    def write(self, pin, value):
+        raise NotImplementedError
+
+    def write_lines(self, values):
+        """Set several lines at once; ``values`` maps pin -> level."""
+        for pin, value in values.items():
+            self.write(pin, value)
+
+    def cleanup(self):
+        pass
+
+    def now(self):
+        """Current time in ns on the clock pulses are scheduled against."""
+        return time.perf_counter_ns()
+
+    def scheduler(self):
+        return PulseScheduler()
+
+
+class RPiGPIOBackend(GPIOBackend):
+    """RPi.GPIO (sysfs/mmap) backend."""
+
+    name = "rpi"
+
+    def __init__(self):
+        import RPi.GPIO
+
+        self.GPIO = RPi.GPIO
+
+    def setup(self, enable_pin, dir_pin, step_pin):
+        GPIO = self.GPIO
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setup([enable_pin, dir_pin, step_pin], GPIO.OUT)
+        self.step_high = partial(GPIO.output, step_pin, GPIO.HIGH)
+        self.step_low = partial(GPIO.output, step_pin, GPIO.LOW)
+
+    def write(self, pin, value):
+        self.GPIO.output(pin, value)
+
+    def write_lines(self, values):
+        self.GPIO.output(list(values), list(values.values()))
+
+    def cleanup(self):
+        self.GPIO.cleanup()
+
+
+class GpiodBackend(GPIOBackend):
+    """Linux GPIO character-device backend (libgpiod v2 bindings).
+
+    All three lines are held by a single line request, so ``write_lines``
+    changes DIR/STEP/EN with one ioctl.
+    """
+
+    name = "gpiod"
+
+    def __init__(self, chip_path=None):
+        import gpiod
+        from gpiod.line import Direction, Value
+
+        self.gpiod = gpiod
+        self.Direction = Direction
+        self.values = (Value.INACTIVE, Value.ACTIVE)
+        self.chip_path = chip_path or os.environ.get("MUON_GPIO_CHIP", "/dev/gpiochip0")
+        self.request = None
+
+    def setup(self, enable_pin, dir_pin, step_pin):
+        settings = self.gpiod.LineSettings(
+            direction=self.Direction.OUTPUT, output_value=self.values[LOW]
+        )
+        self.request = self.gpiod.request_lines(
+            self.chip_path,
+            consumer="muon-telescope",
+            config={(enable_pin, dir_pin, step_pin): settings},
+        )
+        self.step_high = partial(self.request.set_value, step_pin, self.values[HIGH])
+        self.step_low = partial(self.request.set_value, step_pin, self.values[LOW])
+
+    def write(self, pin, value):
+        self.request.set_value(pin, self.values[value])
+
+    def write_lines(self, values):
+        self.request.set_values(
+            {pin: self.values[value] for pin, value in values.items()}
+        )
+
+    def cleanup(self):
+        if self.request is not None:
+            self.request.release()
+            self.request = None
+
+
+class SimulatedBackend(GPIOBackend):
+    """Backend that records line transitions instead of driving hardware."""
+
+    name = "sim"
+
+    def __init__(self, clock=time.perf_counter_ns, history=100_000):
+        self.clock = clock
+        self.levels = {}
+        self.transitions = deque(maxlen=history)
+        self.pulses = 0
+        self.step_pin = None
+
+    def setup(self, enable_pin, dir_pin, step_pin):
+        self.step_pin = step_pin
+        self.levels = {enable_pin: LOW, dir_pin: LOW, step_pin: LOW}
+        self.step_high = partial(self.write, step_pin, HIGH)
+        self.step_low = partial(self.write, step_pin, LOW)
+
+    def write(self, pin, value):
+        if pin == self.step_pin and value and not self.levels.get(pin):
+            self.pulses += 1
+        self.levels[pin] = value
+        self.transitions.append((self.clock(), pin, value))
+
+    def reset(self):
+        """Forget recorded transitions and the pulse counter."""
+        self.transitions.clear()
+        self.pulses = 0
+
+    def now(self):
+        return self.clock()
+
+    def scheduler(self):
+        return PulseScheduler(clock=self.clock)
+
+
+class VirtualTimeBackend(SimulatedBackend):
+    """Simulator on a virtual clock: moves take no wall time.
+
+    Transitions are stamped with the virtual time they would have happened
+    at, so tests can check pulse counts and timing of minutes-long moves in
+    milliseconds.
+    """
+
+    name = "virtual"
+
+    def __init__(self, history=100_000):
+        self.virtual_clock = VirtualClock()
+        super().__init__(clock=self.virtual_clock.now, history=history)
+
+    def scheduler(self):
+        clock = self.virtual_clock
+        return PulseScheduler(spin_ns=0, clock=clock.now, sleep=clock.sleep)
+
+
+BACKENDS = {
+    RPiGPIOBackend.name: RPiGPIOBackend,
+    GpiodBackend.name: GpiodBackend,
+    SimulatedBackend.name: SimulatedBackend,
+    VirtualTimeBackend.name: VirtualTimeBackend,
+}
+
+
+def load_backend(name=None):
+    """Instantiate the configured backend, falling back to the simulator."""
+    name = name or os.environ.get("MUON_GPIO_BACKEND")
+    if name:
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown GPIO backend: {name}")
+        return BACKENDS[name]()
+    try:
+        return RPiGPIOBackend()
+    except (ImportError, RuntimeError):
+        return SimulatedBackend()
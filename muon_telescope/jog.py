@@ -0,0 +1,90 @@
+"""
+Jog mode over a WebSocket, for manual alignment.
+
+Served directly from the ASGI application at ``/ws/jog/`` (see ``asgi.py``).
+The client sends one small text frame per update::
+
+    {"velocity": -1.5}
+
+in degrees per second, positive raising the angle and 0 to stop. The motor
+ramps to each new set-point and keeps moving without further requests, but
+the set-point lapses after ``motor_control.JOG_TIMEOUT`` seconds: a client
+that is still jogging resends it as a heartbeat, and if the heartbeat stops
+(a closed tab, a dropped link) the motor ramps down to rest on its own.
+
+The Django session is checked once, when the connection opens; frames that
+cannot be used are answered with ``{"error": "..."}``.
+"""
+
+import asyncio
+import json
+from importlib import import_module
+from urllib.parse import urlsplit
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.http import HttpRequest
+from django.http.cookie import parse_cookie
+
+from muon_telescope.motion import jog
+
+# Close code for connections without a logged-in session
+CLOSE_FORBIDDEN = 4403
+
+
+def _session_user(headers):
+    """Return the user of the session cookie in ``headers``."""
+    cookies = parse_cookie(headers.get(b"cookie", b"").decode("latin-1"))
+    engine = import_module(settings.SESSION_ENGINE)
+    request = HttpRequest()
+    request.session = engine.SessionStore(cookies.get(settings.SESSION_COOKIE_NAME))
+    return get_user(request)
+
+
+def _same_origin(headers):
+    """Reject pages on other sites opening a socket with our cookies."""
+    origin = headers.get(b"origin")
+    if origin is None:
+        return True  # Not a browser
+    host = headers.get(b"host", b"").decode("latin-1")
+    return urlsplit(origin.decode("latin-1")).netloc == host
+
+
+def parse_setpoint(text):
+    """Return the velocity of a ``{"velocity": ...}`` frame; raises ValueError."""
+    try:
+        return float(json.loads(text)["velocity"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('Expected {"velocity": degrees per second}')
+
+
+async def jog_websocket(scope, receive, send):
+    """ASGI handler for ``/ws/jog/``."""
+    if (await receive())["type"] != "websocket.connect":
+        return
+    headers = dict(scope.get("headers", []))
+    user = await sync_to_async(_session_user)(headers)
+    if not user.is_authenticated or not _same_origin(headers):
+        await send({"type": "websocket.close", "code": CLOSE_FORBIDDEN})
+        return
+    await send({"type": "websocket.accept"})
+    updates = 0
+    try:
+        while True:
+            message = await receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            try:
+                await asyncio.to_thread(jog, parse_setpoint(message.get("text")))
+            except ValueError as e:
+                error = json.dumps({"error": str(e)})
+                await send({"type": "websocket.send", "text": error})
+                continue
+            updates += 1
+    finally:
+        await asyncio.to_thread(jog, 0.0)
+        if updates:
+            from control.services import log_movement
+
+            await asyncio.to_thread(log_movement, "jog", {"updates": updates})
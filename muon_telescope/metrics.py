@@ -0,0 +1,161 @@
+"""
+Prometheus text exposition for ``/metrics``.
+
+``MetricsMiddleware`` times every request into a per-view latency histogram
+and tracks requests in flight. Motion metrics (position, enabled/moving,
+queue depth, steps issued, pulse lateness) are read from the motor state at
+scrape time, so nothing is added per pulse: the step counter advances at
+every ``PROGRESS_STRIDE`` callback, while the lateness histogram only takes
+in a move's jitter summary when the move ends.
+
+HTTP counters are updated under one lock: ``x += 1`` is a separate read and
+write even under the GIL, so concurrent requests would otherwise lose
+updates. The lock is held for a few additions per request, and a scrape
+copies the counters under it.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+from muon_telescope.pulse_scheduler import HISTOGRAM_EDGES_US
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request latency bucket upper bounds, in seconds
+REQUEST_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LATENESS_BUCKETS = tuple(edge / 1e6 for edge in HISTOGRAM_EDGES_US)
+
+# Label for requests that did not resolve to a view (404s, static files)
+UNMATCHED = "unmatched"
+
+
+class Histogram:
+    """Fixed-bucket histogram; ``counts`` has one extra slot for +Inf."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+request_latency = {}  # view name -> Histogram
+in_flight = 0
+_lock = threading.Lock()  # Guards request_latency and in_flight
+
+
+def observe_request(view, seconds):
+    with _lock:
+        histogram = request_latency.get(view)
+        if histogram is None:
+            histogram = request_latency[view] = Histogram(REQUEST_BUCKETS)
+        histogram.observe(seconds)
+
+
+def _track_in_flight(delta):
+    global in_flight
+    with _lock:
+        in_flight += delta
+
+
+class MetricsMiddleware:
+    """Record latency per resolved view and the number of requests in flight."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _track_in_flight(1)
+        started = time.perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            _track_in_flight(-1)
+            match = getattr(request, "resolver_match", None)
+            view = match.view_name if match is not None else UNMATCHED
+            observe_request(view, time.perf_counter() - started)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _header(lines, name, kind, help_text):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def _histogram_lines(lines, name, buckets, counts, total, labels=None):
+    labels = labels or {}
+    cumulative = 0
+    for bound, count in zip(buckets, counts):
+        cumulative += count
+        le = _labels({**labels, "le": f"{bound:g}"})
+        lines.append(f"{name}_bucket{le} {cumulative}")
+    cumulative += counts[-1]
+    lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {cumulative}")
+    lines.append(f"{name}_sum{_labels(labels)} {total:.9g}")
+    lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+
+
+def render(state, queue_depth):
+    """Return the exposition text for the motor ``state`` and HTTP metrics."""
+    lines = []
+    _header(
+        lines,
+        "muon_http_request_duration_seconds",
+        "histogram",
+        "Request latency by view.",
+    )
+    with _lock:
+        latency = [
+            (view, histogram.buckets, list(histogram.counts), histogram.sum)
+            for view, histogram in sorted(request_latency.items())
+        ]
+        requests_in_flight = in_flight
+    for view, buckets, counts, total in latency:
+        _histogram_lines(
+            lines,
+            "muon_http_request_duration_seconds",
+            buckets,
+            counts,
+            total,
+            {"view": view},
+        )
+    _header(lines, "muon_http_requests_in_flight", "gauge", "Requests being served.")
+    lines.append(f"muon_http_requests_in_flight {requests_in_flight}")
+
+    gauges = (
+        ("muon_motor_position_degrees", "Current angle.", state["current_position"]),
+        ("muon_motor_enabled", "1 when the driver is enabled.", state["is_enabled"]),
+        ("muon_motor_moving", "1 while a move is running.", state["is_moving"]),
+        ("muon_motion_queue_depth", "Jobs waiting to run.", queue_depth),
+    )
+    for name, help_text, value in gauges:
+        _header(lines, name, "gauge", help_text)
+        lines.append(f"{name} {float(value)}")
+
+    stats = state["pulse_stats"]
+    _header(lines, "muon_motor_steps_total", "counter", "Step pulses issued.")
+    lines.append(f"muon_motor_steps_total {stats['steps']}")
+    _header(
+        lines,
+        "muon_step_lateness_seconds",
+        "histogram",
+        "How late each step pulse fired; updated when a move ends.",
+    )
+    _histogram_lines(
+        lines,
+        "muon_step_lateness_seconds",
+        LATENESS_BUCKETS,
+        stats["lateness_buckets"],
+        stats["lateness_sum_us"] / 1e6,
+    )
+    return "\n".join(lines) + "\n"
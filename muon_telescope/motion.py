@@ -0,0 +1,69 @@
+"""
+Motion API used by the web app.
+
+With ``MUON_MOTION_SOCKET`` set, calls go to the standalone motion daemon
+(``python -m muon_telescope.motion_daemon``) and the web process never
+imports the GPIO code. Without it the motor is driven in-process, as before.
+"""
+
+import os
+
+if os.environ.get("MUON_MOTION_SOCKET"):
+    from muon_telescope.motion_client import (  # noqa: F401
+        cancel_job,
+        cancel_plan,
+        disable_motor,
+        enable_motor,
+        get_job,
+        get_plan,
+        get_state,
+        get_state_version,
+        is_motor_busy,
+        jog,
+        list_jobs,
+        notify_state_change,
+        pause_motion,
+        resume_motion,
+        set_direction,
+        status_snapshot,
+        stop_motion,
+        submit_move,
+        submit_plan,
+        submit_target,
+        update_state,
+        wait_for_state_change,
+    )
+
+    MOTION_DAEMON = True
+
+    def start_journal():
+        """The daemon keeps the position journal."""
+
+else:
+    from muon_telescope.motor_control import (  # noqa: F401
+        cancel_job,
+        cancel_plan,
+        disable_motor,
+        enable_motor,
+        get_job,
+        get_plan,
+        get_state,
+        get_state_version,
+        is_motor_busy,
+        jog,
+        list_jobs,
+        notify_state_change,
+        pause_motion,
+        resume_motion,
+        set_direction,
+        start_journal,
+        status_snapshot,
+        stop_motion,
+        submit_move,
+        submit_plan,
+        submit_target,
+        update_state,
+        wait_for_state_change,
+    )
+
+    MOTION_DAEMON = False
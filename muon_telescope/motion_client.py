@@ -0,0 +1,231 @@
+"""
+Client for the motion daemon.
+
+Mirrors the public functions of ``motor_control`` but forwards every call to
+the daemon over its Unix socket, so web workers never touch the GPIO lines.
+Each thread keeps one persistent connection and reconnects before a call if
+the daemon was restarted in between. Only read-only requests are resent when
+the connection drops mid-call: a move or stop may already have been carried
+out, so those fail with MotionDaemonError instead of running twice.
+"""
+
+import os
+import socket
+import threading
+
+from muon_telescope.motion_protocol import (
+    F64,
+    I64,
+    OP_BUSY,
+    OP_CANCEL,
+    OP_CANCEL_PLAN,
+    OP_DIRECTION,
+    OP_DISABLE,
+    OP_ENABLE,
+    OP_GET_JOB,
+    OP_GET_PLAN,
+    OP_GET_STATE,
+    OP_JOG,
+    OP_LIST_JOBS,
+    OP_NOTIFY,
+    OP_PAUSE,
+    OP_RESUME,
+    OP_STATUS,
+    OP_STOP,
+    OP_SUBMIT,
+    OP_SUBMIT_PLAN,
+    OP_SUBMIT_TARGET,
+    OP_UPDATE_STATE,
+    OP_VERSION,
+    OP_WAIT,
+    REPLY_OK,
+    U8,
+    U64,
+    WAIT,
+    MotionDaemonError,
+    dump_json,
+    load_json,
+    recv_frame,
+    send_frame,
+    unpack_status,
+)
+
+SOCKET_PATH = os.environ.get("MUON_MOTION_SOCKET", "/tmp/muon-motion.sock")
+CONNECT_TIMEOUT = 2.0
+
+# Errors the daemon reports that map back onto the local exception types
+_ERRORS = {
+    "ValueError": ValueError,
+    "KeyError": KeyError,
+    "TypeError": TypeError,
+    "RuntimeError": RuntimeError,
+}
+
+# Requests that are safe to send again if the connection drops before the reply
+_READ_ONLY = frozenset(
+    {
+        OP_STATUS,
+        OP_VERSION,
+        OP_WAIT,
+        OP_BUSY,
+        OP_GET_JOB,
+        OP_LIST_JOBS,
+        OP_GET_STATE,
+        OP_GET_PLAN,
+    }
+)
+
+_local = threading.local()
+
+
+def _connect():
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    sock.connect(SOCKET_PATH)
+    sock.settimeout(None)
+    _local.sock = sock
+    return sock
+
+
+def _disconnect():
+    sock = getattr(_local, "sock", None)
+    if sock is not None:
+        sock.close()
+        _local.sock = None
+
+
+def _closed_by_peer(sock):
+    """True if the daemon hung up on ``sock`` since its last reply."""
+    try:
+        return sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) == b""
+    except BlockingIOError:
+        return False
+    except OSError:
+        return True
+
+
+def _socket():
+    sock = getattr(_local, "sock", None)
+    if sock is not None and _closed_by_peer(sock):
+        _disconnect()
+        sock = None
+    return sock or _connect()
+
+
+def call(opcode, payload=b""):
+    """Send one request and return the reply payload."""
+    for _ in range(2 if opcode in _READ_ONLY else 1):
+        sock = _socket()
+        try:
+            send_frame(sock, opcode, payload)
+            frame = recv_frame(sock)
+        except OSError:
+            frame = None
+        if frame is not None:
+            break
+        _disconnect()
+    else:
+        raise MotionDaemonError("Motion daemon closed the connection")
+    status, reply = frame
+    if status != REPLY_OK:
+        error = load_json(reply)
+        raise _ERRORS.get(error["type"], MotionDaemonError)(error["message"])
+    return reply
+
+
+def enable_motor():
+    call(OP_ENABLE)
+
+
+def disable_motor():
+    call(OP_DISABLE)
+
+
+def set_direction(direction):
+    call(OP_DIRECTION, U8.pack(bool(direction)))
+
+
+def submit_move(steps=None, target_position=None, profile=None, kind="move"):
+    request = {
+        "steps": steps,
+        "target_position": target_position,
+        "profile": profile,
+        "kind": kind,
+    }
+    return load_json(call(OP_SUBMIT, dump_json(request)))
+
+
+def submit_target(angle, profile=None):
+    request = {"angle": angle, "profile": profile}
+    return load_json(call(OP_SUBMIT_TARGET, dump_json(request)))
+
+
+def jog(velocity):
+    return load_json(call(OP_JOG, F64.pack(velocity)))
+
+
+def get_job(job_id):
+    return load_json(call(OP_GET_JOB, I64.pack(job_id)))
+
+
+def list_jobs():
+    return load_json(call(OP_LIST_JOBS))
+
+
+def cancel_job(job_id):
+    return bool(U8.unpack(call(OP_CANCEL, I64.pack(job_id)))[0])
+
+
+def pause_motion():
+    call(OP_PAUSE)
+
+
+def resume_motion():
+    call(OP_RESUME)
+
+
+def stop_motion(timeout=5.0):
+    return load_json(call(OP_STOP, F64.pack(timeout)))
+
+
+def is_motor_busy():
+    return bool(U8.unpack(call(OP_BUSY))[0])
+
+
+def update_state(**fields):
+    call(OP_UPDATE_STATE, dump_json(fields))
+
+
+def notify_state_change():
+    call(OP_NOTIFY)
+
+
+def status_snapshot():
+    return unpack_status(call(OP_STATUS))
+
+
+def get_state_version():
+    return U64.unpack(call(OP_VERSION))[0]
+
+
+def wait_for_state_change(since, timeout=None):
+    # The daemon needs a finite timeout; a day is effectively forever here
+    payload = WAIT.pack(since, 86400.0 if timeout is None else timeout)
+    return U64.unpack(call(OP_WAIT, payload))[0]
+
+
+def get_state():
+    return load_json(call(OP_GET_STATE))
+
+
+def submit_plan(entries, profile=None):
+    request = {"entries": entries, "profile": profile}
+    return load_json(call(OP_SUBMIT_PLAN, dump_json(request)))
+
+
+def get_plan(plan_id):
+    return load_json(call(OP_GET_PLAN, I64.pack(plan_id)))
+
+
+def cancel_plan(plan_id):
+    return bool(U8.unpack(call(OP_CANCEL_PLAN, I64.pack(plan_id)))[0])
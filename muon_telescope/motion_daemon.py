@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Standalone motion controller.
+
+Owns the GPIO lines, the motion executor and the position journal, and
+serves them to web workers over a Unix domain socket (see
+``motion_protocol``). Point the web app at it with ``MUON_MOTION_SOCKET``::
+
+    python -m muon_telescope.motion_daemon --socket /run/muon/motion.sock
+    MUON_MOTION_SOCKET=/run/muon/motion.sock uvicorn muon_telescope.asgi:application --workers 4
+"""
+
+import argparse
+import os
+import socketserver
+
+from muon_telescope import motor_control
+from muon_telescope.motion_protocol import (
+    F64,
+    I64,
+    OP_BUSY,
+    OP_CANCEL,
+    OP_CANCEL_PLAN,
+    OP_DIRECTION,
+    OP_DISABLE,
+    OP_ENABLE,
+    OP_GET_JOB,
+    OP_GET_PLAN,
+    OP_GET_STATE,
+    OP_JOG,
+    OP_LIST_JOBS,
+    OP_NOTIFY,
+    OP_PAUSE,
+    OP_RESUME,
+    OP_STATUS,
+    OP_STOP,
+    OP_SUBMIT,
+    OP_SUBMIT_PLAN,
+    OP_SUBMIT_TARGET,
+    OP_UPDATE_STATE,
+    OP_VERSION,
+    OP_WAIT,
+    REPLY_ERROR,
+    REPLY_OK,
+    U8,
+    U64,
+    WAIT,
+    dump_json,
+    load_json,
+    pack_status,
+    recv_frame,
+    send_frame,
+)
+
+DEFAULT_SOCKET = "/tmp/muon-motion.sock"
+
+
+def _wait(payload):
+    since, timeout = WAIT.unpack(payload)
+    return U64.pack(motor_control.wait_for_state_change(since, timeout))
+
+
+def _stop(payload):
+    timeout = F64.unpack(payload)[0] if payload else 5.0
+    return dump_json(motor_control.stop_motion(timeout))
+
+
+def _submit(payload):
+    return dump_json(motor_control.submit_move(**load_json(payload)))
+
+
+def _submit_target(payload):
+    return dump_json(motor_control.submit_target(**load_json(payload)))
+
+
+def _submit_plan(payload):
+    request = load_json(payload)
+    return dump_json(motor_control.submit_plan(request["entries"], request["profile"]))
+
+
+def _update_state(payload):
+    motor_control.update_state(**load_json(payload))
+    return b""
+
+
+def _simple(func):
+    def handler(payload):
+        func()
+        return b""
+
+    return handler
+
+
+HANDLERS = {
+    OP_STATUS: lambda p: pack_status(motor_control.status_snapshot()),
+    OP_VERSION: lambda p: U64.pack(motor_control.get_state_version()),
+    OP_WAIT: _wait,
+    OP_BUSY: lambda p: U8.pack(motor_control.is_motor_busy()),
+    OP_CANCEL: lambda p: U8.pack(motor_control.cancel_job(I64.unpack(p)[0])),
+    OP_PAUSE: _simple(motor_control.pause_motion),
+    OP_RESUME: _simple(motor_control.resume_motion),
+    OP_ENABLE: _simple(motor_control.enable_motor),
+    OP_DISABLE: _simple(motor_control.disable_motor),
+    OP_NOTIFY: _simple(motor_control.notify_state_change),
+    OP_DIRECTION: lambda p: motor_control.set_direction(U8.unpack(p)[0]) or b"",
+    OP_STOP: _stop,
+    OP_SUBMIT: _submit,
+    OP_GET_JOB: lambda p: dump_json(motor_control.get_job(I64.unpack(p)[0])),
+    OP_LIST_JOBS: lambda p: dump_json(motor_control.list_jobs()),
+    OP_GET_STATE: lambda p: dump_json(motor_control.get_state()),
+    OP_UPDATE_STATE: _update_state,
+    OP_SUBMIT_PLAN: _submit_plan,
+    OP_SUBMIT_TARGET: _submit_target,
+    OP_JOG: lambda p: dump_json(motor_control.jog(F64.unpack(p)[0])),
+    OP_GET_PLAN: lambda p: dump_json(motor_control.get_plan(I64.unpack(p)[0])),
+    OP_CANCEL_PLAN: lambda p: U8.pack(motor_control.cancel_plan(I64.unpack(p)[0])),
+}
+
+
+class MotionRequestHandler(socketserver.BaseRequestHandler):
+    """Serve requests from one client connection until it closes."""
+
+    def handle(self):
+        while True:
+            frame = recv_frame(self.request)
+            if frame is None:
+                return
+            opcode, payload = frame
+            try:
+                handler = HANDLERS[opcode]
+                reply = handler(payload)
+            except Exception as e:
+                error = {"type": type(e).__name__, "message": str(e)}
+                send_frame(self.request, REPLY_ERROR, dump_json(error))
+            else:
+                send_frame(self.request, REPLY_OK, reply)
+
+
+class MotionServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def serve(socket_path=DEFAULT_SOCKET):
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)  # Stale socket from a previous run
+    motor_control.start_journal()
+    server = MotionServer(socket_path, MotionRequestHandler)
+    os.chmod(socket_path, 0o660)
+    print(f"Motion daemon listening on {socket_path}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.unlink(socket_path)
+        motor_control.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the motion controller daemon.")
+    parser.add_argument(
+        "--socket",
+        default=os.environ.get("MUON_MOTION_SOCKET", DEFAULT_SOCKET),
+        help=f"Unix socket path (default: {DEFAULT_SOCKET})",
+    )
+    args = parser.parse_args()
+    try:
+        serve(args.socket)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Velocity profiles for the stepper motor.
+
+A profile is described by a ramp: the step periods the motor passes through
+while accelerating from the stall-safe start period (``max_period``) up to the
+cruise period (``min_period``). Per-move delay tables are built from the ramp
+so that the stepping loop only has to index a tuple.
+"""
+
+import math
+from functools import lru_cache
+
+PROFILE_CONSTANT = "constant"
+PROFILE_TRAPEZOIDAL = "trapezoidal"
+PROFILE_SCURVE = "scurve"
+
+PROFILES = (PROFILE_CONSTANT, PROFILE_TRAPEZOIDAL, PROFILE_SCURVE)
+
+
+def _smoothstep(f):
+    return f * f * (3.0 - 2.0 * f)
+
+
+@lru_cache(maxsize=32)
+def ramp_table(profile, min_period, max_period, accel):
+    """Return the step periods from standstill up to cruise speed."""
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown motion profile: {profile}")
+    min_period = min(min_period, max_period)
+    if profile == PROFILE_CONSTANT or min_period == max_period or accel <= 0:
+        return (max_period,)
+
+    v0 = 1.0 / max_period
+    v1 = 1.0 / min_period
+    span = v1 * v1 - v0 * v0
+    if profile == PROFILE_TRAPEZOIDAL:
+        # Constant acceleration: v^2 grows linearly with distance
+        levels = math.ceil(span / (2.0 * accel))
+        periods = [
+            1.0 / min(math.sqrt(v0 * v0 + 2.0 * accel * k), v1)
+            for k in range(levels + 1)
+        ]
+    else:
+        # S-curve: acceleration rises and falls smoothly, peaking at 0.75 * accel
+        levels = math.ceil(span / accel)
+        periods = [
+            1.0 / math.sqrt(v0 * v0 + span * _smoothstep(k / levels))
+            for k in range(levels + 1)
+        ]
+    periods[-1] = min_period
+    return tuple(periods)
+
+
+@lru_cache(maxsize=64)
+def delay_table(steps, min_period, max_period, accel, profile=PROFILE_TRAPEZOIDAL):
+    """Return the per-step delays for a move of ``steps`` steps."""
+    steps = abs(int(steps))
+    ramp = ramp_table(profile, min_period, max_period, accel)
+    top = len(ramp) - 1
+    return tuple(ramp[min(i, steps - 1 - i, top)] for i in range(steps))
+
+
+@lru_cache(maxsize=64)
+def delay_table_ns(steps, min_period, max_period, accel, profile=PROFILE_TRAPEZOIDAL):
+    """Same as ``delay_table`` but in integer nanoseconds."""
+    return tuple(
+        round(delay * 1e9)
+        for delay in delay_table(steps, min_period, max_period, accel, profile)
+    )
+
+
+@lru_cache(maxsize=64)
+def decel_table_ns(level, min_period, max_period, accel, profile=PROFILE_TRAPEZOIDAL):
+    """Return the delays, in ns, for coming to rest from ramp ``level``."""
+    ramp = ramp_table(profile, min_period, max_period, accel)
+    level = min(level, len(ramp) - 1)
+    return tuple(round(ramp[k] * 1e9) for k in range(level - 1, -1, -1))
+
+
+@lru_cache(maxsize=64)
+def continue_table_ns(
+    start, steps, min_period, max_period, accel, profile=PROFILE_TRAPEZOIDAL
+):
+    """Return the delays, in ns, for ``steps`` steps beginning at ramp ``start``.
+
+    Used to lengthen or shorten a move in flight: the motor carries on from the
+    level it is running at instead of from standstill, and still comes to rest
+    on the last step. Smooth as long as ``steps >= start``.
+    """
+    ramp = ramp_table(profile, min_period, max_period, accel)
+    top = len(ramp) - 1
+    return tuple(
+        round(ramp[max(0, min(start + i, steps - 1 - i, top))] * 1e9)
+        for i in range(steps)
+    )
+
+
+@lru_cache(maxsize=64)
+def jog_table_ns(level, top, steps, min_period, max_period, accel):
+    """Return ``steps`` delays, in ns, stepping from ramp ``level`` towards ``top``.
+
+    ``level`` is that of the previous step, -1 from standstill. The level moves
+    by one per step, so jog speed changes keep to the configured acceleration.
+    Jogging always follows the trapezoidal ramp.
+    """
+    ramp = ramp_table(PROFILE_TRAPEZOIDAL, min_period, max_period, accel)
+    top = min(top, len(ramp) - 1)
+    delays = []
+    for _ in range(steps):
+        level += (level < top) - (level > top)
+        delays.append(round(ramp[level] * 1e9))
+    return tuple(delays)
+
+
+def step_level(index, steps, min_period, max_period, accel, profile, start=0):
+    """Return the ramp level of step ``index`` in a move of ``steps`` steps.
+
+    ``start`` is the level of the first step, as in ``continue_table_ns``.
+    """
+    top = len(ramp_table(profile, min_period, max_period, accel)) - 1
+    return max(0, min(start + index, steps - 1 - index, top))
+
+
+def move_duration(steps, min_period, max_period, accel, profile=PROFILE_TRAPEZOIDAL):
+    """Return the time in seconds a move of ``steps`` steps takes."""
+    return math.fsum(delay_table(steps, min_period, max_period, accel, profile))
@@ -0,0 +1,137 @@
+"""
+Wire protocol between the motion daemon and its clients.
+
+Every frame is a 5-byte header (``!BI``: opcode or reply status, payload
+length) followed by the payload. Status, version and control operations use
+fixed binary structs; operations on job records, which have optional fields,
+carry compact JSON.
+"""
+
+import json
+import struct
+
+HEADER = struct.Struct("!BI")
+
+# version, flags, current_position, target_position, current_job (-1 = none),
+# current_plan (-1 = none), steps_done, steps_total, position_bounds low/high
+STATUS = struct.Struct("!QBddqqIIdd")
+FLAG_MOVING = 1
+FLAG_ENABLED = 2
+FLAG_PAUSED = 4
+FLAG_BOUNDS = 8
+
+U8 = struct.Struct("!B")
+I64 = struct.Struct("!q")
+U64 = struct.Struct("!Q")
+F64 = struct.Struct("!d")
+WAIT = struct.Struct("!Qd")
+
+OP_STATUS = 1
+OP_VERSION = 2
+OP_WAIT = 3
+OP_BUSY = 4
+OP_CANCEL = 5
+OP_PAUSE = 6
+OP_RESUME = 7
+OP_ENABLE = 8
+OP_DISABLE = 9
+OP_NOTIFY = 10
+OP_DIRECTION = 11
+OP_STOP = 12
+OP_SUBMIT = 13
+OP_GET_JOB = 14
+OP_LIST_JOBS = 15
+OP_GET_STATE = 16
+OP_UPDATE_STATE = 17
+OP_SUBMIT_PLAN = 18
+OP_GET_PLAN = 19
+OP_CANCEL_PLAN = 20
+OP_SUBMIT_TARGET = 21
+OP_JOG = 22
+
+REPLY_OK = 0
+REPLY_ERROR = 1
+
+
+class MotionDaemonError(RuntimeError):
+    """Raised by the client when the daemon reports a failure."""
+
+
+def pack_status(snapshot):
+    flags = FLAG_MOVING if snapshot["is_moving"] else 0
+    if snapshot["is_enabled"]:
+        flags |= FLAG_ENABLED
+    if snapshot["paused"]:
+        flags |= FLAG_PAUSED
+    bounds = snapshot["position_bounds"]
+    if bounds:
+        flags |= FLAG_BOUNDS
+    else:
+        bounds = (0.0, 0.0)
+    job = snapshot["current_job"]
+    plan = snapshot["current_plan"]
+    return STATUS.pack(
+        snapshot["version"],
+        flags,
+        snapshot["current_position"],
+        snapshot["target_position"],
+        -1 if job is None else job,
+        -1 if plan is None else plan,
+        snapshot["steps_done"],
+        snapshot["steps_total"],
+        *bounds,
+    )
+
+
+def unpack_status(payload):
+    (version, flags, position, target, job, plan, done, total, low, high) = (
+        STATUS.unpack(payload)
+    )
+    return {
+        "is_moving": bool(flags & FLAG_MOVING),
+        "current_position": position,
+        "target_position": target,
+        "is_enabled": bool(flags & FLAG_ENABLED),
+        "paused": bool(flags & FLAG_PAUSED),
+        "current_job": None if job < 0 else job,
+        "current_plan": None if plan < 0 else plan,
+        "steps_done": done,
+        "steps_total": total,
+        "position_bounds": [low, high] if flags & FLAG_BOUNDS else None,
+        "version": version,
+    }
+
+
+def dump_json(value):
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def load_json(payload):
+    return json.loads(payload) if payload else None
+
+
+def recv_exact(sock, size):
+    """Read exactly ``size`` bytes, or return None if the peer closed."""
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+    return bytes(buf)
+
+
+def send_frame(sock, code, payload=b""):
+    sock.sendall(HEADER.pack(code, len(payload)) + payload)
+
+
+def recv_frame(sock):
+    """Return ``(code, payload)`` or None if the peer closed the connection."""
+    header = recv_exact(sock, HEADER.size)
+    if header is None:
+        return None
+    code, length = HEADER.unpack(header)
+    payload = recv_exact(sock, length) if length else b""
+    if payload is None:
+        return None
+    return code, payload
@@ -1,108 +1,1063 @@
+import itertools
+import math
+import os
+import queue
 import threading
 import time
+from bisect import bisect_right
+from collections import OrderedDict
 
-try:
-    import RPi.GPIO as GPIO
-except (ImportError, RuntimeError):
+from muon_telescope import realtime
+from muon_telescope.calibration import MICROSTEPS_PER_REV, to_degrees, to_microsteps
+from muon_telescope.gpio_backends import HIGH, LOW, load_backend
+from muon_telescope.motion_profile import (
+    PROFILE_TRAPEZOIDAL,
+    PROFILES,
+    continue_table_ns,
+    decel_table_ns,
+    delay_table_ns,
+    jog_table_ns,
+    move_duration,
+    ramp_table,
+    step_level,
+)
+from muon_telescope.observation_plan import order_entries, parse_entries, slew_distance
+from muon_telescope.position_journal import NullJournal, open_journal
+from muon_telescope.pulse_scheduler import HISTOGRAM_EDGES_US, JitterRecorder
+from muon_telescope.step_process import StepProcess
 
-    class MockGPIO:
-        BCM = 11
-        BOARD = 10
-        OUT = 0
-        IN = 1
-        HIGH = 1
-        LOW = 0
-
-        def setmode(self, *a, **kw):
-            pass
-
-        def setup(self, *a, **kw):
-            pass
-
-        def output(self, *a, **kw):
-            pass
+# Global motor state
+motor_state = {
+    "is_moving": False,
+    "current_position": 0,  # Degrees, derived from position_steps for display
+    "position_steps": 0,  # Integer microsteps from zero: the actual position
+    "step_remainder": 0.0,  # Last target minus position_steps, in microsteps
+    "target_position": 0,
+    "is_enabled": False,
+    "step_delay": 0.020,  # Start/stop period, slow enough for the DM556 not to stall
+    "min_step_delay": 0.004,  # Cruise period reached after the acceleration ramp
+    "accel": 1000.0,  # Steps per second squared
+    "profile": "trapezoidal",
+    "paused": False,
+    "jitter": None,  # Pulse lateness summary of the last move
+    "realtime": None,  # What real-time mode applied; see realtime.py
+    # Running totals over all moves, exported at /metrics
+    "pulse_stats": {
+        "steps": 0,
+        "lateness_buckets": [0] * (len(HISTOGRAM_EDGES_US) + 1),
+        "lateness_sum_us": 0.0,
+    },
+    "current_job": None,
+    "current_plan": None,  # Observation plan the running job belongs to
+    "steps_done": 0,  # Progress of the running job
+    "steps_total": 0,
+    "position_bounds": None,  # [low, high] after recovering an interrupted move
+}
 
-        def cleanup(self, *a, **kw):
-            pass
+# Fields pushed to status subscribers; see status_snapshot()
+STATUS_FIELDS = (
+    "is_moving",
+    "current_position",
+    "target_position",
+    "is_enabled",
+    "paused",
+    "current_job",
+    "current_plan",
+    "steps_done",
+    "steps_total",
+    "position_bounds",
+)
 
-        class PWM:
-            def __init__(self, *a, **kw):
-                pass
+# Report step progress to status subscribers every this many pulses
+PROGRESS_STRIDE = 50
 
-            def start(self, *a, **kw):
-                pass
+# Motor parameters; steps per revolution live in calibration.py
+DIR_SETUP_NS = 5_000  # DM556: DIR must lead the first PUL edge by 5 us
 
-            def stop(self, *a, **kw):
-                pass
+# Position journal, only kept when MUON_POSITION_JOURNAL names a file. It is
+# opened by start_journal() when the server or daemon starts, so importing
+# this module (manage.py commands, tests) never touches the file.
+journal = NullJournal()
+_journal_lock = threading.Lock()
+_journal_started = False
 
-    GPIO = MockGPIO()
-    GPIO.PWM = MockGPIO.PWM
 
+def start_journal():
+    """Open and replay the position journal; later calls do nothing."""
+    global journal, _journal_started
+    with _journal_lock:
+        if _journal_started:
+            return
+        _journal_started = True
+        opened = open_journal(os.environ.get("MUON_POSITION_JOURNAL", ""))
+        recovered = opened.recover()
+        journal = opened
+    if recovered["position"] is not None:
+        motor_state["position_steps"] = round(to_microsteps(recovered["position"]))
+        motor_state["current_position"] = to_degrees(motor_state["position_steps"])
+        motor_state["position_bounds"] = recovered["bounds"]
+    if recovered["interrupted"]:
+        print(
+            "Warning: motor stopped mid-move; position is between "
+            f"{recovered['bounds'][0]:.3f} and {recovered['bounds'][1]:.3f} degrees"
+        )
 
-# Global motor state
-motor_state = {
-    "is_moving": False,
-    "current_position": 0,
-    "target_position": 0,
-    "is_enabled": False,
-    "step_delay": 0.020,
-    "paused" : False,
-}
 
 ENABLE_PIN = 17  # Enable pin (active low)
 DIR_PIN = 27  # Direction pin
 STEP_PIN = 22  # Step pin
 motor_lock = threading.Lock()
-GPIO.setmode(GPIO.BCM)
-GPIO.setup(ENABLE_PIN, GPIO.OUT)
-GPIO.setup(DIR_PIN, GPIO.OUT)
-GPIO.setup(STEP_PIN, GPIO.OUT)
-GPIO.output(ENABLE_PIN, GPIO.LOW)
+gpio = load_backend()
+gpio.setup(ENABLE_PIN, DIR_PIN, STEP_PIN)
+gpio.write_lines({ENABLE_PIN: LOW, STEP_PIN: LOW})
+
+
+state_changed = threading.Condition()
+state_version = 0
+
+
+def notify_state_change():
+    """Bump the state version and wake up everyone waiting for a change."""
+    global state_version
+    with state_changed:
+        state_version += 1
+        state_changed.notify_all()
+
+
+def wait_for_state_change(since, timeout=None):
+    """Block until the state version differs from ``since``; return the version."""
+    with state_changed:
+        state_changed.wait_for(lambda: state_version != since, timeout)
+        return state_version
+
+
+def get_state_version():
+    return state_version
+
+
+def update_state(**fields):
+    """Update ``motor_state`` and notify status subscribers.
+
+    Setting ``current_position`` directly (e.g. zeroing) snaps it to the
+    nearest microstep, updates ``position_steps`` and is journaled.
+    """
+    if "current_position" in fields:
+        exact = to_microsteps(fields["current_position"])
+        steps = round(exact)
+        fields.update(
+            position_steps=steps,
+            current_position=to_degrees(steps),
+            step_remainder=exact - steps,
+        )
+    motor_state.update(fields)
+    if "current_position" in fields:
+        journal.record_position(fields["current_position"])
+    notify_state_change()
+
+
+def status_snapshot():
+    """Return the subscriber-visible part of the motor state.
+
+    With a step process, progress of the running move is read live from its
+    shared status block.
+    """
+    snapshot = {key: motor_state[key] for key in STATUS_FIELDS}
+    if stepper is not None:
+        live = stepper.status()
+        if live["moving"]:
+            snapshot["steps_done"] = live["steps_done"]
+            snapshot["current_position"] = to_degrees(live["position_steps"])
+    snapshot["version"] = state_version
+    return snapshot
+
+
+def get_state():
+    """Return a copy of the full motor state, including settings and jitter."""
+    state = dict(motor_state)
+    state["version"] = state_version
+    return state
+
 
 def enable_motor():
-    GPIO.output(ENABLE_PIN, GPIO.LOW)
+    gpio.write(ENABLE_PIN, LOW)
+    update_state(is_enabled=True)
 
 
 def disable_motor():
-    GPIO.output(ENABLE_PIN, GPIO.HIGH)
+    gpio.write_lines({ENABLE_PIN: HIGH, STEP_PIN: LOW})
+    update_state(is_enabled=False)
+
+
+_direction_set_ns = 0
+_direction = True
 
 
 def set_direction(direction):
-    GPIO.output(DIR_PIN, GPIO.HIGH if direction else GPIO.LOW)
+    global _direction, _direction_set_ns
+    gpio.write(DIR_PIN, HIGH if direction else LOW)
+    _direction = bool(direction)
+    _direction_set_ns = gpio.now()
+
 
+class MotionToken:
+    """Cancel/pause/retarget flags handed to the stepping loop for one move.
 
-def do_steps(steps, step_delay):
-    global motor_state
+    The loop reads ``halt`` before every pulse, so a plain attribute is used
+    instead of an Event to keep the check to a single attribute load. The
+    Events are only used to sleep while paused or dwelling.
+    """
+
+    def __init__(self):
+        self.halt = False
+        self.cancelled = False
+        self.paused = False
+        self._target_steps = None  # Newest retarget not yet taken by the loop
+        self._lock = threading.Lock()
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._halted = threading.Event()
+
+    def cancel(self):
+        self.cancelled = True
+        self.halt = True
+        self._halted.set()
+        self._resumed.set()
+
+    def pause(self):
+        self.paused = True
+        self.halt = True
+        self._halted.set()
+        self._resumed.clear()
+
+    def resume(self):
+        with self._lock:
+            self.paused = False
+            self.halt = self.cancelled or self._target_steps is not None
+        if not self.cancelled:
+            self._halted.clear()
+        self._resumed.set()
+
+    def retarget(self, steps):
+        """Ask the running move to end after ``steps`` steps in total."""
+        with self._lock:
+            self._target_steps = steps
+            self.halt = True
+
+    def take_retarget(self):
+        """Return the newest ``retarget`` steps not yet taken, or None."""
+        with self._lock:
+            steps, self._target_steps = self._target_steps, None
+            if steps is not None:
+                self.halt = self.paused or self.cancelled
+            return steps
+
+    def wait_resumed(self):
+        self._resumed.wait()
+
+    def sleep(self, seconds):
+        """Sleep up to ``seconds``, returning early when cancelled or paused."""
+        self._halted.wait(seconds)
+
+
+_NEVER_CANCELLED = MotionToken()
+
+# Lateness buffer reused by every move; only touched under motor_lock
+_jitter = JitterRecorder()
+
+
+def enter_realtime():
+    """Apply real-time mode to the calling thread and preallocate loop state.
+
+    Returns the report of which settings took effect.
+    """
+    report = realtime.apply_to_current_thread()
     with motor_lock:
-        ii=0
-        while ii < abs(steps):
-            ii += 1
-            GPIO.output(STEP_PIN, GPIO.HIGH)
-            time.sleep(step_delay / 2)
-            GPIO.output(STEP_PIN, GPIO.LOW)
-            time.sleep(step_delay / 2)
+        _jitter.reset(MICROSTEPS_PER_REV)
+    report["preallocated"] = {"applied": True, "pulses": len(_jitter.samples)}
+    return report
 
 
-def cleanup():
-    GPIO.cleanup()
+def do_steps(
+    steps,
+    step_delay=None,
+    profile=None,
+    min_step_delay=None,
+    accel=None,
+    token=None,
+    on_progress=None,
+):
+    """Pulse the step pin ``steps`` times following the configured velocity profile.
+
+    If ``token`` is cancelled or paused mid-move the motor is brought to rest
+    along the deceleration ramp. A paused move waits for ``token.resume()``
+    and continues with a fresh acceleration ramp. ``token.retarget()``
+    changes the length of the move in flight; if the new end is closer than
+    the stopping distance the motor decelerates past it and stops, and the
+    caller moves back. ``on_progress`` is called
+    with the running step count every ``PROGRESS_STRIDE`` pulses. Returns the
+    number of steps actually issued.
+    """
+    if step_delay is None:
+        step_delay = motor_state["step_delay"]
+    if profile is None:
+        profile = motor_state["profile"]
+    if min_step_delay is None:
+        min_step_delay = motor_state["min_step_delay"]
+    if accel is None:
+        accel = motor_state["accel"]
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown motion profile: {profile}")
+    token = token or _NEVER_CANCELLED
+    steps = abs(steps)
+    params = (min_step_delay, step_delay, accel, profile)
+    counted = 0
+
+    def progress(done):
+        # Keep the /metrics step counter current during long moves
+        nonlocal counted
+        motor_state["pulse_stats"]["steps"] += done - counted
+        counted = done
+        if on_progress is not None:
+            on_progress(done)
 
+    with motor_lock:
+        ready_ns = _direction_set_ns + DIR_SETUP_NS
+        if stepper is not None:
+            done, summary = stepper.move(
+                steps,
+                params,
+                token,
+                ready_ns,
+                motor_state["position_steps"],
+                1 if _direction else -1,
+                progress,
+                PROGRESS_STRIDE,
+            )
+        else:
+            with realtime.gc_paused():
+                done, summary = _step_loop(
+                    steps, params, token, gpio.scheduler(), ready_ns, progress
+                )
+    motor_state["jitter"] = summary
+    _count_pulses(summary, counted)
+    return done
+
+
+def _step_loop(steps, params, token, scheduler, ready_ns, on_progress=None):
+    """Body of ``do_steps``; also run by the step process. Returns (done, jitter)."""
+    jitter = _jitter
+    jitter.reset(steps)
+    done = 0
+    start = 0  # Ramp level of the next train's first step; 0 from standstill
+    scheduler.wait_until(ready_ns)
+    while done < steps and not token.cancelled:
+        remaining = steps - done
+        if start:
+            delays = continue_table_ns(start, remaining, *params)
+        else:
+            delays = delay_table_ns(remaining, *params)
+        issued = _pulse_train(
+            delays, token, scheduler, jitter, on_progress, offset=done
+        )
+        done += issued
+        if issued == remaining:
+            break
+        if issued:
+            level = step_level(issued - 1, remaining, *params, start=start)
+        else:
+            level = max(0, start - 1)
+        target = token.take_retarget()
+        if target is not None:
+            steps = target
+            if not token.halt and steps - done > level:
+                # Far enough to stop in time: carry on without slowing down
+                start = level + 1
+                continue
+        if level:
+            tail = decel_table_ns(level, *params)
+            done += _pulse_train(
+                tail, _NEVER_CANCELLED, scheduler, jitter, on_progress, done
+            )
+        start = 0
+        token.wait_resumed()
+    return done, jitter.summary()
 
-motor_thread = None
 
+def do_pulses(delays, token=None):
+    """Issue one pulse per delay (in ns) in the current direction.
 
-def _motor_worker(steps, step_delay):
+    Unlike ``do_steps`` there is no ramp: the delays shape the speed, so the
+    caller can keep the motor running across calls. Stops early if ``token``
+    halts. Returns the number of pulses issued.
+    """
     with motor_lock:
-        do_steps(steps, step_delay)
+        ready_ns = _direction_set_ns + DIR_SETUP_NS
+        if stepper is not None:
+            done, summary = stepper.train(
+                delays,
+                token,
+                ready_ns,
+                motor_state["position_steps"],
+                1 if _direction else -1,
+            )
+        else:
+            with realtime.gc_paused():
+                done, summary = _train(
+                    delays, token or _NEVER_CANCELLED, gpio.scheduler(), ready_ns
+                )
+    _count_pulses(summary)
+    return done
+
+
+def _train(delays, token, scheduler, ready_ns, on_progress=None):
+    """Body of ``do_pulses``; also run by the step process. Returns (done, jitter)."""
+    _jitter.reset(len(delays))
+    scheduler.wait_until(ready_ns)
+    done = _pulse_train(delays, token, scheduler, _jitter, on_progress)
+    return done, _jitter.summary()
+
+
+def _count_pulses(summary, counted=0):
+    """Add one move's pulses to ``pulse_stats``; only the stepping thread writes.
+
+    ``counted`` pulses were already added to the step counter while the move
+    ran; lateness needs the whole move and is only folded in here.
+    """
+    stats = motor_state["pulse_stats"]
+    stats["steps"] += summary["pulses"] - counted
+    stats["lateness_sum_us"] += summary["sum_us"]
+    buckets = stats["lateness_buckets"]
+    for i, count in enumerate(summary.get("histogram", {}).values()):
+        buckets[i] += count
+
+
+def _pulse_train(delays, token, scheduler, jitter, on_progress=None, offset=0):
+    step_high = gpio.step_high
+    step_low = gpio.step_low
+    wait_until = scheduler.wait_until
+    record = jitter.add
+    next_report = PROGRESS_STRIDE if on_progress else -1
+    done = 0
+    deadline = scheduler.now()
+    for delay in delays:
+        if token.halt:
+            break
+        record(wait_until(deadline))
+        step_high()
+        wait_until(deadline + delay // 2)
+        step_low()
+        deadline += delay
+        done += 1
+        if done == next_report:
+            next_report += PROGRESS_STRIDE
+            on_progress(offset + done)
+    wait_until(deadline)
+    return done
+
+
+def cleanup():
+    journal.flush()
+    if stepper is not None:
+        stepper.close()
+    gpio.cleanup()
+
+
+# Motion executor: a single thread runs queued jobs one after another, so
+# HTTP requests only enqueue work and never wait for the motor.
+MAX_FINISHED_JOBS = 100
+MAX_FINISHED_PLANS = 20
+
+motion_queue = queue.Queue()
+motion_jobs = OrderedDict()
+observation_plans = OrderedDict()
+jobs_lock = threading.Lock()
+jobs_changed = threading.Condition(jobs_lock)
+motion_thread = None
+_active_token = None
+_pointing_job = None  # Newest submit_target() job
+_pointing_move = None  # [start, sign, farthest length] of its move in progress
+
+# Jog mode: the motor follows a velocity set-point sent over a live connection
+# (see jog.py). A set-point lapses after JOG_TIMEOUT seconds unless it is sent
+# again, so the motor ramps down by itself when the client goes quiet.
+JOG_TIMEOUT = 0.5
+JOG_CHUNK = 0.05  # Seconds of pulses issued between set-point checks
+JOG_JOURNAL_SPAN = MICROSTEPS_PER_REV // 36  # Travel covered by one journal begin
 
+_jog_setpoint = (0.0, 0.0)  # Degrees per second, time.monotonic() it lapses at
+_jog_job = None
+_job_ids = itertools.count(1)
+_plan_ids = itertools.count(1)
 
-def start_motor(steps, step_delay):
-    global motor_thread
-    if motor_thread is not None and motor_thread.is_alive():
-        return False
-    motor_thread = threading.Thread(target=_motor_worker, args=(steps, step_delay))
-    motor_thread.start()
-    return True
+
+def angle_to_steps(angle):
+    """Convert an angle in degrees to the nearest whole number of microsteps."""
+    return round(to_microsteps(angle))
+
+
+def submit_move(steps=None, target_position=None, profile=None, kind="move"):
+    """Queue a relative (``steps``) or absolute (``target_position``) move.
+
+    Returns a copy of the job record; the move runs on the motion thread.
+    """
+    if (steps is None) == (target_position is None):
+        raise ValueError("Specify exactly one of steps or target_position")
+    if profile is not None and profile not in PROFILES:
+        raise ValueError(f"Unknown motion profile: {profile}")
+    job = _new_job(kind, steps=steps, target_position=target_position, profile=profile)
+    return dict(_enqueue([job])[0])
+
+
+def submit_target(angle, profile=None):
+    """Point at ``angle`` degrees, superseding earlier targets.
+
+    Meant for slider-style control, where a request arrives for every
+    intermediate angle. If the previous pointing job is still queued it just
+    takes the new angle; if it is running, its move is retargeted in flight.
+    Only when neither is the case is a new ``point`` job queued. Returns a
+    copy of the pointing job.
+    """
+    global _pointing_job
+    if profile is not None and profile not in PROFILES:
+        raise ValueError(f"Unknown motion profile: {profile}")
+    with jobs_lock:
+        job = _pointing_job
+        if job is not None and job["status"] in ("queued", "running"):
+            job["target_position"] = angle
+            job["retargets"] += 1
+            if job["status"] == "queued":
+                job["profile"] = profile
+            elif _pointing_move is not None and _active_token is not None:
+                _retarget_locked(angle)
+        else:
+            job = _new_job("point", target_position=angle, profile=profile)
+            _pointing_job = job
+            _enqueue_locked([job])
+        job = dict(job)
+    notify_state_change()
+    return job
+
+
+def _retarget_locked(angle):
+    """Change the end of the running pointing move to ``angle``."""
+    start, sign, reach = _pointing_move
+    steps = sign * (start - angle_to_steps(angle))
+    _active_token.retarget(steps)
+    # The motor stops short of the farther of the old and new ends, so that
+    # bounds the position if the process dies before the move ends.
+    reach = _pointing_move[2] = max(reach, steps)
+    position = start - sign * motor_state["steps_done"]
+    journal.begin_move(to_degrees(position), to_degrees(start - sign * reach))
+    motor_state["target_position"] = angle
+    motor_state["steps_total"] = max(0, steps)
+
+
+def jog(velocity):
+    """Set the jog velocity in degrees per second; positive raises the angle.
+
+    Starts a ``jog`` job if none is running. The set-point has to be renewed
+    within ``JOG_TIMEOUT`` seconds, otherwise the motor ramps down to rest and
+    the job ends. Returns a copy of the jog job, or None if there is none.
+    """
+    global _jog_job, _jog_setpoint
+    velocity = float(velocity)
+    if not math.isfinite(velocity):
+        raise ValueError("Jog velocity must be a finite number")
+    with jobs_lock:
+        _jog_setpoint = (velocity, time.monotonic() + JOG_TIMEOUT)
+        job = _jog_job
+        started = job is None or job["status"] not in ("queued", "running")
+        if started:
+            if not velocity:
+                return None
+            job = _jog_job = _new_job("jog")
+            _enqueue_locked([job])
+        job = dict(job)
+    if started:
+        notify_state_change()
+    return job
+
+
+def _jog_velocity():
+    velocity, lapses = _jog_setpoint
+    return velocity if time.monotonic() < lapses else 0.0
+
+
+def _new_job(kind, **fields):
+    job = {
+        "id": next(_job_ids),
+        "kind": kind,
+        "status": "queued",
+        "steps": None,
+        "target_position": None,
+        "profile": None,
+        "dwell": None,  # Seconds to hold position for ``dwell`` jobs
+        "plan": None,
+        "estimate": None,  # Expected run time in seconds, when known
+        "created": time.time(),
+        "started": None,
+        "finished": None,
+        "steps_done": 0,
+        "retargets": 0,  # New targets taken by a ``point`` job after queueing
+        "error": None,
+    }
+    job.update(fields)
+    return job
+
+
+def _enqueue(jobs):
+    """Queue ``jobs`` back to back, so no other job can run in between."""
+    with jobs_lock:
+        _enqueue_locked(jobs)
+    notify_state_change()
+    return jobs
+
+
+def _enqueue_locked(jobs):
+    for job in jobs:
+        motion_jobs[job["id"]] = job
+        motion_queue.put(job)
+    _prune_jobs()
+    _ensure_motion_thread()
+
+
+def _estimate_move(steps, profile=None):
+    if not steps:
+        return 0.0
+    return move_duration(
+        abs(steps),
+        motor_state["min_step_delay"],
+        motor_state["step_delay"],
+        motor_state["accel"],
+        profile or motor_state["profile"],
+    )
+
+
+def submit_plan(entries, profile=None):
+    """Queue an observation plan of ``(angle, dwell seconds)`` entries.
+
+    The entries are reordered to minimize slew and queued as alternating
+    move and dwell jobs. Returns the plan's progress record.
+    """
+    if profile is not None and profile not in PROFILES:
+        raise ValueError(f"Unknown motion profile: {profile}")
+    start = motor_state["current_position"]
+    ordered = order_entries(parse_entries(entries), start)
+    plan = {
+        "id": next(_plan_ids),
+        "entries": [],
+        "created": time.time(),
+        "slew_degrees": slew_distance(ordered, start),
+    }
+    jobs = []
+    position = motor_state["position_steps"]
+    for angle, dwell in ordered:
+        steps = position - angle_to_steps(angle)
+        move = _new_job(
+            "plan_move",
+            target_position=angle,
+            profile=profile,
+            plan=plan["id"],
+            estimate=_estimate_move(steps, profile),
+        )
+        hold = _new_job("dwell", dwell=dwell, plan=plan["id"], estimate=dwell)
+        plan["entries"].append({"angle": angle, "dwell": dwell, "jobs": (move, hold)})
+        jobs += (move, hold)
+        position = angle_to_steps(angle)
+    with jobs_lock:
+        # Register and queue in one go, so the plan never shows without its jobs
+        observation_plans[plan["id"]] = plan
+        finished = [
+            plan_id
+            for plan_id, other in observation_plans.items()
+            if _plan_status(other) not in ("queued", "running")
+        ]
+        for plan_id in finished[: max(0, len(finished) - MAX_FINISHED_PLANS)]:
+            del observation_plans[plan_id]
+        _enqueue_locked(jobs)
+    notify_state_change()
+    return get_plan(plan["id"])
+
+
+def _plan_status(plan):
+    statuses = {job["status"] for entry in plan["entries"] for job in entry["jobs"]}
+    if statuses == {"queued"}:
+        return "queued"
+    if statuses & {"queued", "running"}:
+        return "running"
+    for status in ("failed", "cancelled"):
+        if status in statuses:
+            return status
+    return "done"
+
+
+def _entry_status(move, hold):
+    if move["status"] == "running":
+        return "moving"
+    if hold["status"] == "running":
+        return "dwelling"
+    if move["status"] in ("cancelled", "failed"):
+        return move["status"]
+    return hold["status"]
+
+
+def get_plan(plan_id):
+    """Return the progress of an observation plan, or None for unknown ids.
+
+    ``eta_seconds`` is the estimated time until the plan completes and
+    ``eta_at`` the corresponding wall-clock timestamp.
+    """
+    with jobs_lock:
+        plan = observation_plans.get(plan_id)
+        if plan is None:
+            return None
+        now = time.time()
+        eta = 0.0
+        entries = []
+        for entry in plan["entries"]:
+            for job in entry["jobs"]:
+                if job["status"] == "queued":
+                    eta += job["estimate"]
+                elif job["status"] == "running":
+                    eta += max(0.0, job["estimate"] - (now - job["started"]))
+            entries.append(
+                {
+                    "angle": entry["angle"],
+                    "dwell": entry["dwell"],
+                    "status": _entry_status(*entry["jobs"]),
+                }
+            )
+        status = _plan_status(plan)
+        return {
+            "id": plan["id"],
+            "status": status,
+            "created": plan["created"],
+            "slew_degrees": plan["slew_degrees"],
+            "completed": sum(entry["status"] == "done" for entry in entries),
+            "total": len(entries),
+            "eta_seconds": eta if status in ("queued", "running") else 0.0,
+            "eta_at": now + eta if status in ("queued", "running") else None,
+            "entries": entries,
+        }
+
+
+def cancel_plan(plan_id):
+    """Cancel the remaining entries of a plan. Returns False if none were left."""
+    with jobs_lock:
+        plan = observation_plans.get(plan_id)
+        if plan is None:
+            return False
+        cancelled = [
+            _cancel_locked(job) for entry in plan["entries"] for job in entry["jobs"]
+        ]
+    return any(cancelled)
+
+
+def get_job(job_id):
+    """Return a copy of the job record, or None for unknown ids."""
+    with jobs_lock:
+        job = motion_jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+
+def list_jobs():
+    with jobs_lock:
+        return [dict(job) for job in motion_jobs.values()]
+
+
+def cancel_job(job_id):
+    """Cancel a job. A running job decelerates to a stop.
+
+    Returns False if the job is unknown or already finished.
+    """
+    with jobs_lock:
+        job = motion_jobs.get(job_id)
+        if job is None:
+            return False
+        return _cancel_locked(job)
+
+
+def _cancel_locked(job):
+    if job["status"] == "queued":
+        job["status"] = "cancelled"
+        job["finished"] = time.time()
+        jobs_changed.notify_all()
+        notify_state_change()
+        return True
+    if job["status"] == "running" and _active_token is not None:
+        _active_token.cancel()
+        return True
+    return False
+
+
+def pause_motion():
+    """Decelerate the running move to a standstill and hold further jobs."""
+    with jobs_lock:
+        motor_state["paused"] = True
+        if _active_token is not None:
+            _active_token.pause()
+    notify_state_change()
+
+
+def resume_motion():
+    """Continue a paused move (with a new acceleration ramp) and the queue."""
+    with jobs_lock:
+        motor_state["paused"] = False
+        if _active_token is not None:
+            _active_token.resume()
+    notify_state_change()
+
+
+def stop_motion(timeout=5.0):
+    """Cancel every queued job and decelerate the running one to a stop.
+
+    Waits up to ``timeout`` seconds for the motor to come to rest and returns
+    the stopped job record (or None if nothing was running).
+    """
+    with jobs_lock:
+        running = None
+        for job in motion_jobs.values():
+            if job["status"] == "queued":
+                job["status"] = "cancelled"
+                job["finished"] = time.time()
+            elif job["status"] == "running":
+                running = job
+        notify_state_change()
+        if running is None:
+            return None
+        if _active_token is not None:
+            _active_token.cancel()
+        jobs_changed.wait_for(lambda: running["status"] != "running", timeout)
+        return dict(running)
 
 
 def is_motor_busy():
-    return motor_thread is not None and motor_thread.is_alive()
+    with jobs_lock:
+        return any(
+            job["status"] in ("queued", "running") for job in motion_jobs.values()
+        )
+
+
+def _prune_jobs():
+    finished = [
+        job_id
+        for job_id, job in motion_jobs.items()
+        if job["status"] not in ("queued", "running")
+    ]
+    for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        del motion_jobs[job_id]
+
+
+def _ensure_motion_thread():
+    global motion_thread
+    start_journal()
+    if motion_thread is None or not motion_thread.is_alive():
+        motion_thread = threading.Thread(
+            target=_motion_worker, name="motion-executor", daemon=True
+        )
+        motion_thread.start()
+
+
+def _motion_worker():
+    global _active_token
+    if realtime.enabled():
+        report = stepper.enter_realtime() if stepper else enter_realtime()
+        update_state(realtime=report)
+        failed = realtime.failures(report)
+        if failed:
+            print(f"Warning: real-time mode could not apply {', '.join(failed)}")
+    while True:
+        job = motion_queue.get()
+        token = MotionToken()
+        with jobs_lock:
+            if job["status"] != "queued":
+                continue
+            job["status"] = "running"
+            job["started"] = time.time()
+            if motor_state["paused"]:
+                token.pause()
+            _active_token = token
+        update_state(
+            is_moving=job["kind"] != "dwell",
+            current_job=job["id"],
+            current_plan=job["plan"],
+            steps_done=0,
+        )
+        try:
+            _run_job(job, token)
+            status, error = ("cancelled" if token.cancelled else "done"), None
+        except Exception as e:
+            status, error = "failed", str(e)
+        with jobs_lock:
+            _active_token = None
+            job["status"] = status
+            job["error"] = error
+            job["finished"] = time.time()
+            jobs_changed.notify_all()
+            # Keep reporting the plan between its jobs
+            plan = observation_plans.get(job["plan"])
+            if plan is None or _plan_status(plan) not in ("queued", "running"):
+                plan = None
+        update_state(
+            is_moving=False,
+            current_job=None,
+            current_plan=plan["id"] if plan else None,
+        )
+
+
+def _run_dwell(job, token):
+    """Hold position for the job's dwell time; pausing stops the clock."""
+    remaining = job["dwell"]
+    update_state(steps_total=0)
+    while remaining > 0:
+        token.wait_resumed()
+        if token.cancelled:
+            break
+        started = time.monotonic()
+        token.sleep(remaining)
+        remaining -= time.monotonic() - started
+
+
+def _run_jog(job, token):
+    """Follow the jog set-point until it is zero and the motor is at rest.
+
+    Pulses are issued in chunks of about ``JOG_CHUNK`` seconds, one trapezoidal
+    ramp level per step, so every change of set-point is ramped. Reversing
+    goes through a stop. Set-points below the start speed run at a constant
+    period, since the motor can start and stop there without a ramp.
+    """
+    global _jog_job
+    params = (
+        motor_state["min_step_delay"],
+        motor_state["step_delay"],
+        motor_state["accel"],
+    )
+    ramp = ramp_table(PROFILE_TRAPEZOIDAL, *params)
+    speeds = [1 / period for period in ramp]  # Steps per second, increasing
+    position = motor_state["position_steps"]
+    level = -1  # Ramp level of the last pulse, -1 at rest
+    sign = 0  # Direction of travel; positive steps lower the angle
+    done = 0
+    update_state(steps_total=0)
+    while True:
+        velocity = 0.0 if token.halt else _jog_velocity()
+        want = (velocity < 0) - (velocity > 0)
+        if level < 0 and not want:
+            if token.paused and not token.cancelled:
+                token.wait_resumed()
+                continue
+            with jobs_lock:
+                if token.cancelled or not _jog_velocity():
+                    if _jog_job is job:
+                        _jog_job = None
+                    break
+            continue
+        if level < 0:
+            sign = want
+            set_direction(sign > 0)
+            bound = position
+        if want == sign:
+            speed = abs(velocity) * MICROSTEPS_PER_REV / 360
+            top = max(0, bisect_right(speeds, speed) - 1)
+            if speed < speeds[0] and level <= 0:
+                # No ramp needed; the period is capped so a stop stays prompt
+                period = min(1 / speed, JOG_TIMEOUT)
+                count = max(1, round(JOG_CHUNK / period))
+                delays = (round(period * 1e9),) * count
+            else:
+                count = max(1, round(JOG_CHUNK * speeds[max(level, 0)]))
+                delays = jog_table_ns(level, top, count, *params)
+        else:
+            delays = decel_table_ns(max(level, 0), *params, PROFILE_TRAPEZOIDAL)
+        # Keep the journaled bound ahead of this chunk and a stop after it
+        reach = len(delays) + len(ramp)
+        if sign * (position - bound) < reach:
+            bound = position - sign * max(JOG_JOURNAL_SPAN, reach)
+            journal.begin_move(to_degrees(position), to_degrees(bound))
+        if want == sign:
+            issued = do_pulses(delays, token)
+            level += max(-issued, min(issued, top - level))
+        else:
+            issued = do_pulses(delays)
+            level = -1
+        done += issued
+        position -= sign * issued
+        motor_state["position_steps"] = position
+        motor_state["current_position"] = to_degrees(position)
+        job["steps_done"] = done
+        if level < 0:
+            journal.end_move(motor_state["current_position"], done)
+        else:
+            journal.checkpoint(motor_state["current_position"], done)
+        update_state(steps_done=done)
+    motor_state["step_remainder"] = 0.0
+
+
+def _run_job(job, token):
+    if job["kind"] == "dwell":
+        return _run_dwell(job, token)
+    if job["kind"] == "jog":
+        return _run_jog(job, token)
+    if job["kind"] != "point":
+        job["steps_done"] = _run_move(job, token)
+        return
+    # A retarget the move could not absorb (a reversal, or an end inside the
+    # stopping distance) leaves the motor off target: move again from there.
+    done = 0
+    while not token.cancelled:
+        done += _run_move(job, token)
+        job["steps_done"] = done
+        with jobs_lock:
+            if motor_state["position_steps"] == angle_to_steps(job["target_position"]):
+                break
+
+
+def _run_move(job, token):
+    """Move from the current position for ``job``; returns the steps issued."""
+    global _pointing_move
+    # Targets are rounded on the absolute microstep grid rather than from the
+    # previous position, so each move's fractional remainder carries into the
+    # next instead of accumulating.
+    start = motor_state["position_steps"]
+    with jobs_lock:
+        target = job["target_position"]
+        if target is not None:
+            motor_state["target_position"] = target
+            steps = start - angle_to_steps(target)
+            job["steps"] = steps
+        else:
+            steps = job["steps"]
+        # Positive steps drive the angle down
+        sign = 1 if steps > 0 else -1
+        if job["kind"] == "point":
+            token.take_retarget()  # Already folded into ``target``
+            _pointing_move = [start, sign, abs(steps)]
+
+    def on_progress(done):
+        journal.checkpoint(to_degrees(start - sign * done), done)
+        update_state(steps_done=done)
+
+    update_state(steps_total=abs(steps))
+    journal.begin_move(to_degrees(start), to_degrees(start - steps))
+    set_direction(steps > 0)
+    done = do_steps(
+        abs(steps), profile=job["profile"], token=token, on_progress=on_progress
+    )
+    with jobs_lock:
+        _pointing_move = None
+        target = job["target_position"]
+    motor_state["steps_done"] = done
+    position = start - sign * done
+    motor_state["position_steps"] = position
+    motor_state["current_position"] = to_degrees(position)
+    if target is not None:
+        reached = position == angle_to_steps(target)
+        motor_state["step_remainder"] = (
+            to_microsteps(target) - position if reached else 0.0
+        )
+    journal.end_move(motor_state["current_position"], done)
+    return done
+
+
+# Forked last, so the child inherits the fully initialized module
+stepper = StepProcess() if os.environ.get("MUON_STEP_PROCESS") else None
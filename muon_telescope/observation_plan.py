@@ -0,0 +1,59 @@
+"""
+Observation plans: lists of (angle, dwell seconds) exposures.
+
+The plan is reordered to minimize total slew before it is queued. On a
+single axis the shortest route through every angle goes to the nearer end
+of the range first and then sweeps across to the other end, so only two
+candidate orders need to be compared.
+"""
+
+import math
+
+# Pointing range in degrees either side of the zenith; also bounds the
+# control form's angle slider
+ANGLE_LIMIT = 75
+MAX_ENTRIES = 500
+
+
+def parse_entries(entries):
+    """Validate raw ``[{"angle": ..., "dwell": ...}, ...]`` or pair entries.
+
+    Returns a list of ``(angle, dwell)`` tuples; raises ValueError.
+    """
+    if not entries:
+        raise ValueError("A plan needs at least one entry")
+    if len(entries) > MAX_ENTRIES:
+        raise ValueError(f"A plan may have at most {MAX_ENTRIES} entries")
+    parsed = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            angle, dwell = entry.get("angle"), entry.get("dwell", 0)
+        else:
+            angle, dwell = entry
+        angle, dwell = float(angle), float(dwell)
+        if not (math.isfinite(angle) and math.isfinite(dwell)):
+            raise ValueError("Angles and dwell times must be finite numbers")
+        if not -ANGLE_LIMIT <= angle <= ANGLE_LIMIT:
+            raise ValueError(f"Angle {angle:g} is outside ±{ANGLE_LIMIT}°")
+        if dwell < 0:
+            raise ValueError("Dwell times must not be negative")
+        parsed.append((angle, dwell))
+    return parsed
+
+
+def order_entries(entries, start):
+    """Return ``entries`` ordered to minimize the total slew from ``start``."""
+    ascending = sorted(entries, key=lambda entry: entry[0])
+    low, high = ascending[0][0], ascending[-1][0]
+    if abs(start - low) <= abs(start - high):
+        return ascending
+    return ascending[::-1]
+
+
+def slew_distance(entries, start):
+    """Total angle travelled visiting ``entries`` in order from ``start``."""
+    total = 0.0
+    for angle, _ in entries:
+        total += abs(angle - start)
+        start = angle
+    return total
@@ -0,0 +1,173 @@
+"""
+Append-only journal of the motor position.
+
+The journal lets the position survive restarts so the telescope does not
+have to be re-homed. Records are JSON lines:
+
+* ``pos``   - the motor is at rest at ``position``
+* ``begin`` - a move from ``start`` to ``target`` started (in-motion marker)
+* ``check`` - step-count checkpoint during a move
+* ``end``   - the move finished at ``position``
+
+Callers only append to an in-memory batch; a writer thread writes batches and
+fsyncs them at most every ``fsync_interval`` seconds (immediately for ``pos``,
+``begin`` and ``end`` records), so the stepping loop never blocks on disk I/O.
+On startup the journal is replayed and compacted to its last state. A
+``begin`` without a matching ``end`` means the process died mid-move; the
+position is then only known to lie between the last durable checkpoint and
+the move's target.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+FSYNC_INTERVAL = 0.5
+
+
+class PositionJournal:
+    """Durable, batched record of the motor position."""
+
+    def __init__(self, path, fsync_interval=FSYNC_INTERVAL):
+        self.path = Path(path)
+        self.fsync_interval = fsync_interval
+        self._pending = []
+        self._durable = False
+        self._written = 0
+        self._queued = 0
+        self._cond = threading.Condition()
+        self._file = None
+        self._thread = None
+
+    def recover(self):
+        """Replay and compact the journal, then start the writer thread.
+
+        Returns a dict with the recovered ``position`` (None for an empty
+        journal), whether a move was ``interrupted`` and, if so, the
+        ``bounds`` the true position lies within.
+        """
+        state = {"position": None, "interrupted": False, "bounds": None}
+        move = None
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Torn write at the end of the file
+                    kind = record.get("type")
+                    if kind in ("pos", "end"):
+                        state["position"] = record["position"]
+                        move = None
+                    elif kind == "begin":
+                        state["position"] = record["start"]
+                        move = record
+                    elif kind == "check" and move is not None:
+                        state["position"] = record["position"]
+        if move is not None:
+            low, high = sorted((state["position"], move["target"]))
+            state.update(interrupted=True, bounds=[low, high])
+        self._compact(state, move)
+        self._file = open(self.path, "a")
+        self._thread = threading.Thread(
+            target=self._writer, name="position-journal", daemon=True
+        )
+        self._thread.start()
+        return state
+
+    def _compact(self, state, move):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            if move is not None:
+                # Keep the in-motion marker until the position is confirmed
+                f.write(_line({k: move[k] for k in ("type", "start", "target")}))
+                f.write(_line({"type": "check", "position": state["position"]}))
+            elif state["position"] is not None:
+                f.write(_line({"type": "pos", "position": state["position"]}))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def _append(self, record, durable):
+        record["t"] = round(time.time(), 3)
+        with self._cond:
+            self._pending.append(_line(record))
+            self._queued += 1
+            self._durable = self._durable or durable
+            self._cond.notify()
+
+    def record_position(self, position):
+        self._append({"type": "pos", "position": position}, durable=True)
+
+    def begin_move(self, start, target):
+        self._append({"type": "begin", "start": start, "target": target}, True)
+
+    def checkpoint(self, position, steps_done):
+        self._append(
+            {"type": "check", "position": position, "steps": steps_done}, False
+        )
+
+    def end_move(self, position, steps_done):
+        self._append({"type": "end", "position": position, "steps": steps_done}, True)
+
+    def flush(self, timeout=5.0):
+        """Wait until everything appended so far is on disk."""
+        with self._cond:
+            target = self._queued
+            self._durable = True
+            self._cond.notify()
+            return self._cond.wait_for(lambda: self._written >= target, timeout)
+
+    def _writer(self):
+        last_sync = 0.0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending)
+                if not self._durable:
+                    # Let checkpoints accumulate into one batch per interval
+                    delay = last_sync + self.fsync_interval - time.monotonic()
+                    if delay > 0:
+                        self._cond.wait_for(lambda: self._durable, delay)
+                batch, self._pending = self._pending, []
+                self._durable = False
+            self._file.write("".join(batch))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            last_sync = time.monotonic()
+            with self._cond:
+                self._written += len(batch)
+                self._cond.notify_all()
+
+
+class NullJournal:
+    """Stand-in used when journaling is disabled."""
+
+    def recover(self):
+        return {"position": None, "interrupted": False, "bounds": None}
+
+    def record_position(self, position):
+        pass
+
+    def begin_move(self, start, target):
+        pass
+
+    def checkpoint(self, position, steps_done):
+        pass
+
+    def end_move(self, position, steps_done):
+        pass
+
+    def flush(self, timeout=5.0):
+        return True
+
+
+def open_journal(path):
+    """Return a journal for ``path``, or a no-op journal if ``path`` is empty."""
+    return PositionJournal(path) if path else NullJournal()
+
+
+def _line(record):
+    return json.dumps(record, separators=(",", ":")) + "\n"
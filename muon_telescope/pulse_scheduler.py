@@ -0,0 +1,115 @@
+"""
+Deadline based pulse timing.
+
+Pulses are scheduled against absolute ``time.perf_counter_ns()`` deadlines so
+that an oversleep on one edge shortens the next wait instead of stretching the
+whole move. The scheduler sleeps for the bulk of each wait and busy-waits for
+the last ``spin_ns`` nanoseconds, and a ``JitterRecorder`` keeps track of how
+late every pulse actually fired.
+"""
+
+import time
+from array import array
+from bisect import bisect_left
+
+# Busy-wait for the final stretch before a deadline; time.sleep() routinely
+# overshoots by 50-100 us on the Pi.
+SPIN_NS = 150_000
+
+# Upper bucket edges of the lateness histogram, in microseconds
+HISTOGRAM_EDGES_US = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class PulseScheduler:
+    """Wait for absolute nanosecond deadlines."""
+
+    def __init__(self, spin_ns=SPIN_NS, clock=time.perf_counter_ns, sleep=time.sleep):
+        self.spin_ns = spin_ns
+        self.clock = clock
+        self.sleep = sleep
+
+    def now(self):
+        return self.clock()
+
+    def wait_until(self, deadline):
+        """Block until ``deadline`` and return how late we woke up, in ns."""
+        clock = self.clock
+        remaining = deadline - clock()
+        if remaining > self.spin_ns:
+            self.sleep((remaining - self.spin_ns) / 1e9)
+        now = clock()
+        while now < deadline:
+            now = clock()
+        return now - deadline
+
+
+class VirtualClock:
+    """Nanosecond clock that only moves when something sleeps on it.
+
+    Used with ``PulseScheduler(spin_ns=0, clock=vc.now, sleep=vc.sleep)`` a
+    move runs as fast as the loop can go while every edge still gets the
+    timestamp it would have had in real time.
+    """
+
+    def __init__(self, start_ns=0):
+        self.ns = start_ns
+
+    def now(self):
+        return self.ns
+
+    def sleep(self, seconds):
+        self.ns += max(0, round(seconds * 1e9))
+
+    def advance(self, ns):
+        self.ns += ns
+
+
+class JitterRecorder:
+    """Collect per-pulse lateness for one move."""
+
+    def __init__(self, capacity=0):
+        self.samples = array("q", bytes(8 * capacity))
+        self.count = 0
+
+    def reset(self, capacity=0):
+        """Start a new move, growing the buffer to ``capacity`` if needed."""
+        self.count = 0
+        if capacity > len(self.samples):
+            self.samples.frombytes(bytes(8 * (capacity - len(self.samples))))
+
+    def add(self, lateness_ns):
+        if self.count < len(self.samples):
+            self.samples[self.count] = lateness_ns
+        else:
+            self.samples.append(lateness_ns)
+        self.count += 1
+
+    def summary(self):
+        """Return p50/p99/max/total lateness in microseconds and a histogram."""
+        if not self.count:
+            return {
+                "pulses": 0,
+                "p50_us": 0.0,
+                "p99_us": 0.0,
+                "max_us": 0.0,
+                "sum_us": 0.0,
+            }
+        ordered = sorted(self.samples[: self.count])
+        histogram = [0] * (len(HISTOGRAM_EDGES_US) + 1)
+        for sample in ordered:
+            histogram[bisect_left(HISTOGRAM_EDGES_US, sample / 1000)] += 1
+        labels = [f"<={edge}us" for edge in HISTOGRAM_EDGES_US]
+        labels.append(f">{HISTOGRAM_EDGES_US[-1]}us")
+        return {
+            "pulses": self.count,
+            "p50_us": round(_percentile(ordered, 0.50) / 1000, 1),
+            "p99_us": round(_percentile(ordered, 0.99) / 1000, 1),
+            "max_us": round(ordered[-1] / 1000, 1),
+            "sum_us": sum(ordered) / 1000,
+            "histogram": dict(zip(labels, histogram)),
+        }
+
+
+def _percentile(ordered, fraction):
+    index = min(len(ordered) - 1, int(fraction * len(ordered)))
+    return ordered[index]
@@ -0,0 +1,114 @@
+"""
+Opt-in real-time mode for the stepping thread.
+
+Set ``MUON_REALTIME=1`` and the motion worker, when it starts, will
+
+* pin itself to ``MUON_REALTIME_CPUS`` (e.g. ``3`` or ``2-3``), ideally cores
+  kept free with ``isolcpus=`` on the kernel command line;
+* switch itself to ``SCHED_FIFO`` at ``MUON_REALTIME_PRIORITY`` (default 50),
+  so it preempts Django threads as soon as its sleep ends. This is only done
+  once pinned to a subset of the CPUs: the pulse scheduler busy-waits, and a
+  spinning FIFO thread would starve everything sharing its core;
+* ``gc.freeze()`` everything allocated so far, and keep the collector off for
+  the duration of each move;
+* preallocate the per-pulse lateness buffer so moves do not allocate it.
+
+Every setting can fail without root or ``CAP_SYS_NICE``. Failures are
+reported instead of raised; the report is published as
+``motor_state["realtime"]``. The GIL is still shared: the thread only wins
+the race when it wakes up, it cannot interrupt a request holding the GIL.
+"""
+
+import gc
+import os
+import threading
+from contextlib import contextmanager, nullcontext
+
+DEFAULT_PRIORITY = 50
+
+_local = threading.local()
+
+
+def parse_cpus(text):
+    """Parse ``"2,3"`` or ``"2-3"`` into a set of CPU numbers."""
+    cpus = set()
+    for part in text.replace(",", " ").split():
+        first, _, last = part.partition("-")
+        cpus.update(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def enabled():
+    return os.environ.get("MUON_REALTIME", "") not in ("", "0")
+
+
+def _try(report, name, action):
+    try:
+        detail = action()
+    except (AttributeError, OSError, ValueError) as e:
+        report[name] = {"applied": False, "error": str(e)}
+    else:
+        report[name] = {"applied": True, **(detail or {})}
+
+
+def apply_to_current_thread(priority=None, cpus=None):
+    """Apply CPU affinity, SCHED_FIFO and ``gc.freeze()`` to the calling thread.
+
+    Returns ``{setting: {"applied": bool, ...}}``. Afterwards
+    ``gc_paused()`` keeps the collector off while this thread moves.
+    """
+    if priority is None:
+        priority = int(os.environ.get("MUON_REALTIME_PRIORITY", DEFAULT_PRIORITY))
+    if cpus is None:
+        cpus = parse_cpus(os.environ.get("MUON_REALTIME_CPUS", ""))
+    report = {}
+    available = os.sched_getaffinity(0) if hasattr(os, "sched_getaffinity") else cpus
+
+    def affinity():
+        if not cpus:
+            raise ValueError("MUON_REALTIME_CPUS not set")
+        # pid 0 is the calling thread on Linux
+        os.sched_setaffinity(0, cpus)
+        return {"cpus": sorted(os.sched_getaffinity(0))}
+
+    def fifo():
+        if not report["affinity"]["applied"] or not available - cpus:
+            raise ValueError("needs MUON_REALTIME_CPUS to leave other CPUs free")
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+        return {"priority": priority}
+
+    def freeze():
+        gc.collect()
+        gc.freeze()
+        return {"frozen": gc.get_freeze_count()}
+
+    _try(report, "affinity", affinity)
+    _try(report, "sched_fifo", fifo)
+    _try(report, "gc_freeze", freeze)
+    _local.active = True
+    return report
+
+
+def active():
+    """True if real-time settings were applied to the calling thread."""
+    return getattr(_local, "active", False)
+
+
+@contextmanager
+def _gc_disabled():
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def gc_paused():
+    """Context manager that holds off garbage collection in real-time threads."""
+    return _gc_disabled() if active() else nullcontext()
+
+
+def failures(report):
+    return [name for name, result in report.items() if not result["applied"]]
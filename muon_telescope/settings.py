@@ -55,6 +55,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "muon_telescope.metrics.MetricsMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -144,6 +145,18 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
+# Number of movement log entries kept in memory (ring buffer)
+MOVEMENT_LOG_SIZE = int(os.getenv("MOVEMENT_LOG_SIZE", "1000"))
+
+# Forward motion commands to another instance's API (e.g. http://pi:8000/api);
+# empty means the motor is driven from this process
+MOTION_BACKEND_URL = os.getenv("MOTION_BACKEND_URL", "")
+MOTION_BACKEND_TIMEOUT = (2.0, 10.0)  # (connect, read) seconds
+MOTION_BACKEND_POOL_SIZE = 10
+
+# Width in degrees of the angle bins served by /api/flux/
+FLUX_BIN_WIDTH = float(os.getenv("FLUX_BIN_WIDTH", "5"))
+
 LOGIN_REDIRECT_URL = "/control/"
 LOGOUT_REDIRECT_URL = "/login/"
 LOGIN_URL = "/login/"
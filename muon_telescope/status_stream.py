@@ -0,0 +1,245 @@
+"""
+Push-based status stream for the dashboard.
+
+Served directly from the ASGI application (see ``asgi.py``):
+
+* ``/ws/status/`` - WebSocket, one JSON text frame per change
+* ``/api/status/stream/`` - Server-Sent Events for clients without WebSockets
+
+Each message carries only the status fields that changed since the previous
+message plus any new movement log entries::
+
+    {"version": 42, "status": {"current_position": 12.5}, "logs": [...]}
+
+The first message carries the latest ``INITIAL_LOGS`` entries, or with
+``?since=<seq>`` on the connection URL only the entries after that cursor.
+
+While an observation plan runs, messages also carry its progress and ETA
+under ``"plan"`` (the last one shows the plan's final state).
+
+A single watcher thread waits on ``motor_control.wait_for_state_change`` and
+wakes the asyncio subscribers, so idle viewers cost nothing. Under ASGI the
+status long-poll views (``?since=&wait=``) park on the same watcher in
+``long_poll`` before the request reaches Django.
+"""
+
+import asyncio
+import json
+import re
+import threading
+from urllib.parse import parse_qsl, urlencode
+
+from muon_telescope.motion import get_plan, status_snapshot, wait_for_state_change
+
+# Minimum time between two messages to the same subscriber
+MIN_PUSH_INTERVAL = 0.1
+# SSE comment sent when nothing changed for this long, keeps proxies from timing out
+KEEPALIVE_INTERVAL = 15.0
+# Log entries included in the first message of a stream
+INITIAL_LOGS = 20
+# Longest a status long-poll (?wait=) may hold a request open, in seconds
+MAX_LONG_POLL = 30.0
+# Views that support ?since=&wait= long-polling
+LONG_POLL_PATH = re.compile(r"/api/(status|motor_busy|plans/\d+)/")
+
+
+class StatusBroadcaster:
+    """Relay motor state changes from the motion thread to asyncio tasks.
+
+    One watcher thread serves every event loop in the process: each loop
+    with waiters gets its own ``asyncio.Event``, and all of them are set on
+    a change. (Under WSGI every request runs its own loop.)
+    """
+
+    def __init__(self):
+        self.version = None
+        self.events = {}  # event loop -> Event set on the next change
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def ensure_started(self):
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.version = status_snapshot()["version"]
+            self.thread = threading.Thread(
+                target=self._watch, name="status-broadcaster", daemon=True
+            )
+            self.thread.start()
+
+    def _watch(self):
+        version = self.version
+        while True:
+            version = wait_for_state_change(version, timeout=KEEPALIVE_INTERVAL)
+            with self.lock:
+                if version == self.version:
+                    continue
+                self.version = version
+                loops = list(self.events)
+            for loop in loops:
+                try:
+                    loop.call_soon_threadsafe(self._publish, loop)
+                except RuntimeError:
+                    with self.lock:  # Event loop closed
+                        self.events.pop(loop, None)
+
+    def _publish(self, loop):
+        with self.lock:
+            changed = self.events.pop(loop, None)
+        if changed is not None:
+            changed.set()
+
+    def _changed(self):
+        """Return this loop's change event and the version it is relative to."""
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            for closed in [other for other in self.events if other.is_closed()]:
+                del self.events[closed]
+            changed = self.events.get(loop)
+            if changed is None:
+                changed = self.events[loop] = asyncio.Event()
+            return changed, self.version
+
+    async def wait(self, since, closed, timeout):
+        """Wait until the version moves past ``since``, the client leaves or timeout."""
+        self.ensure_started()
+        changed, version = self._changed()
+        if version != since:
+            return
+        waiters = {
+            asyncio.ensure_future(changed.wait()),
+            asyncio.ensure_future(closed.wait()),
+        }
+        try:
+            await asyncio.wait(
+                waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+
+broadcaster = StatusBroadcaster()
+
+
+async def wait_for_change(since, timeout):
+    """Wait on the event loop until the state version moves past ``since``."""
+    await broadcaster.wait(since, asyncio.Event(), timeout)
+
+
+async def long_poll(scope, receive, send, app):
+    """Hold a ``?since=&wait=`` status request until the state moves, then call ``app``.
+
+    The wait happens here, ahead of Django, because a sync-only middleware in
+    the stack would otherwise keep a worker thread for the whole wait. The
+    ``wait`` parameter is dropped before the request is passed on, so the
+    view answers at once.
+    """
+    query = parse_qsl(scope.get("query_string", b"").decode("latin-1"))
+    params = dict(query)
+    try:
+        since = int(params["since"])
+        wait = min(float(params["wait"]), MAX_LONG_POLL)
+    except (KeyError, ValueError):
+        return await app(scope, receive, send)  # The view reports bad values
+    if wait > 0:
+        await wait_for_change(since, wait)
+    query = [(key, value) for key, value in query if key != "wait"]
+    scope = dict(scope, query_string=urlencode(query).encode("latin-1"))
+    return await app(scope, receive, send)
+
+
+def _new_logs(after_seq):
+    from control.services import movement_logs
+
+    if after_seq is None:
+        return movement_logs.latest(INITIAL_LOGS)
+    return movement_logs.since(after_seq)
+
+
+def _log_cursor(scope):
+    """The ``?since=<log seq>`` a client reconnects with, or None."""
+    params = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+    try:
+        return int(params["since"])
+    except (KeyError, ValueError):
+        return None
+
+
+async def _stream(emit, receive, disconnect_type, last_seq=None):
+    closed = asyncio.Event()
+
+    async def watch_disconnect():
+        while (await receive())["type"] != disconnect_type:
+            pass
+        closed.set()
+
+    watcher = asyncio.ensure_future(watch_disconnect())
+    last_status = {}
+    plan_id = None
+    try:
+        while not closed.is_set():
+            status = status_snapshot()
+            version = status.pop("version")
+            changes = {
+                key: value
+                for key, value in status.items()
+                if key not in last_status or last_status[key] != value
+            }
+            logs = _new_logs(last_seq)
+            if changes or logs:
+                message = {"version": version, "status": changes, "logs": logs}
+                plan_id = status["current_plan"] or plan_id
+                if plan_id is not None:
+                    message["plan"] = get_plan(plan_id)
+                    plan_id = status["current_plan"]
+                await emit(message)
+                last_status = status
+                if logs:
+                    last_seq = logs[-1]["seq"]
+            else:
+                await emit(None)
+            await asyncio.sleep(MIN_PUSH_INTERVAL)
+            await broadcaster.wait(version, closed, KEEPALIVE_INTERVAL)
+    finally:
+        watcher.cancel()
+
+
+async def status_websocket(scope, receive, send):
+    """ASGI handler for ``/ws/status/``."""
+    if (await receive())["type"] != "websocket.connect":
+        return
+    await send({"type": "websocket.accept"})
+
+    async def emit(message):
+        if message is not None:
+            await send({"type": "websocket.send", "text": json.dumps(message)})
+
+    await _stream(emit, receive, "websocket.disconnect", _log_cursor(scope))
+
+
+async def status_sse(scope, receive, send):
+    """ASGI handler for ``/api/status/stream/`` (text/event-stream)."""
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ],
+        }
+    )
+
+    async def emit(message):
+        if message is None:
+            body = b": keepalive\n\n"
+        else:
+            body = f"data: {json.dumps(message)}\n\n".encode()
+        await send({"type": "http.response.body", "body": body, "more_body": True})
+
+    try:
+        await _stream(emit, receive, "http.disconnect", _log_cursor(scope))
+    except OSError:
+        pass
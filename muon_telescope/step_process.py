@@ -0,0 +1,268 @@
+"""
+Stepping loop in a child process.
+
+With ``MUON_STEP_PROCESS=1`` the pulse loop runs in a forked child, so the
+``GPIO.output`` calls of a move no longer compete with request handling for
+the web process's GIL. ``do_steps`` sends the move down a pipe and waits for
+the reply (``do_pulses``, used for jogging, sends its pulse train the same
+way); the child inherits the GPIO lines claimed at import time.
+
+Live progress is published by the child in a ``multiprocessing.shared_memory``
+block laid out as::
+
+    0   u64  sequence number (odd while a write is in progress)
+    8   i64  steps done in the current move
+    16  i64  steps in the current move
+    24  i64  position in microsteps
+    32  i64  pulses issued since start
+    40  u8   1 while pulses are being issued
+    48  u8   halt flag   (parent -> child: decelerate and wait)
+    49  u8   cancel flag (parent -> child: decelerate and finish)
+    50  u8   retarget sequence (parent -> child: bumped for each retarget)
+    56  i64  retarget length in steps, valid once the sequence changes
+
+The child is the only writer of the status fields and wraps every update in
+a seqlock: it makes the sequence number odd, writes, then makes it even
+again. ``StatusBlock.read`` retries until it sees the same even number before
+and after copying the fields, so readers never wait on the child and the
+child never waits on readers. The parent mirrors its ``MotionToken`` into the
+flag and retarget fields while it polls for the reply.
+"""
+
+import multiprocessing
+import struct
+import time
+from multiprocessing import shared_memory
+
+SEQ = struct.Struct("<Q")
+FIELDS = struct.Struct("<qqqqB")
+FIELDS_OFFSET = SEQ.size
+HALT_OFFSET = 48
+CANCEL_OFFSET = 49
+RETARGET_SEQ_OFFSET = 50
+RETARGET = struct.Struct("<q")
+RETARGET_OFFSET = 56
+BLOCK_SIZE = 64
+
+# How often the parent mirrors cancel/pause and reports progress, in seconds
+POLL_INTERVAL = 0.005
+# How often the child checks the flags while paused
+RESUME_POLL = 0.002
+
+
+class StatusBlock:
+    """Seqlock-protected step status in shared memory."""
+
+    def __init__(self):
+        self.shm = shared_memory.SharedMemory(create=True, size=BLOCK_SIZE)
+        self.buf = self.shm.buf
+        self.buf[:BLOCK_SIZE] = bytes(BLOCK_SIZE)
+
+    def write(self, steps_done, steps_total, position, pulses, moving):
+        """Publish new values; only the child calls this."""
+        buf = self.buf
+        seq = SEQ.unpack_from(buf)[0]
+        SEQ.pack_into(buf, 0, seq + 1)
+        FIELDS.pack_into(
+            buf, FIELDS_OFFSET, steps_done, steps_total, position, pulses, moving
+        )
+        SEQ.pack_into(buf, 0, seq + 2)
+
+    def read(self):
+        """Return a consistent copy of the status fields without locking."""
+        buf = self.buf
+        while True:
+            before = SEQ.unpack_from(buf)[0]
+            if before & 1:
+                continue
+            fields = FIELDS.unpack_from(buf, FIELDS_OFFSET)
+            if SEQ.unpack_from(buf)[0] == before:
+                break
+        steps_done, steps_total, position, pulses, moving = fields
+        return {
+            "steps_done": steps_done,
+            "steps_total": steps_total,
+            "position_steps": position,
+            "pulses": pulses,
+            "moving": bool(moving),
+        }
+
+    def set_flags(self, halt, cancel):
+        self.buf[HALT_OFFSET] = int(halt)
+        self.buf[CANCEL_OFFSET] = int(cancel)
+
+    def set_retarget(self, seq, steps):
+        # Length first: the child only looks at it after the sequence changes
+        RETARGET.pack_into(self.buf, RETARGET_OFFSET, steps)
+        self.buf[RETARGET_SEQ_OFFSET] = seq & 0xFF
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+class _SharedToken:
+    """Child-side view of the parent's ``MotionToken`` flags."""
+
+    def __init__(self, buf):
+        self._buf = buf
+        self._taken = buf[RETARGET_SEQ_OFFSET]
+
+    @property
+    def halt(self):
+        buf = self._buf
+        return buf[HALT_OFFSET] != 0 or buf[RETARGET_SEQ_OFFSET] != self._taken
+
+    @property
+    def cancelled(self):
+        return self._buf[CANCEL_OFFSET] != 0
+
+    @property
+    def paused(self):
+        return self._buf[HALT_OFFSET] != 0 and not self.cancelled
+
+    def skip_retargets(self, seq):
+        """Ignore retargets up to ``seq``; they were meant for an earlier move."""
+        self._taken = seq & 0xFF
+
+    def take_retarget(self):
+        seq = self._buf[RETARGET_SEQ_OFFSET]
+        if seq == self._taken:
+            return None
+        self._taken = seq
+        return RETARGET.unpack_from(self._buf, RETARGET_OFFSET)[0]
+
+    def wait_resumed(self):
+        buf = self._buf
+        while buf[HALT_OFFSET] and not buf[CANCEL_OFFSET]:
+            time.sleep(RESUME_POLL)
+
+
+def _child_main(conn, block):
+    from muon_telescope import motor_control, realtime
+
+    token = _SharedToken(block.buf)
+    scheduler = motor_control.gpio.scheduler()
+    pulses = 0
+    while True:
+        try:
+            command, *args = conn.recv()
+        except EOFError:
+            break
+        if command == "quit":
+            break
+        try:
+            if command == "realtime":
+                conn.send((motor_control.enter_realtime(), None))
+                continue
+            if command == "move":
+                steps, params, ready_ns, start, sign, seq = args
+                loop = motor_control._step_loop
+                loop_args = (steps, params, token, scheduler, ready_ns)
+            else:
+                delays, interruptible, ready_ns, start, sign, seq = args
+                steps = len(delays)
+                loop = motor_control._train
+                halts = token if interruptible else motor_control._NEVER_CANCELLED
+                loop_args = (delays, halts, scheduler, ready_ns)
+            token.skip_retargets(seq)
+
+            def publish(done):
+                block.write(done, steps, start - sign * done, pulses + done, 1)
+
+            block.write(0, steps, start, pulses, 1)
+            with realtime.gc_paused():
+                done, summary = loop(*loop_args, publish)
+            pulses += done
+            block.write(done, steps, start - sign * done, pulses, 0)
+            conn.send(((done, summary), None))
+        except Exception as e:
+            conn.send((None, f"{type(e).__name__}: {e}"))
+
+
+class StepProcess:
+    """Parent-side handle on the stepping child process."""
+
+    def __init__(self):
+        self.block = StatusBlock()
+        self.retarget_seq = 0
+        self.conn, child_conn = multiprocessing.Pipe()
+        context = multiprocessing.get_context("fork")
+        self.process = context.Process(
+            target=_child_main,
+            args=(child_conn, self.block),
+            name="muon-stepper",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def _mirror(self, token):
+        """Copy the flags of ``token`` and pass on its newest retarget."""
+        self.block.set_flags(token.paused or token.cancelled, token.cancelled)
+        steps = token.take_retarget()
+        if steps is not None:
+            self.retarget_seq += 1
+            self.block.set_retarget(self.retarget_seq, steps)
+
+    def _call(self, *command, token=None, on_progress=None, stride=1):
+        self.conn.send(command)
+        next_report = stride
+        while not self.conn.poll(POLL_INTERVAL):
+            if token is not None:
+                self._mirror(token)
+            if on_progress is not None:
+                done = self.block.read()["steps_done"]
+                if done >= next_report:
+                    on_progress(done)
+                    next_report = done - done % stride + stride
+        result, error = self.conn.recv()
+        if error is not None:
+            raise RuntimeError(f"Step process failed: {error}")
+        return result
+
+    def move(self, steps, params, token, ready_ns, start, sign, on_progress, stride):
+        """Run one move in the child; returns ``(steps done, jitter summary)``."""
+        self.block.set_flags(token.paused or token.cancelled, token.cancelled)
+        return self._call(
+            "move",
+            steps,
+            params,
+            ready_ns,
+            start,
+            sign,
+            self.retarget_seq,
+            token=token,
+            on_progress=on_progress,
+            stride=stride,
+        )
+
+    def train(self, delays, token, ready_ns, start, sign):
+        """Issue pulses at ``delays`` in the child; see ``motor_control.do_pulses``."""
+        if token is not None:
+            self.block.set_flags(token.paused or token.cancelled, token.cancelled)
+        return self._call(
+            "train",
+            delays,
+            token is not None,
+            ready_ns,
+            start,
+            sign,
+            self.retarget_seq,
+            token=token,
+        )
+
+    def enter_realtime(self):
+        """Apply real-time mode inside the child; returns its report."""
+        return self._call("realtime")
+
+    def status(self):
+        return self.block.read()
+
+    def close(self):
+        if self.process.is_alive():
+            self.conn.send(("quit",))
+            self.process.join(timeout=5)
+        self.conn.close()
+        self.block.close()
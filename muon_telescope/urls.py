@@ -43,6 +43,32 @@ urlpatterns = [
     path(
         "api/motor/reset/", control_views.api_reset_position, name="api_reset_position"
     ),
+    path("api/motor/jobs/", control_views.api_list_jobs, name="api_list_jobs"),
+    path(
+        "api/motor/jobs/<int:job_id>/",
+        control_views.api_job_status,
+        name="api_job_status",
+    ),
+    path(
+        "api/motor/jobs/<int:job_id>/cancel/",
+        control_views.api_cancel_job,
+        name="api_cancel_job",
+    ),
+    path("api/plans/", control_views.api_submit_plan, name="api_submit_plan"),
+    path(
+        "api/plans/<int:plan_id>/",
+        control_views.api_plan_status,
+        name="api_plan_status",
+    ),
+    path(
+        "api/plans/<int:plan_id>/cancel/",
+        control_views.api_cancel_plan,
+        name="api_cancel_plan",
+    ),
+    path("api/scan/", control_views.api_flux_scan, name="api_flux_scan"),
+    path("api/scan/stop/", control_views.api_stop_flux_scan, name="api_stop_flux_scan"),
+    path("api/counts/", control_views.api_record_counts, name="api_record_counts"),
+    path("api/flux/", control_views.api_flux, name="api_flux"),
     path("api/status/", control_views.api_motor_status, name="api_motor_status"),
     path("api/logs/", control_views.api_movement_logs, name="api_movement_logs"),
     path("api/goto_angle/", control_views.api_goto_angle, name="api_goto_angle"),
@@ -65,6 +91,7 @@ urlpatterns = [
         "api/set_direction/", control_views.api_set_direction, name="api_set_direction"
     ),
     path("api/health/", control_views.api_health, name="api_health"),
+    path("metrics", control_views.metrics_view, name="metrics"),
     path("api/shutdown/", control_views.api_shutdown, name="api_shutdown"),
     path(
         "api/set_step_period/",
@@ -73,6 +100,7 @@ urlpatterns = [
     ),
     path("api/do_steps/", control_views.api_do_steps, name="api_do_steps"),
     # path("api/do_steps_pwm/", control_views.api_do_steps_pwm, name="api_do_steps_pwm"),
+    path("api/motor_busy/", control_views.api_motor_busy, name="api_motor_busy"),
     path("api/quit_motor/", control_views.api_quit_motor, name="api_quit_motor"),
     path("api/pause_motor/", control_views.api_pause_motor, name="api_pause_motor"),
     path("api/resume_motor/", control_views.api_resume_motor, name="api_resume_motor"),
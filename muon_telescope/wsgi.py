@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "muon_telescope.settings")
 
 application = get_wsgi_application()
+
+from muon_telescope.motion import start_journal  # noqa: E402
+
+start_journal()
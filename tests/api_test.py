@@ -1,6 +1,8 @@
 from django.test import TestCase, Client
 from django.urls import reverse
 
+from muon_telescope.motor_control import motor_state
+
 
 class MotorApiTests(TestCase):
     def setUp(self):
@@ -20,3 +22,38 @@ class MotorApiTests(TestCase):
     def test_status(self):
         response = self.client.get("/api/status/")
         self.assertIn(response.status_code, [200, 403])
+
+
+class StepPeriodApiTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.saved = dict(motor_state)
+        motor_state.update(step_delay=0.004, min_step_delay=0.001)
+
+    def tearDown(self):
+        motor_state.update(self.saved)
+
+    def post(self, data):
+        return self.client.post(
+            "/api/set_step_period/", data, content_type="application/json"
+        )
+
+    def test_period_defaults_to_current_step_delay(self):
+        response = self.post({"min_period_ms": 0.5})
+        self.assertEqual(response.status_code, 200)
+        self.assertAlmostEqual(motor_state["step_delay"], 0.004)
+        self.assertAlmostEqual(motor_state["min_step_delay"], 0.0005)
+
+    def test_min_period_longer_than_period_rejected(self):
+        response = self.post({"period_ms": 2, "min_period_ms": 3})
+        self.assertEqual(response.status_code, 400)
+        self.assertAlmostEqual(motor_state["step_delay"], 0.004)
+        self.assertAlmostEqual(motor_state["min_step_delay"], 0.001)
+
+    def test_periods_are_coerced_and_validated_as_numbers(self):
+        response = self.post({"period_ms": "8", "min_period_ms": "2"})
+        self.assertEqual(response.status_code, 200)
+        self.assertAlmostEqual(motor_state["step_delay"], 0.008)
+        self.assertAlmostEqual(motor_state["min_step_delay"], 0.002)
+        for body in ({"period_ms": "nan"}, {"period_ms": None}, {"period_ms": "fast"}):
+            self.assertEqual(self.post(body).status_code, 400, body)
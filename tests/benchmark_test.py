@@ -0,0 +1,62 @@
+import copy
+
+from django.test import TestCase
+from muon_telescope import benchmark, motor_control
+from muon_telescope.benchmark import compare, run_benchmark
+from muon_telescope.motor_control import motor_state
+
+
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        self.saved = dict(motor_state)
+
+    def tearDown(self):
+        motor_state.update(self.saved)
+
+    def test_results_cover_every_measurement(self):
+        results = run_benchmark(
+            steps=300, profiles=["trapezoidal"], clients=1, repeat=1
+        )
+        self.assertEqual(results["params"]["steps"], 300)
+        entry = results["profiles"]["trapezoidal"]
+        self.assertGreater(entry["max_rate_hz"], 0)
+        self.assertGreaterEqual(entry["gpio_ns_per_pulse"], 0)
+        self.assertEqual(entry["idle"]["pulses"], 300)
+        self.assertEqual(entry["load"]["pulses"], 300)
+        self.assertGreater(entry["http_requests_per_s"], 0)
+        self.assertEqual(entry["http_errors"], 0)
+
+    def test_driver_stays_disabled_and_state_is_restored(self):
+        motor_control.enable_motor()
+        enabled = []
+        real_timed_move = benchmark._timed_move
+
+        def timed_move(*args):
+            enabled.append(motor_state["is_enabled"])
+            return real_timed_move(*args)
+
+        benchmark._timed_move = timed_move
+        try:
+            run_benchmark(steps=50, profiles=["constant"], clients=0, repeat=1)
+        finally:
+            benchmark._timed_move = real_timed_move
+        self.assertEqual(enabled, [False])
+        self.assertTrue(motor_state["is_enabled"])
+
+    def test_compare_flags_regressions(self):
+        baseline = {
+            "profiles": {
+                "scurve": {
+                    "max_rate_hz": 100_000,
+                    "gpio_ns_per_pulse": 500.0,
+                    "idle": {"p99_us": 2.0},
+                }
+            }
+        }
+        results = copy.deepcopy(baseline)
+        entry = results["profiles"]["scurve"]
+        entry.update(max_rate_hz=50_000, gpio_ns_per_pulse=400.0)
+        entry["idle"]["p99_us"] = 20.0  # 10x worse, but under the noise floor
+        rows, regressions = compare(results, baseline)
+        self.assertEqual(len(rows), 3)
+        self.assertEqual([row[1] for row in regressions], ["max_rate_hz"])
@@ -0,0 +1,53 @@
+import numpy as np
+from django.test import TestCase
+from muon_telescope.coincidence import (
+    accidental_rate,
+    analyze_run,
+    find_coincidences,
+    generate_hits,
+    split_channels,
+)
+
+
+class CoincidenceTests(TestCase):
+    def test_window_and_unique_matching(self):
+        a = np.array([100, 1_000, 5_000, 5_020])
+        b = np.array([150, 1_300, 5_010])
+        times, indices = find_coincidences([a, b], window_ns=100)
+        # 1_000 has no partner within 100 ns; 5_020 would reuse b's 5_010 hit
+        self.assertEqual(times.tolist(), [100, 5_000])
+        self.assertEqual(indices.tolist(), [[0, 0], [2, 2]])
+
+    def test_threefold_requires_every_channel(self):
+        a = np.array([0, 1_000])
+        b = np.array([10, 1_010])
+        c = np.array([20])
+        times, _ = find_coincidences([a, b, c], window_ns=50)
+        self.assertEqual(times.tolist(), [0])
+
+    def test_split_channels(self):
+        stamps = np.array([5, 1, 3, 2], dtype=np.int64)
+        channels = np.array([1, 0, 1, 0], dtype=np.uint8)
+        a, b = split_channels(stamps, channels)
+        self.assertEqual(a.tolist(), [1, 2])
+        self.assertEqual(b.tolist(), [3, 5])
+
+    def test_synthetic_run_recovers_muons(self):
+        stamps, channels, muons = generate_hits(
+            200, muon_rate_hz=5, noise_rates_hz=(200, 200, 200), seed=3
+        )
+        result = analyze_run(split_channels(stamps, channels), window_ns=50)
+        self.assertAlmostEqual(result["coincidences"], muons.size, delta=5)
+        self.assertAlmostEqual(result["rate_hz"], 5, delta=0.5)
+        self.assertLess(result["accidental_rate_hz"], 1e-3)
+        self.assertEqual(len(result["dead_fraction"]), 3)
+
+    def test_accidentals_match_noise_only_run(self):
+        stamps, channels, _ = generate_hits(
+            20, muon_rate_hz=0, noise_rates_hz=(20_000, 20_000), seed=4
+        )
+        result = analyze_run(split_channels(stamps, channels), window_ns=500)
+        expected = accidental_rate(result["singles_hz"], 500) * result["duration_s"]
+        self.assertAlmostEqual(
+            result["coincidences"], expected, delta=5 * np.sqrt(expected)
+        )
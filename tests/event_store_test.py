@@ -0,0 +1,58 @@
+import tempfile
+
+import numpy as np
+from django.test import TestCase
+from muon_telescope import event_store
+from muon_telescope.coincidence import generate_hits
+from muon_telescope.event_store import EventStore
+
+
+class EventStoreTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = EventStore(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_by_run_and_angle(self):
+        stamps, channels, _ = generate_hits(10, noise_rates_hz=(100, 100), seed=1)
+        self.store.append("night-1", 30.0, stamps, channels)
+        self.store.append("night-1", -30.0, stamps + 10**10, channels)
+        ts, ch = self.store.read(run="night-1", angle=30.0)
+        self.assertIsInstance(ts, np.memmap)
+        self.assertTrue(np.array_equal(ts, stamps))
+        self.assertTrue(np.array_equal(ch, channels))
+        self.assertEqual(self.store.angles("night-1"), [-30.0, 30.0])
+        self.assertEqual(self.store.read(run="night-2")[0].size, 0)
+
+    def test_time_range_and_chunking(self):
+        old_rows = event_store.CHUNK_ROWS
+        event_store.CHUNK_ROWS = 100
+        try:
+            stamps = np.arange(0, 1000, dtype=np.int64) * 10
+            self.store.append(1, 0.0, stamps[::-1], np.zeros(1000, np.uint8))
+        finally:
+            event_store.CHUNK_ROWS = old_rows
+        self.assertEqual(len(self.store.index()), 10)
+        self.assertEqual(len(self.store.find(start_ns=2500, end_ns=4000)), 2)
+        ts, _ = self.store.read(start_ns=2505, end_ns=4000)
+        self.assertEqual(ts[0], 2510)
+        self.assertEqual(ts[-1], 3990)
+        (ts_range, ch_range) = self.store.byte_range(self.store.index()[3])
+        self.assertEqual(ts_range, (300 * 8, 400 * 8))
+        self.assertEqual(ch_range, (300, 400))
+
+    def test_torn_append_is_discarded(self):
+        self.store.append(1, 0.0, [1, 2, 3], [0, 1, 0])
+        with open(self.store.timestamps_path, "ab") as f:
+            f.write(b"\x00" * 12)  # Data written, index record never made it
+        with open(self.store.index_path, "a") as f:
+            f.write('{"run": 1, "ang')
+        reopened = EventStore(self.tmp.name)
+        self.assertEqual(len(reopened.index()), 1)
+        reopened.append(1, 5.0, [7, 8], [1, 1])
+        ts, ch = reopened.read(angle=5.0)
+        self.assertEqual(ts.tolist(), [7, 8])
+        self.assertEqual(ch.tolist(), [1, 1])
+        self.assertEqual(len(reopened.index()), 2)
@@ -0,0 +1,153 @@
+import json
+import math
+import threading
+
+from django.test import TestCase
+from control import flux_scheduler
+from control.flux_scheduler import FluxScan
+
+
+class FakeSky:
+    """Virtual clock and detector with a cos²θ count rate."""
+
+    def __init__(self, zenith_rate=2.0):
+        self.zenith_rate = zenith_rate
+        self.now = 0.0
+        self.total = 0.0
+        self.angle = 0.0
+        self.visits = []
+
+    def move(self, angle):
+        self.angle = angle
+        self.visits.append(angle)
+
+    def sleep(self, seconds):
+        rate = self.zenith_rate * math.cos(math.radians(self.angle)) ** 2
+        self.total += rate * seconds
+        self.now += seconds
+
+    def clock(self):
+        return self.now
+
+    def counts(self):
+        return int(self.total)
+
+
+class FluxSchedulerTests(TestCase):
+    def scan(self, sky, angles, target_error=0.1, **options):
+        return FluxScan(
+            angles,
+            target_error,
+            move=sky.move,
+            counts=sky.counts,
+            clock=sky.clock,
+            sleep=sky.sleep,
+            **options,
+        )
+
+    def test_reaches_uniform_error_budget(self):
+        sky = FakeSky()
+        scan = self.scan(sky, [0, 60], min_dwell=5, max_dwell=100)
+        scan.run()
+        summary = scan.summary()
+        self.assertEqual(summary["status"], "done")
+        for b in summary["bins"]:
+            self.assertTrue(b["done"])
+            self.assertLessEqual(b["rel_error"], 0.1)
+        zenith, steep = summary["bins"]
+        # cos²(60°) = 1/4: the steep bin needs about four times the live time
+        self.assertAlmostEqual(steep["live_time"] / zenith["live_time"], 4, delta=0.5)
+        # Equal dwells would have to give every bin the steep bin's time
+        self.assertLess(summary["elapsed"], 2 * steep["live_time"])
+
+    def test_pilot_dwell_follows_prior(self):
+        scan = self.scan(FakeSky(), [0, 60], min_dwell=10, max_dwell=100)
+        zenith, steep = scan.bins
+        self.assertAlmostEqual(scan.allocate(zenith), 10)
+        self.assertAlmostEqual(scan.allocate(steep), 40)
+
+    def test_time_budget(self):
+        sky = FakeSky(zenith_rate=0.01)
+        scan = self.scan(sky, [0, 30], min_dwell=5, max_dwell=50, max_time=120)
+        scan.run()
+        self.assertEqual(scan.status, "done")
+        self.assertLessEqual(sky.now, 120 + 1e-9)
+        self.assertFalse(all(b["done"] for b in scan.summary()["bins"]))
+
+    def test_pause_holds_the_dwell_clock(self):
+        sky = FakeSky()
+        pauses = iter([False, True, True, False])
+        scan = FluxScan(
+            [0],
+            0.1,
+            min_dwell=5,
+            max_dwell=5,
+            move=sky.move,
+            counts=sky.counts,
+            clock=sky.clock,
+            sleep=sky.sleep,
+            paused=lambda: next(pauses, False),
+        )
+        scan._dwell(scan.bins[0], 5)
+        # One second was spent paused and does not count as live time
+        self.assertEqual(sky.now, 6)
+        self.assertEqual(scan.bins[0]["live_time"], 5)
+        self.assertEqual(scan.bins[0]["counts"], 10)  # 2/s over the live 5 s
+
+    def test_only_one_scan_starts_at_a_time(self):
+        release = threading.Event()
+        previous = flux_scheduler.current_scan
+        results = []
+
+        def start():
+            try:
+                results.append(
+                    flux_scheduler.start_scan([0], 0.5, move=lambda a: release.wait())
+                )
+            except RuntimeError:
+                results.append(None)
+
+        threads = [threading.Thread(target=start) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        try:
+            self.assertEqual(len([r for r in results if r is not None]), 1)
+        finally:
+            release.set()
+            for scan in results:
+                if scan is not None:
+                    scan.stop()
+                    scan.join(5)
+            flux_scheduler.current_scan = previous
+
+    def test_rejects_angles_outside_limits(self):
+        with self.assertRaises(ValueError):
+            self.scan(FakeSky(), [0, 80])
+
+    def test_record_counts_api(self):
+        before = flux_scheduler.total_counts()
+        response = self.client.post(
+            "/api/counts/", json.dumps({"counts": 7}), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(flux_scheduler.total_counts(), before + 7)
+        response = self.client.post(
+            "/api/counts/", json.dumps({"counts": -1}), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_start_scan_api_rejects_malformed_bodies(self):
+        previous = flux_scheduler.current_scan
+        for body in (
+            [0, 30],
+            {"angles": [0, 30], "target_error": None},
+            {"angles": 5, "target_error": 0.1},
+            {"angles": ["up"], "target_error": 0.1},
+        ):
+            response = self.client.post(
+                "/api/scan/", json.dumps(body), content_type="application/json"
+            )
+            self.assertEqual(response.status_code, 400, body)
+        self.assertIs(flux_scheduler.current_scan, previous)
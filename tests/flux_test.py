@@ -0,0 +1,83 @@
+import json
+import math
+
+import numpy as np
+from django.test import TestCase
+from control.services import flux_histogram
+from muon_telescope.coincidence import generate_hits
+from muon_telescope.flux import (
+    BINARY_BIN,
+    BINARY_HEADER,
+    FluxHistogram,
+    fit_cos_power,
+)
+from muon_telescope.motor_control import motor_state
+
+
+class FluxHistogramTests(TestCase):
+    def test_fit_recovers_cos_squared(self):
+        angles = np.arange(-70, 71, 10)
+        live_time = np.full(angles.size, 3600.0)
+        expected = 1.0 * np.cos(np.radians(angles)) ** 2 * live_time
+        counts = np.random.default_rng(1).poisson(expected)
+        fit = fit_cos_power(angles, counts, live_time)
+        self.assertAlmostEqual(fit["n"], 2, delta=3 * fit["n_error"])
+        self.assertAlmostEqual(fit["i0"], 1.0, delta=3 * fit["i0_error"])
+
+    def test_incremental_bins_and_cache(self):
+        histogram = FluxHistogram(bin_width=10)
+        histogram.add(1, 100, 10)
+        histogram.add(4, 44, 2)
+        summary = histogram.summary()
+        self.assertIs(histogram.summary(), summary)
+        b = next(b for b in summary["bins"] if b["counts"])
+        self.assertEqual(b["angle"], 0)
+        self.assertAlmostEqual(b["rate"], 12)
+        self.assertAlmostEqual(b["error"], 1)
+        histogram.add(-75, 1, 1)
+        self.assertIsNot(histogram.summary(), summary)
+        with self.assertRaises(ValueError):
+            histogram.add(80, 1, 1)
+
+    def test_add_hits_counts_coincidences(self):
+        stamps, channels, muons = generate_hits(50, muon_rate_hz=2, seed=2)
+        histogram = FluxHistogram()
+        result = histogram.add_hits(0, stamps, channels, duration_s=50)
+        self.assertEqual(histogram.counts.sum(), result["coincidences"])
+        self.assertAlmostEqual(result["coincidences"], muons.size, delta=3)
+
+    def test_binary_payload(self):
+        histogram = FluxHistogram(bin_width=50)
+        histogram.add(0, 400, 100)
+        payload = histogram.to_binary()
+        header = BINARY_HEADER.unpack_from(payload)
+        self.assertEqual(header[:3], (b"FLUX", histogram.version, 3))
+        self.assertTrue(math.isnan(header[6]))  # One bin: no fit
+        rows = list(BINARY_BIN.iter_unpack(payload[BINARY_HEADER.size :]))
+        self.assertEqual(rows[1], (0.0, 4.0, 0.20000000298023224, 100.0, 400))
+
+
+class FluxApiTests(TestCase):
+    def setUp(self):
+        self.saved = dict(motor_state)
+        motor_state.update(current_position=0, is_moving=False)
+
+    def tearDown(self):
+        motor_state.update(self.saved)
+
+    def test_counts_feed_flux_endpoint(self):
+        response = self.client.post(
+            "/api/counts/",
+            json.dumps({"counts": 25, "live_time": 5}),
+            content_type="application/json",
+        )
+        self.assertTrue(response.json()["binned"])
+        response = self.client.get("/api/flux/")
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response.json()["version"], flux_histogram.version)
+        etag = response["ETag"]
+        response = self.client.get("/api/flux/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get("/api/flux/?format=bin")
+        self.assertEqual(response["Content-Type"], "application/octet-stream")
+        self.assertEqual(response.content[:4], b"FLUX")
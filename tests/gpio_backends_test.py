@@ -0,0 +1,146 @@
+import time
+from unittest import mock
+
+from django.test import TestCase
+from muon_telescope import motor_control
+from muon_telescope.calibration import MICROSTEPS_PER_REV
+from muon_telescope.gpio_backends import (
+    HIGH,
+    LOW,
+    SimulatedBackend,
+    VirtualTimeBackend,
+    load_backend,
+)
+from muon_telescope.motion_profile import move_duration, ramp_table
+
+
+class GPIOBackendTests(TestCase):
+    def test_simulator_records_transitions(self):
+        backend = SimulatedBackend()
+        backend.setup(17, 27, 22)
+        backend.write_lines({17: LOW, 27: HIGH})
+        backend.step_high()
+        backend.step_low()
+        self.assertEqual(backend.pulses, 1)
+        self.assertEqual(backend.levels, {17: LOW, 27: HIGH, 22: LOW})
+        self.assertEqual([t[1:] for t in backend.transitions][-2:], [(22, 1), (22, 0)])
+
+    def test_load_backend_by_name(self):
+        self.assertIsInstance(load_backend("sim"), SimulatedBackend)
+        self.assertIsInstance(load_backend("virtual"), VirtualTimeBackend)
+        with self.assertRaises(ValueError):
+            load_backend("pigpio")
+
+    def test_do_steps_pulse_count(self):
+        if not isinstance(motor_control.gpio, SimulatedBackend):
+            self.skipTest("Requires the simulated GPIO backend")
+        motor_control.gpio.reset()
+        motor_control.do_steps(25, 0.0005, profile="constant")
+        self.assertEqual(motor_control.gpio.pulses, 25)
+
+
+class VirtualTimeBackendTests(TestCase):
+    def setUp(self):
+        self.backend = VirtualTimeBackend()
+        self.backend.setup(
+            motor_control.ENABLE_PIN, motor_control.DIR_PIN, motor_control.STEP_PIN
+        )
+        patcher = mock.patch.object(motor_control, "gpio", self.backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.saved = dict(motor_control.motor_state)
+        self.addCleanup(motor_control.motor_state.update, self.saved)
+
+    def test_full_revolution_in_virtual_time(self):
+        motor_control.update_state(current_position=0)
+        started = time.monotonic()
+        job = motor_control.submit_move(target_position=-360)
+        deadline = time.monotonic() + 10
+        while motor_control.get_job(job["id"])["status"] != "done":
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.001)
+        wall = time.monotonic() - started
+
+        state = motor_control.motor_state
+        self.assertEqual(self.backend.pulses, MICROSTEPS_PER_REV)
+        self.assertEqual(state["current_position"], -360)
+        transitions = list(self.backend.transitions)
+        dir_time = next(
+            t for t, pin, value in transitions if pin == motor_control.DIR_PIN
+        )
+        first_step = next(
+            t for t, pin, value in transitions if pin == motor_control.STEP_PIN
+        )
+        self.assertEqual(self.backend.levels[motor_control.DIR_PIN], HIGH)
+        self.assertGreaterEqual(first_step - dir_time, motor_control.DIR_SETUP_NS)
+        expected = move_duration(
+            MICROSTEPS_PER_REV,
+            state["min_step_delay"],
+            state["step_delay"],
+            state["accel"],
+            state["profile"],
+        )
+        virtual = (self.backend.virtual_clock.now() - first_step) / 1e9
+        self.assertAlmostEqual(virtual, expected, delta=1e-3)
+        self.assertGreater(virtual, 10 * wall)
+
+    def test_pulse_width_is_half_period(self):
+        motor_control.do_steps(3, 0.002, profile="constant")
+        edges = [t for t, pin, _ in self.backend.transitions if pin == 22]
+        self.assertEqual([b - a for a, b in zip(edges, edges[1:])], [1_000_000] * 5)
+
+    def step_periods(self):
+        edges = [
+            t
+            for t, pin, value in self.backend.transitions
+            if pin == motor_control.STEP_PIN and value == HIGH
+        ]
+        return [b - a for a, b in zip(edges, edges[1:])]
+
+    def retarget_at(self, done, steps):
+        token = motor_control.MotionToken()
+
+        def on_progress(n):
+            if n == done:
+                token.retarget(steps)
+
+        return token, on_progress
+
+    def test_retarget_extends_move_without_stopping(self):
+        token, on_progress = self.retarget_at(100, 400)
+        done = motor_control.do_steps(
+            200, 0.004, "trapezoidal", 0.001, 20000.0, token, on_progress
+        )
+        self.assertEqual(done, 400)
+        periods = self.step_periods()
+        fastest = min(periods)
+        first = periods.index(fastest)
+        last = len(periods) - 1 - periods[::-1].index(fastest)
+        # One ramp up, one cruise and one ramp down
+        self.assertEqual(periods[:first], sorted(periods[:first], reverse=True))
+        self.assertEqual(set(periods[first : last + 1]), {fastest})
+        self.assertEqual(periods[last:], sorted(periods[last:]))
+
+    def test_retarget_inside_stopping_distance_overshoots(self):
+        token, on_progress = self.retarget_at(100, 110)
+        done = motor_control.do_steps(
+            200, 0.004, "trapezoidal", 0.001, 20000.0, token, on_progress
+        )
+        ramp = ramp_table("trapezoidal", 0.001, 0.004, 20000.0)
+        self.assertEqual(done, 100 + len(ramp) - 1)
+        tail = self.step_periods()[99:]
+        self.assertEqual(tail, sorted(tail))
+
+    def test_small_moves_do_not_drift(self):
+        motor_control.update_state(current_position=0)
+        for i in range(1, 41):
+            job = motor_control.submit_move(target_position=-0.05 * i)
+        deadline = time.monotonic() + 10
+        while motor_control.get_job(job["id"])["status"] != "done":
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.001)
+        state = motor_control.motor_state
+        # Truncating each 1.29-step move to 1 step would lose 0.29 steps a move
+        self.assertEqual(self.backend.pulses, motor_control.angle_to_steps(2))
+        self.assertEqual(state["position_steps"], -motor_control.angle_to_steps(2))
+        self.assertLessEqual(abs(state["step_remainder"]), 0.5)
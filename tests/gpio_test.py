@@ -11,20 +11,21 @@ Hardware Setup:
 """
 
 import RPi.GPIO as GPIO
+import os
 import time
 import sys
 
+# Run as ``python3 tests/gpio_test.py``: make the repo root importable
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from muon_telescope.calibration import to_microsteps  # noqa: E402
+
 # GPIO Pin Definitions
 ENABLE_PIN = 17  # Enable pin (active low)
 DIR_PIN = 27  # Direction pin
 STEP_PIN = 22  # Step pin
 PULSE_WIDTH = 0.001  # Pulse width in seconds (1ms)
 
-# Motor parameters
-STEPS_PER_REVOLUTION = 200  # Standard stepper motor
-MICROSTEPS = 16  # DM556 default microstepping
-TOTAL_STEPS_PER_REV = STEPS_PER_REVOLUTION * MICROSTEPS
-
 
 def setup_gpio():
     """Initialize GPIO pins for stepper motor control."""
@@ -81,7 +82,7 @@ def step_motor(steps, delay=0.01):
 
 def move_degrees(degrees, clockwise=True):
     """Move motor by specified degrees."""
-    steps = int((degrees / 360) * TOTAL_STEPS_PER_REV)
+    steps = round(to_microsteps(degrees))
     set_direction(clockwise)
     step_motor(steps)
     print(f"Moved {degrees} degrees ({steps} steps)")
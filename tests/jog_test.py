@@ -0,0 +1,128 @@
+import asyncio
+import json
+import time
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase
+from muon_telescope import motor_control
+from muon_telescope.gpio_backends import SimulatedBackend
+from muon_telescope.jog import CLOSE_FORBIDDEN, jog_websocket
+from muon_telescope.motor_control import motor_state
+
+
+def wait_for_idle(timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while motor_control.is_motor_busy() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class JogTests(TestCase):
+    def setUp(self):
+        self.saved = dict(motor_state)
+        motor_state.update(step_delay=0.004, min_step_delay=0.001, accel=20000.0)
+        wait_for_idle()
+        motor_control.update_state(current_position=0)
+
+    def tearDown(self):
+        motor_control.stop_motion(timeout=2.0)
+        motor_state.update(self.saved)
+
+    def test_stops_when_heartbeat_lapses(self):
+        job = motor_control.jog(10)
+        time.sleep(0.2)
+        self.assertTrue(motor_state["is_moving"])
+        started = time.monotonic()
+        wait_for_idle()
+        self.assertLess(time.monotonic() - started, motor_control.JOG_TIMEOUT + 0.5)
+        job = motor_control.get_job(job["id"])
+        self.assertEqual(job["status"], "done")
+        # Positive velocity raises the angle
+        self.assertGreater(motor_state["position_steps"], 0)
+        self.assertEqual(motor_state["position_steps"], job["steps_done"])
+
+    def test_setpoints_steer_one_job(self):
+        first = motor_control.jog(10)
+        time.sleep(0.15)
+        for _ in range(3):
+            job = motor_control.jog(-10)
+            time.sleep(0.1)
+        self.assertEqual(job["id"], first["id"])
+        peak = motor_state["position_steps"]
+        motor_control.jog(0)
+        wait_for_idle()
+        job = motor_control.get_job(first["id"])
+        self.assertEqual(job["status"], "done")
+        self.assertLess(motor_state["position_steps"], peak)
+        self.assertGreater(job["steps_done"], abs(motor_state["position_steps"]))
+        if isinstance(motor_control.gpio, SimulatedBackend):
+            self.assertEqual(
+                motor_control.gpio.levels[motor_control.DIR_PIN],
+                motor_control.HIGH,
+            )
+
+    def test_zero_velocity_starts_nothing(self):
+        self.assertIsNone(motor_control.jog(0))
+        with self.assertRaises(ValueError):
+            motor_control.jog(float("nan"))
+
+
+class JogWebSocketTests(TestCase):
+    def setUp(self):
+        self.saved = dict(motor_state)
+        motor_state.update(step_delay=0.004, min_step_delay=0.001, accel=20000.0)
+        wait_for_idle()
+        User.objects.create_user("observer", password="pw")
+        self.client.login(username="observer", password="pw")
+        session = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        self.cookie = f"{settings.SESSION_COOKIE_NAME}={session}".encode()
+
+    def tearDown(self):
+        motor_control.stop_motion(timeout=2.0)
+        motor_state.update(self.saved)
+
+    @async_to_sync
+    async def session(self, frames, cookie=b"", origin=None, hold=0.2):
+        """Run one connection; returns the messages sent and whether it moved."""
+        inbox = asyncio.Queue()
+        sent = []
+        headers = [(b"host", b"testserver"), (b"cookie", cookie)]
+        if origin is not None:
+            headers.append((b"origin", origin))
+        scope = {"type": "websocket", "path": "/ws/jog/", "headers": headers}
+
+        async def send(message):
+            sent.append(message)
+
+        task = asyncio.ensure_future(jog_websocket(scope, inbox.get, send))
+        await inbox.put({"type": "websocket.connect"})
+        for frame in frames:
+            await inbox.put({"type": "websocket.receive", "text": frame})
+        await asyncio.sleep(hold)
+        moving = motor_state["is_moving"]
+        await inbox.put({"type": "websocket.disconnect", "code": 1000})
+        await task
+        return sent, moving
+
+    def test_jogs_until_disconnect(self):
+        sent, moving = self.session([json.dumps({"velocity": 5})], self.cookie)
+        self.assertEqual(sent, [{"type": "websocket.accept"}])
+        self.assertTrue(moving)
+        wait_for_idle(1.0)
+        self.assertFalse(motor_control.is_motor_busy())
+
+    def test_bad_frame_is_answered(self):
+        sent, moving = self.session(['{"speed": 5}', "fast"], self.cookie, hold=0)
+        errors = [json.loads(m["text"]) for m in sent if m["type"] == "websocket.send"]
+        self.assertEqual(len(errors), 2)
+        self.assertIn("velocity", errors[0]["error"])
+        self.assertFalse(moving)
+
+    def test_requires_login_and_same_origin(self):
+        for cookie, origin in ((b"", None), (self.cookie, b"http://evil.example")):
+            sent, moving = self.session(['{"velocity": 5}'], cookie, origin, hold=0)
+            self.assertEqual(
+                sent, [{"type": "websocket.close", "code": CLOSE_FORBIDDEN}]
+            )
+            self.assertFalse(moving)
@@ -0,0 +1,74 @@
+import threading
+
+from django.test import TestCase
+from muon_telescope import metrics, motor_control
+from muon_telescope.metrics import Histogram
+
+
+def sample(text, line_start):
+    for line in text.splitlines():
+        if line.startswith(line_start + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{line_start} not in metrics")
+
+
+class MetricsTests(TestCase):
+    def test_histogram_buckets(self):
+        histogram = Histogram((0.1, 1))
+        for value in (0.05, 0.1, 0.5, 7):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [2, 1, 1])
+        self.assertAlmostEqual(histogram.sum, 7.65)
+
+    def test_concurrent_observations_are_not_lost(self):
+        def observe():
+            for _ in range(2000):
+                metrics.observe_request("test_concurrent", 0.001)
+
+        threads = [threading.Thread(target=observe) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        histogram = metrics.request_latency.pop("test_concurrent")
+        self.assertEqual(sum(histogram.counts), 8000)
+
+    def test_endpoint_reports_requests_and_steps(self):
+        self.client.get("/api/status/")
+        before = sample(
+            self.client.get("/metrics").content.decode(), "muon_motor_steps_total"
+        )
+        motor_control.set_direction(True)
+        motor_control.do_steps(40, step_delay=0.0001, profile="constant")
+        response = self.client.get("/metrics")
+        self.assertEqual(response["Content-Type"], metrics.CONTENT_TYPE)
+        text = response.content.decode()
+        self.assertEqual(sample(text, "muon_motor_steps_total"), before + 40)
+        self.assertGreaterEqual(
+            sample(text, 'muon_step_lateness_seconds_bucket{le="+Inf"}'), 40
+        )
+        self.assertGreaterEqual(
+            sample(
+                text,
+                'muon_http_request_duration_seconds_count{view="api_motor_status"}',
+            ),
+            1,
+        )
+        self.assertEqual(sample(text, "muon_http_requests_in_flight"), 1)
+        self.assertIn("muon_motion_queue_depth 0", text)
+
+    def test_step_counter_advances_during_a_move(self):
+        stats = motor_control.motor_state["pulse_stats"]
+        before = stats["steps"]
+        seen = []
+        motor_control.set_direction(True)
+        motor_control.do_steps(
+            200,
+            step_delay=0.0001,
+            profile="constant",
+            on_progress=lambda done: seen.append(stats["steps"] - before),
+        )
+        self.assertEqual(
+            seen[:2], [motor_control.PROGRESS_STRIDE, 2 * motor_control.PROGRESS_STRIDE]
+        )
+        self.assertEqual(stats["steps"], before + 200)
@@ -0,0 +1,77 @@
+import os
+import socket
+import tempfile
+import threading
+
+from django.test import TestCase
+from muon_telescope import motion_client, motor_control
+from muon_telescope.motion_daemon import MotionRequestHandler, MotionServer
+from muon_telescope.motion_protocol import pack_status, unpack_status
+
+
+class MotionProtocolTests(TestCase):
+    def test_status_round_trip(self):
+        snapshot = motor_control.status_snapshot()
+        snapshot.update(current_job=7, position_bounds=[1.5, 3.0])
+        self.assertEqual(unpack_status(pack_status(snapshot)), snapshot)
+
+
+class MotionDaemonTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "motion.sock")
+        self.server = MotionServer(path, MotionRequestHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.old_path = motion_client.SOCKET_PATH
+        motion_client.SOCKET_PATH = path
+
+    def tearDown(self):
+        motion_client._disconnect()
+        motion_client.SOCKET_PATH = self.old_path
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def test_status_and_version(self):
+        status = motion_client.status_snapshot()
+        self.assertEqual(
+            status["current_position"], motor_control.motor_state["current_position"]
+        )
+        self.assertEqual(motion_client.get_state_version(), status["version"])
+        motion_client.notify_state_change()
+        self.assertGreater(
+            motion_client.wait_for_state_change(status["version"], 0),
+            status["version"],
+        )
+
+    def test_jobs(self):
+        job = motion_client.submit_move(steps=0)
+        self.assertEqual(motion_client.get_job(job["id"])["id"], job["id"])
+        self.assertIn(job["id"], [j["id"] for j in motion_client.list_jobs()])
+        self.assertIsNone(motion_client.get_job(10**9))
+        self.assertFalse(motion_client.cancel_job(10**9))
+        motion_client.stop_motion(timeout=1.0)
+
+    def test_errors_are_raised_client_side(self):
+        with self.assertRaises(ValueError):
+            motion_client.submit_move(steps=1, target_position=0)
+
+    def test_reconnects_after_connection_loss(self):
+        motion_client.get_state_version()
+        motion_client._local.sock.close()
+        self.assertIn("profile", motion_client.get_state())
+
+    def test_mutating_requests_are_not_resent(self):
+        jobs = len(motion_client.list_jobs())
+        motion_client._disconnect()
+        ours, theirs = socket.socketpair()
+        motion_client._local.sock = ours
+
+        def hang_up():
+            theirs.recv(4096)
+            theirs.close()
+
+        threading.Thread(target=hang_up, daemon=True).start()
+        with self.assertRaises(motion_client.MotionDaemonError):
+            motion_client.submit_move(steps=0)
+        self.assertEqual(len(motion_client.list_jobs()), jobs)
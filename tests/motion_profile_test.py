@@ -0,0 +1,70 @@
+from django.test import TestCase
+from muon_telescope.motion_profile import (
+    continue_table_ns,
+    decel_table_ns,
+    delay_table,
+    delay_table_ns,
+    jog_table_ns,
+    move_duration,
+    ramp_table,
+)
+
+
+class MotionProfileTests(TestCase):
+    def test_constant_profile_keeps_start_period(self):
+        table = delay_table(10, 0.004, 0.020, 1000.0, "constant")
+        self.assertEqual(table, (0.020,) * 10)
+
+    def test_trapezoidal_ramps_up_and_down(self):
+        table = delay_table(200, 0.004, 0.020, 1000.0, "trapezoidal")
+        self.assertEqual(len(table), 200)
+        self.assertEqual(table[0], 0.020)
+        self.assertEqual(table[-1], 0.020)
+        self.assertEqual(min(table), 0.004)
+        self.assertEqual(table, tuple(reversed(table)))
+
+    def test_short_move_never_reaches_cruise(self):
+        table = delay_table(6, 0.004, 0.020, 1000.0, "trapezoidal")
+        self.assertGreater(min(table), 0.004)
+
+    def test_scurve_ramp_is_monotonic(self):
+        ramp = ramp_table("scurve", 0.004, 0.020, 1000.0)
+        self.assertEqual(ramp[0], 0.020)
+        self.assertEqual(ramp[-1], 0.004)
+        self.assertTrue(all(a >= b for a, b in zip(ramp, ramp[1:])))
+
+    def test_profiled_move_is_faster_than_constant(self):
+        constant = move_duration(9312, 0.004, 0.020, 1000.0, "constant")
+        trapezoidal = move_duration(9312, 0.004, 0.020, 1000.0, "trapezoidal")
+        self.assertLess(trapezoidal * 3, constant)
+
+    def test_decel_table_slows_to_start_period(self):
+        ramp = ramp_table("trapezoidal", 0.004, 0.020, 1000.0)
+        tail = decel_table_ns(5, 0.004, 0.020, 1000.0, "trapezoidal")
+        self.assertEqual(len(tail), 5)
+        self.assertEqual(tail[-1], round(ramp[0] * 1e9))
+        self.assertEqual(list(tail), sorted(tail))
+
+    def test_continue_table_keeps_running_speed(self):
+        params = (0.004, 0.020, 1000.0, "trapezoidal")
+        self.assertEqual(continue_table_ns(0, 50, *params), delay_table_ns(50, *params))
+        ramp = ramp_table("trapezoidal", 0.004, 0.020, 1000.0)
+        table = continue_table_ns(5, 20, *params)
+        self.assertEqual(table[0], round(ramp[5] * 1e9))
+        self.assertEqual(table[-1], round(ramp[0] * 1e9))
+        # Shortest smooth continuation is the deceleration from the level below
+        self.assertEqual(continue_table_ns(5, 5, *params), decel_table_ns(5, *params))
+
+    def test_jog_table_moves_one_level_per_step(self):
+        params = (0.004, 0.020, 1000.0)
+        ramp = [round(p * 1e9) for p in ramp_table("trapezoidal", *params)]
+        self.assertEqual(
+            jog_table_ns(-1, 3, 6, *params), tuple(ramp[:4] + [ramp[3]] * 2)
+        )
+        self.assertEqual(
+            jog_table_ns(5, 2, 4, *params), tuple(ramp[4:1:-1] + [ramp[2]])
+        )
+
+    def test_unknown_profile(self):
+        with self.assertRaises(ValueError):
+            ramp_table("linear", 0.004, 0.020, 1000.0)
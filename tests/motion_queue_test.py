@@ -0,0 +1,123 @@
+import json
+import time
+
+from django.test import TestCase, Client
+from muon_telescope import motor_control
+from muon_telescope.calibration import DEGREES_PER_MICROSTEP, MICROSTEPS_PER_REV
+from muon_telescope.gpio_backends import SimulatedBackend
+from muon_telescope.motor_control import motor_state
+
+
+def wait_for_idle(timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while motor_control.is_motor_busy() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class MotionQueueTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.saved = dict(motor_state)
+        motor_state.update(step_delay=0.001, min_step_delay=0.0005, accel=1e6)
+        wait_for_idle()
+        motor_control.update_state(current_position=0)
+
+    def tearDown(self):
+        wait_for_idle()
+        motor_state.update(self.saved)
+
+    def post(self, url, data=None):
+        return self.client.post(
+            url, json.dumps(data or {}), content_type="application/json"
+        )
+
+    def test_move_returns_job_immediately(self):
+        response = self.post("/api/motor/move/", {"angle": 5})
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["job_id"]
+        wait_for_idle()
+        job = self.client.get(f"/api/motor/jobs/{job_id}/").json()["job"]
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(job["steps"], -motor_control.angle_to_steps(5))
+        self.assertEqual(motor_state["position_steps"], motor_control.angle_to_steps(5))
+        self.assertAlmostEqual(
+            motor_state["current_position"], 5, delta=DEGREES_PER_MICROSTEP / 2
+        )
+
+    def test_cancel_queued_job(self):
+        self.post("/api/do_steps/", {"steps": 200})
+        queued = self.post("/api/motor/reset/").json()["job_id"]
+        response = self.post(f"/api/motor/jobs/{queued}/cancel/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["job"]["status"], "cancelled")
+        wait_for_idle()
+        self.assertEqual(motor_control.get_job(queued)["status"], "cancelled")
+
+    def test_stop_decelerates_and_tracks_position(self):
+        motor_state.update(step_delay=0.004, min_step_delay=0.001, accel=20000.0)
+        job_id = self.post("/api/do_steps/", {"steps": 5000}).json()["job_id"]
+        time.sleep(0.1)
+        response = self.post("/api/motor/stop/")
+        self.assertEqual(response.status_code, 200)
+        job = motor_control.get_job(job_id)
+        self.assertEqual(job["status"], "cancelled")
+        self.assertTrue(0 < job["steps_done"] < 5000)
+        self.assertEqual(motor_state["position_steps"], -job["steps_done"])
+        self.assertAlmostEqual(
+            motor_state["current_position"],
+            -job["steps_done"] * 360 / MICROSTEPS_PER_REV,
+        )
+
+    def test_pause_and_resume_completes_move(self):
+        if not isinstance(motor_control.gpio, SimulatedBackend):
+            self.skipTest("Requires the simulated GPIO backend")
+        motor_state.update(step_delay=0.004, min_step_delay=0.001, accel=20000.0)
+        job_id = self.post("/api/do_steps/", {"steps": 400}).json()["job_id"]
+        time.sleep(0.05)
+        self.post("/api/pause_motor/")
+        time.sleep(0.05)
+        pulses = motor_control.gpio.pulses
+        time.sleep(0.1)
+        self.assertEqual(motor_control.gpio.pulses, pulses)
+        self.assertEqual(motor_control.get_job(job_id)["status"], "running")
+        self.assertTrue(motor_state["paused"])
+        self.post("/api/resume_motor/")
+        wait_for_idle()
+        job = motor_control.get_job(job_id)
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(job["steps_done"], 400)
+
+    def test_goto_angle_keeps_only_latest_target(self):
+        motor_state.update(step_delay=0.004, min_step_delay=0.001, accel=20000.0)
+        self.post("/api/do_steps/", {"steps": 100})  # Holds the pointing job queued
+        ids = {
+            self.post("/api/goto_angle/", {"angle": angle}).json()["job_id"]
+            for angle in (5, 10, 15)
+        }
+        self.assertEqual(len(ids), 1)
+        wait_for_idle()
+        job = motor_control.get_job(ids.pop())
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(job["retargets"], 2)
+        self.assertEqual(job["steps_done"], motor_control.angle_to_steps(15) + 100)
+        self.assertEqual(
+            motor_state["position_steps"], motor_control.angle_to_steps(15)
+        )
+
+    def test_goto_angle_reverses_running_move(self):
+        motor_state.update(step_delay=0.004, min_step_delay=0.001, accel=20000.0)
+        first = self.post("/api/goto_angle/", {"angle": 10}).json()["job_id"]
+        time.sleep(0.05)
+        second = self.post("/api/goto_angle/", {"angle": -5}).json()["job_id"]
+        self.assertEqual(first, second)
+        wait_for_idle()
+        job = motor_control.get_job(first)
+        self.assertEqual(job["status"], "done")
+        self.assertGreater(job["steps_done"], motor_control.angle_to_steps(5))
+        self.assertEqual(
+            motor_state["position_steps"], motor_control.angle_to_steps(-5)
+        )
+        self.assertEqual(motor_state["target_position"], -5)
+
+    def test_unknown_job(self):
+        self.assertEqual(self.client.get("/api/motor/jobs/999999/").status_code, 404)
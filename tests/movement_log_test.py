@@ -0,0 +1,31 @@
+from django.test import TestCase, Client
+from control.movement_log import MovementLog
+
+
+class MovementLogTests(TestCase):
+    def test_ring_buffer_overwrites_oldest(self):
+        log = MovementLog(capacity=3)
+        for i in range(5):
+            log.append({"action": i})
+        self.assertEqual(len(log), 3)
+        self.assertEqual([e["seq"] for e in log.latest(10)], [3, 4, 5])
+        self.assertEqual([e["action"] for e in log.since(3)], [3, 4])
+        self.assertEqual([e["seq"] for e in log.since(0, limit=2)], [3, 4])
+        self.assertEqual(log.since(5), [])
+
+    def test_api_cursor(self):
+        client = Client()
+        client.post("/api/pause_motor/")
+        client.post("/api/resume_motor/")
+        data = client.get("/api/logs/?limit=1").json()
+        self.assertEqual([e["action"] for e in data["logs"]], ["resume_motor"])
+        cursor = data["next_since"]
+        self.assertEqual(client.get(f"/api/logs/?since={cursor}").json()["logs"], [])
+        client.post("/api/pause_motor/")
+        client.post("/api/resume_motor/")
+        data = client.get(f"/api/logs/?since={cursor}&limit=1").json()
+        self.assertEqual([e["action"] for e in data["logs"]], ["pause_motor"])
+        self.assertEqual(data["next_since"], cursor + 1)
+
+    def test_api_rejects_bad_limit(self):
+        self.assertEqual(Client().get("/api/logs/?limit=0").status_code, 400)
@@ -0,0 +1,105 @@
+import json
+import time
+
+from django.test import TestCase, Client
+from control.forms import ControlForm
+from muon_telescope import motor_control
+from muon_telescope.motor_control import motor_state
+from muon_telescope.observation_plan import (
+    ANGLE_LIMIT,
+    order_entries,
+    parse_entries,
+    slew_distance,
+)
+
+
+def wait_for_idle(timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while motor_control.is_motor_busy() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class PlanOrderingTests(TestCase):
+    def test_sweeps_from_nearer_end(self):
+        entries = [(30, 1), (-60, 1), (10, 1), (-20, 1)]
+        ordered = order_entries(entries, start=20)
+        self.assertEqual([angle for angle, _ in ordered], [30, 10, -20, -60])
+        self.assertEqual(slew_distance(ordered, 20), 100)
+
+    def test_ordering_beats_submission_order(self):
+        entries = [(-70, 0), (70, 0), (-35, 0), (35, 0)]
+        self.assertLess(
+            slew_distance(order_entries(entries, 0), 0), slew_distance(entries, 0)
+        )
+
+    def test_rejects_angles_outside_form_limits(self):
+        with self.assertRaises(ValueError):
+            parse_entries([{"angle": 80, "dwell": 10}])
+        with self.assertRaises(ValueError):
+            parse_entries([{"angle": 10, "dwell": -1}])
+        with self.assertRaises(ValueError):
+            parse_entries([])
+
+    def test_rejects_non_finite_values(self):
+        for entry in (
+            {"angle": "nan", "dwell": 1},
+            {"angle": 10, "dwell": "inf"},
+            {"angle": 10, "dwell": "nan"},
+        ):
+            with self.assertRaises(ValueError):
+                parse_entries([entry])
+
+    def test_form_shares_angle_limit(self):
+        angle = ControlForm.base_fields["angle"]
+        self.assertEqual(angle.max_value, ANGLE_LIMIT)
+        self.assertEqual(angle.widget.attrs["min"], -ANGLE_LIMIT)
+
+
+class PlanExecutionTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.saved = dict(motor_state)
+        motor_state.update(step_delay=0.001, min_step_delay=0.0005, accel=1e6)
+        wait_for_idle()
+        motor_control.update_state(current_position=0)
+
+    def tearDown(self):
+        motor_control.stop_motion(timeout=2.0)
+        wait_for_idle()
+        motor_state.update(self.saved)
+
+    def post(self, url, data):
+        return self.client.post(url, json.dumps(data), content_type="application/json")
+
+    def test_plan_runs_back_to_back(self):
+        entries = [{"angle": 2, "dwell": 0.05}, {"angle": -1, "dwell": 0.05}]
+        response = self.post("/api/plans/", {"entries": entries})
+        self.assertEqual(response.status_code, 202)
+        plan = response.json()["plan"]
+        self.assertEqual([e["angle"] for e in plan["entries"]], [-1, 2])
+        self.assertGreater(plan["eta_seconds"], 0.1)
+        wait_for_idle()
+        plan = self.client.get(f"/api/plans/{plan['id']}/").json()["plan"]
+        self.assertEqual(plan["status"], "done")
+        self.assertEqual(plan["completed"], 2)
+        self.assertEqual(plan["eta_seconds"], 0)
+        self.assertEqual(motor_state["position_steps"], motor_control.angle_to_steps(2))
+        self.assertIsNone(motor_state["current_plan"])
+
+    def test_cancel_plan_stops_dwell(self):
+        plan = motor_control.submit_plan([(0, 30), (1, 30)])
+        time.sleep(0.05)
+        self.assertEqual(motor_state["current_plan"], plan["id"])
+        started = time.monotonic()
+        response = self.post(f"/api/plans/{plan['id']}/cancel/", {})
+        self.assertEqual(response.status_code, 200)
+        wait_for_idle()
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(motor_control.get_plan(plan["id"])["status"], "cancelled")
+
+    def test_invalid_plan(self):
+        response = self.post("/api/plans/", {"entries": [{"angle": 90, "dwell": 1}]})
+        self.assertEqual(response.status_code, 400)
+        response = self.post("/api/plans/", [{"angle": 10, "dwell": 1}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get("/api/plans/999999/").status_code, 404)
@@ -0,0 +1,52 @@
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase
+from muon_telescope import motor_control
+from muon_telescope.position_journal import NullJournal, PositionJournal
+
+
+class PositionJournalTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "position.journal"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_tests_never_open_the_real_journal(self):
+        motor_control.start_journal()
+        self.assertIsInstance(motor_control.journal, NullJournal)
+
+    def test_empty_journal(self):
+        state = PositionJournal(self.path).recover()
+        self.assertIsNone(state["position"])
+        self.assertFalse(state["interrupted"])
+
+    def test_completed_move_is_recovered_and_compacted(self):
+        journal = PositionJournal(self.path)
+        journal.recover()
+        journal.begin_move(0.0, -10.0)
+        journal.checkpoint(-5.0, 129)
+        journal.end_move(-10.0, 258)
+        self.assertTrue(journal.flush())
+        state = PositionJournal(self.path).recover()
+        self.assertEqual(state["position"], -10.0)
+        self.assertFalse(state["interrupted"])
+        self.assertEqual(len(self.path.read_text().splitlines()), 1)
+
+    def test_interrupted_move_is_bounded(self):
+        journal = PositionJournal(self.path)
+        journal.recover()
+        journal.record_position(20.0)
+        journal.begin_move(20.0, 40.0)
+        journal.checkpoint(25.0, 129)
+        self.assertTrue(journal.flush())
+        with open(self.path, "a") as f:
+            f.write('{"type":"check","posi')  # Torn write
+        state = PositionJournal(self.path).recover()
+        self.assertTrue(state["interrupted"])
+        self.assertEqual(state["position"], 25.0)
+        self.assertEqual(state["bounds"], [25.0, 40.0])
+        # Still interrupted after compaction until a new position is recorded
+        self.assertTrue(PositionJournal(self.path).recover()["interrupted"])
@@ -0,0 +1,45 @@
+from django.test import TestCase
+from muon_telescope.pulse_scheduler import JitterRecorder, PulseScheduler
+
+
+class FakeClock:
+    def __init__(self, oversleep_ns=0):
+        self.now = 0
+        self.oversleep_ns = oversleep_ns
+        self.slept = []
+
+    def clock(self):
+        self.now += 1000  # Every clock read costs 1 us
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += int(seconds * 1e9) + self.oversleep_ns
+
+
+class PulseSchedulerTests(TestCase):
+    def test_sleeps_then_spins_to_deadline(self):
+        fake = FakeClock()
+        scheduler = PulseScheduler(spin_ns=100_000, clock=fake.clock, sleep=fake.sleep)
+        lateness = scheduler.wait_until(1_000_000)
+        self.assertEqual(len(fake.slept), 1)
+        self.assertGreaterEqual(fake.now, 1_000_000)
+        self.assertLess(lateness, 1000)
+
+    def test_oversleep_does_not_accumulate(self):
+        fake = FakeClock(oversleep_ns=50_000)
+        scheduler = PulseScheduler(spin_ns=100_000, clock=fake.clock, sleep=fake.sleep)
+        deadline = 0
+        for _ in range(100):
+            deadline += 2_000_000
+            scheduler.wait_until(deadline)
+        self.assertLess(fake.now - deadline, 10_000)
+
+    def test_jitter_summary(self):
+        recorder = JitterRecorder(4)
+        for lateness in (1_000, 2_000, 3_000, 40_000):
+            recorder.add(lateness)
+        summary = recorder.summary()
+        self.assertEqual(summary["pulses"], 4)
+        self.assertEqual(summary["max_us"], 40.0)
+        self.assertEqual(summary["histogram"]["<=50us"], 1)
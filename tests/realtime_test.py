@@ -0,0 +1,50 @@
+import gc
+import threading
+
+from django.test import TestCase
+from muon_telescope import motor_control, realtime
+
+
+def in_thread(func):
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(value=func()))
+    thread.start()
+    thread.join()
+    return result["value"]
+
+
+class RealtimeTests(TestCase):
+    def tearDown(self):
+        gc.unfreeze()
+
+    def test_parse_cpus(self):
+        self.assertEqual(realtime.parse_cpus("1, 3-5"), {1, 3, 4, 5})
+        self.assertEqual(realtime.parse_cpus(""), set())
+
+    def test_report_says_what_applied(self):
+        report = in_thread(
+            lambda: realtime.apply_to_current_thread(priority=10, cpus=set())
+        )
+        self.assertFalse(report["affinity"]["applied"])
+        # Without a dedicated CPU the busy-waiting thread must not go FIFO
+        self.assertFalse(report["sched_fifo"]["applied"])
+        self.assertTrue(report["gc_freeze"]["applied"])
+        self.assertFalse(realtime.active())
+
+    def test_gc_paused_only_in_realtime_threads(self):
+        def move():
+            realtime.apply_to_current_thread(cpus=set())
+            with realtime.gc_paused():
+                return gc.isenabled()
+
+        self.assertFalse(in_thread(move))
+        self.assertTrue(gc.isenabled())
+        with realtime.gc_paused():
+            self.assertTrue(gc.isenabled())
+
+    def test_enter_realtime_preallocates(self):
+        report = in_thread(motor_control.enter_realtime)
+        self.assertTrue(report["preallocated"]["applied"])
+        self.assertGreaterEqual(
+            len(motor_control._jitter.samples), report["preallocated"]["pulses"]
+        )
@@ -0,0 +1,45 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from control import services
+from muon_telescope.motor_control import get_job, list_jobs, stop_motion
+
+
+class MotionServiceTests(TestCase):
+    def tearDown(self):
+        stop_motion(timeout=2.0)
+
+    def test_control_form_queues_move_in_process(self):
+        User.objects.create_user("observer", password="pw")
+        self.client.login(username="observer", password="pw")
+        before = len(list_jobs())
+        with mock.patch("requests.Session.request") as request:
+            response = self.client.post(
+                "/control/", {"angle": 10, "zero": 0, "go": "1"}
+            )
+        self.assertEqual(response.status_code, 302)
+        request.assert_not_called()
+        job = list_jobs()[-1]
+        self.assertEqual(len(list_jobs()), before + 1)
+        self.assertEqual(job["target_position"], 10)
+
+    def test_move_steps_rejects_zero(self):
+        with self.assertRaises(ValueError):
+            services.move_steps(0)
+
+    @override_settings(MOTION_BACKEND_URL="http://telescope:8000/api/")
+    def test_remote_backend_uses_pooled_session(self):
+        reply = mock.Mock(ok=True)
+        reply.json.return_value = {"job": {"id": 99}}
+        session = mock.Mock()
+        session.post.return_value = reply
+        with mock.patch.object(services, "_get_session", return_value=session):
+            job = services.move_to(5)
+            services.move_to(6)
+        self.assertEqual(job, {"id": 99})
+        self.assertIsNone(get_job(99))
+        url = session.post.call_args.args[0]
+        self.assertEqual(url, "http://telescope:8000/api/motor/move/")
+        self.assertIn("timeout", session.post.call_args.kwargs)
+        self.assertEqual(session.post.call_count, 2)
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import threading
+import time
+
+from django.test import TestCase, Client
+
+from control import views
+from muon_telescope import status_stream
+from muon_telescope.motor_control import get_state_version, notify_state_change
+
+
+class StatusVersioningTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+
+    def test_etag_not_modified(self):
+        response = self.client.get("/api/status/")
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertEqual(etag, f'"{response.json()["version"]}"')
+        response = self.client.get("/api/status/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        notify_state_change()
+        response = self.client.get("/api/status/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_long_poll_times_out_unchanged(self):
+        version = get_state_version()
+        response = self.client.get(f"/api/motor_busy/?since={version}&wait=0.05")
+        self.assertEqual(response.status_code, 304)
+
+    def test_long_poll_returns_on_change(self):
+        version = get_state_version()
+        timer = threading.Timer(0.05, notify_state_change)
+        timer.start()
+        response = self.client.get(f"/api/status/?since={version}&wait=5")
+        timer.join()
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(response.json()["version"], version)
+
+    def test_invalid_since(self):
+        response = self.client.get("/api/status/?since=latest")
+        self.assertEqual(response.status_code, 400)
+
+    def test_concurrent_long_polls_all_return_on_change(self):
+        version = get_state_version()
+        codes = []
+
+        def poll():
+            client = Client()
+            response = client.get(f"/api/status/?since={version}&wait=4")
+            codes.append(response.status_code)
+
+        threads = [threading.Thread(target=poll) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        started = time.monotonic()
+        notify_state_change()
+        for thread in threads:
+            thread.join()
+        self.assertLess(time.monotonic() - started, 2.0)
+        self.assertEqual(codes, [200, 200, 200])
+
+    def test_asgi_long_polls_on_separate_loops_all_wake(self):
+        version = get_state_version()
+        scopes = []
+
+        async def app(scope, receive, send):
+            scopes.append(scope)
+
+        def poll():
+            scope = {"type": "http", "query_string": f"since={version}&wait=4".encode()}
+            asyncio.run(status_stream.long_poll(scope, None, None, app))
+
+        threads = [threading.Thread(target=poll) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        started = time.monotonic()
+        notify_state_change()
+        for thread in threads:
+            thread.join()
+        self.assertLess(time.monotonic() - started, 2.0)
+        self.assertEqual(
+            [scope["query_string"] for scope in scopes],
+            [f"since={version}".encode()] * 3,
+        )
+
+    def test_response_cache_is_bounded(self):
+        for key in range(views.MAX_CACHED_RESPONSES + 10):
+            views._cached_json(f"test-{key}", lambda: {"version": get_state_version()})
+        self.assertEqual(len(views._response_cache), views.MAX_CACHED_RESPONSES)
+        self.assertIn(f"test-{key}", views._response_cache)
+        self.assertNotIn("test-0", views._response_cache)
+
+    def test_stream_resumes_logs_after_cursor(self):
+        from control.services import log_movement, movement_logs
+
+        log_movement("test_stream", {"n": 1})
+        cursor = movement_logs.last_seq
+        log_movement("test_stream", {"n": 2})
+
+        async def first_message(query):
+            inbox = asyncio.Queue()
+            await inbox.put({"type": "websocket.connect"})
+            sent = []
+
+            async def send(message):
+                sent.append(message)
+                if message["type"] == "websocket.send":
+                    await inbox.put({"type": "websocket.disconnect"})
+
+            scope = {"type": "websocket", "query_string": query}
+            await status_stream.status_websocket(scope, inbox.get, send)
+            return json.loads(sent[1]["text"])
+
+        fresh = asyncio.run(first_message(b""))
+        self.assertEqual(fresh["logs"][-1]["details"], {"n": 2})
+        self.assertGreaterEqual(len(fresh["logs"]), 2)
+        resumed = asyncio.run(first_message(f"since={cursor}".encode()))
+        self.assertEqual([log["details"] for log in resumed["logs"]], [{"n": 2}])
@@ -0,0 +1,92 @@
+import threading
+import time
+from unittest import mock
+
+from django.test import TestCase
+from muon_telescope import motor_control
+from muon_telescope.step_process import StatusBlock, StepProcess
+
+
+class StatusBlockTests(TestCase):
+    def setUp(self):
+        self.block = StatusBlock()
+        self.addCleanup(self.block.close)
+
+    def test_round_trip(self):
+        self.block.write(3, 10, -7, 103, 1)
+        self.assertEqual(
+            self.block.read(),
+            {
+                "steps_done": 3,
+                "steps_total": 10,
+                "position_steps": -7,
+                "pulses": 103,
+                "moving": True,
+            },
+        )
+
+    def test_reads_are_never_torn(self):
+        stop = threading.Event()
+
+        def writer():
+            i = 0
+            while not stop.is_set():
+                i += 1
+                self.block.write(i, i, i, i, 1)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            for _ in range(20_000):
+                status = self.block.read()
+                values = {status[k] for k in ("steps_done", "position_steps", "pulses")}
+                self.assertEqual(len(values), 1)
+        finally:
+            stop.set()
+            thread.join()
+
+
+class StepProcessTests(TestCase):
+    def setUp(self):
+        self.stepper = StepProcess()
+        self.addCleanup(self.stepper.close)
+        patcher = mock.patch.object(motor_control, "stepper", self.stepper)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        motor_control.set_direction(True)
+
+    def test_move_runs_in_child(self):
+        progress = []
+        done = motor_control.do_steps(
+            200, 0.0002, profile="constant", on_progress=progress.append
+        )
+        self.assertEqual(done, 200)
+        self.assertEqual(motor_control.motor_state["jitter"]["pulses"], 200)
+        status = self.stepper.status()
+        self.assertEqual(status["pulses"], 200)
+        self.assertFalse(status["moving"])
+        self.assertEqual(
+            status["position_steps"], motor_control.motor_state["position_steps"] - 200
+        )
+        self.assertTrue(all(n % motor_control.PROGRESS_STRIDE == 0 for n in progress))
+
+    def test_retarget_reaches_child(self):
+        token = motor_control.MotionToken()
+        threading.Timer(0.05, token.retarget, (1500,)).start()
+        done = motor_control.do_steps(1000, 0.0002, profile="constant", token=token)
+        self.assertEqual(done, 1500)
+        self.assertEqual(self.stepper.status()["pulses"], 1500)
+
+    def test_pulse_train_runs_in_child(self):
+        before = self.stepper.status()["pulses"]
+        self.assertEqual(motor_control.do_pulses((200_000,) * 50), 50)
+        self.assertEqual(self.stepper.status()["pulses"], before + 50)
+
+    def test_cancel_reaches_child(self):
+        token = motor_control.MotionToken()
+        threading.Timer(0.05, token.cancel).start()
+        started = time.monotonic()
+        done = motor_control.do_steps(5000, 0.001, profile="constant", token=token)
+        self.assertLess(done, 5000)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(self.stepper.status()["steps_done"], done)